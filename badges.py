@@ -0,0 +1,116 @@
+# Copyright © 2024-2025 [YOUR NAME]. All Rights Reserved.
+#
+# PROPRIETARY AND CONFIDENTIAL
+#
+# This file is part of Hourglass Fitness Transformation application.
+# Unauthorized copying, distribution, or modification of this file,
+# via any medium, is strictly prohibited.
+#
+# Contact: [your-email@example.com]
+# badges.py
+"""Incremental badge evaluation.
+
+Badge inputs are kept as small counters that activity events update as they
+happen, instead of being recomputed from the full history:
+
+* ``hydration``  - liters per day for the last HYDRATION_WINDOW_DAYS days;
+* ``glute_sets`` - completed glute sets per day for the last GLUTE_WINDOW_DAYS days;
+* ``morning_workouts`` - number of distinct days with sets saved before noon;
+* ``longest`` - longest activity streak, fed from the streak engine.
+
+Each event returns the names of the metrics it changed. ``evaluate`` then
+re-checks only the rules that depend on one of them. Counters and earned
+badges are plain JSON-able dicts, so they are persisted with the rest of the
+user's progress. Day keys are day numbers (see streaks.day_number), stored as
+strings.
+"""
+from __future__ import annotations
+from datetime import datetime
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Set
+
+HYDRATION_WINDOW_DAYS = 7
+HYDRATION_MIN_L = 2.0
+GLUTE_WINDOW_DAYS = 14
+GLUTE_KEYWORDS = ("hip", "thrust", "glute")
+MORNING_BEFORE_HOUR = 12
+
+def new_counters() -> Dict:
+    return {"hydration": {}, "glute_sets": {}, "morning_workouts": 0, "last_morning_day": None, "longest": 0}
+
+def _window_set(window: Dict[str, float], day: int, value: float, span: int):
+    """Store ``value`` for ``day`` and drop days that fell out of the newest ``span``-day window."""
+    window[str(day)] = value
+    newest = max(int(d) for d in window)
+    for d in [d for d in window if int(d) <= newest - span]:
+        del window[d]
+
+def is_glute_exercise(name: str) -> bool:
+    name = (name or "").lower()
+    return any(word in name for word in GLUTE_KEYWORDS)
+
+# ---- Events ----
+def record_checkin(counters: Dict, day: int, water_l: float) -> Set[str]:
+    _window_set(counters["hydration"], day, float(water_l or 0), HYDRATION_WINDOW_DAYS)
+    return {"hydration7"}
+
+def record_sets(counters: Dict, day: int, exercise_name: str, completed_sets: int,
+                when: Optional[datetime] = None) -> Set[str]:
+    """``completed_sets`` is the change in an exercise's completed sets for ``day``,
+    so re-saving the same sets adds nothing; it is negative when sets were unticked."""
+    changed = set()
+    if completed_sets == 0:
+        return changed
+    if is_glute_exercise(exercise_name):
+        window = counters["glute_sets"]
+        _window_set(window, day, max(0, window.get(str(day), 0) + completed_sets), GLUTE_WINDOW_DAYS)
+        changed.add("glute_sets_2wk")
+    when = when or datetime.now()
+    if completed_sets > 0 and when.hour < MORNING_BEFORE_HOUR and counters.get("last_morning_day") != day:
+        counters["morning_workouts"] = counters.get("morning_workouts", 0) + 1
+        counters["last_morning_day"] = day
+        changed.add("morning_workouts")
+    return changed
+
+def set_longest_streak(counters: Dict, longest: int) -> Set[str]:
+    if longest <= counters.get("longest", 0):
+        return set()
+    counters["longest"] = longest
+    return {"longest"}
+
+# ---- Evaluation ----
+def metrics(counters: Mapping, today: int) -> Dict:
+    """Metric values as of ``today``; cost is bounded by the window sizes."""
+    hydration = counters.get("hydration", {})
+    glute = counters.get("glute_sets", {})
+    return {
+        "hydration7": all(hydration.get(str(today - i), 0) >= HYDRATION_MIN_L for i in range(HYDRATION_WINDOW_DAYS)),
+        "glute_sets_2wk": sum(v for d, v in glute.items() if today - GLUTE_WINDOW_DAYS < int(d) <= today),
+        "morning_workouts": counters.get("morning_workouts", 0),
+        "longest": counters.get("longest", 0),
+    }
+
+def evaluate(counters: Mapping, earned: Dict[str, str], rules: Sequence[Mapping], changed: Iterable[str],
+             today: int, now: Optional[datetime] = None) -> List[str]:
+    """Check the unearned rules that depend on a ``changed`` metric.
+
+    Newly earned keys are added to ``earned`` with an ISO timestamp and
+    returned. Earned badges are never taken away.
+    """
+    changed = set(changed)
+    due = [r for r in rules if r["key"] not in earned and changed.intersection(r["metrics"])]
+    if not due:
+        return []
+    values = metrics(counters, today)
+    stamp = (now or datetime.now()).isoformat(timespec="seconds")
+    new = []
+    for rule in due:
+        try:
+            if rule["rule"](values):
+                earned[rule["key"]] = stamp
+                new.append(rule["key"])
+        except Exception:
+            pass
+    return new
+
+def all_metrics(rules: Sequence[Mapping]) -> Set[str]:
+    return set().union(*(r["metrics"] for r in rules))
@@ -0,0 +1,169 @@
+# Copyright © 2024-2025 [YOUR NAME]. All Rights Reserved.
+#
+# PROPRIETARY AND CONFIDENTIAL
+#
+# This file is part of Hourglass Fitness Transformation application.
+# Unauthorized copying, distribution, or modification of this file,
+# via any medium, is strictly prohibited.
+#
+# Contact: [your-email@example.com]
+# catalog.py
+"""Compiled exercise catalog.
+
+The workout lists in app.py are plain dict literals. ``Catalog`` compiles them
+once into ``Exercise`` records with the id, set count, time-based flag and
+alternatives already worked out, so rendering a card is attribute access.
+Identical entries shared by several workouts compile to the same record.
+``Schedule`` resolves the weekly program split to compiled workouts.
+"""
+from __future__ import annotations
+import re
+from types import MappingProxyType
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+MAX_SETS = 15
+WEEKDAYS = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+REST_LABEL = "REST"
+
+_NON_ID_CHARS = re.compile(r'[^a-z0-9]+')
+_WARMUP_SETS = re.compile(r'\d+\s*warm[- ]*up.*?(?:\+|$)')
+_NUMBER = re.compile(r'\d+')
+
+def exercise_id(name: str) -> str:
+    """Stable exercise ID from its name"""
+    return _NON_ID_CHARS.sub('_', name.lower()).strip('_')
+
+def parse_set_count(sets: str) -> int:
+    """Working sets in a description like "1 warm up + 3 + 1 AMRAP", capped at MAX_SETS"""
+    if not sets or sets.strip() == "—":
+        return 0
+    try:
+        return min(int(sets), MAX_SETS)
+    except ValueError:
+        pass
+    s = _WARMUP_SETS.sub('', sets.lower())
+    nums = _NUMBER.findall(s)
+    if not nums:
+        return 1 if "set" in s else 0
+    return min(sum(int(n) for n in nums), MAX_SETS)
+
+class Exercise:
+    """One compiled exercise entry. Treat as read-only."""
+
+    __slots__ = ("id", "name", "sets", "reps", "category", "num_sets", "time_based", "at_home", "low_impact")
+
+    def __init__(self, name: str, sets: str = "—", reps: str = "—", category: str = "General",
+                 alternatives: Optional[Mapping[str, Sequence[str]]] = None):
+        self.id = exercise_id(name)
+        self.name = name
+        self.sets = sets
+        self.reps = reps
+        self.category = category
+        self.num_sets = parse_set_count(sets)
+        # Timed warm-ups track seconds instead of reps and weight
+        self.time_based = "second" in reps.lower() and category == "Warm-up"
+        alternatives = alternatives or {}
+        self.at_home = tuple(alternatives.get("at_home", ()))
+        self.low_impact = tuple(alternatives.get("low_impact", ()))
+
+    @property
+    def has_alternatives(self) -> bool:
+        return bool(self.at_home or self.low_impact)
+
+    def as_dict(self) -> Dict[str, str]:
+        return {"name": self.name, "sets": self.sets, "reps": self.reps, "category": self.category}
+
+    def __repr__(self) -> str:
+        return f"Exercise({self.name!r}, sets={self.sets!r}, reps={self.reps!r})"
+
+class Catalog:
+    """Every workout compiled to a tuple of ``Exercise`` records.
+
+    ``names`` is the sorted list of distinct exercise names (plus
+    ``extra_names``), leaving out anything in ``skip_names``.
+    """
+
+    __slots__ = ("workouts", "exercises", "names")
+
+    def __init__(self, workouts: Mapping[str, Iterable[Mapping]],
+                 alternatives: Optional[Mapping[str, Mapping[str, Sequence[str]]]] = None,
+                 extra_names: Iterable[str] = (), skip_names: Iterable[str] = ()):
+        alternatives = alternatives or {}
+        interned: Dict[Tuple[str, str, str, str], Exercise] = {}
+        by_id: Dict[str, Exercise] = {}
+
+        def compile_entry(entry: Mapping) -> Exercise:
+            key = (entry["name"], entry.get("sets", "—"), entry.get("reps", "—"), entry.get("category", "General"))
+            record = interned.get(key)
+            if record is None:
+                record = interned[key] = Exercise(*key, alternatives=alternatives.get(exercise_id(key[0])))
+                by_id.setdefault(record.id, record)
+            return record
+
+        self.workouts = MappingProxyType(
+            {name: tuple(compile_entry(e) for e in entries) for name, entries in workouts.items()}
+        )
+        self.exercises = MappingProxyType(by_id)
+        skip = set(skip_names)
+        self.names = tuple(sorted({r.name for r in interned.values()}.union(extra_names) - skip))
+
+    def workout(self, name: str) -> Tuple[Exercise, ...]:
+        return self.workouts[name]
+
+# ---- Weekly schedule ----
+class ScheduleError(ValueError):
+    pass
+
+class DayPlan(NamedTuple):
+    level: int
+    day: str
+    label: str
+    workout: str
+    exercises: Tuple[Exercise, ...]
+
+    @property
+    def is_rest(self) -> bool:
+        return self.label == REST_LABEL
+
+class Schedule:
+    """(level, weekday) -> ``DayPlan`` index over a program split.
+
+    ``split`` maps "Level <n>" to {weekday: label}; ``label_workouts`` maps
+    each level to {label: workout name in ``catalog``}. Every weekday of every
+    level must be present and every non-REST label must resolve, otherwise
+    ScheduleError lists all the problems at once.
+    """
+
+    __slots__ = ("plans", "weeks", "levels")
+
+    def __init__(self, split: Mapping[str, Mapping[str, str]], label_workouts: Mapping[int, Mapping[str, str]],
+                 catalog: Catalog, rest_workout: str = "REST_DAY"):
+        plans: Dict[Tuple[int, str], DayPlan] = {}
+        problems: List[str] = []
+        for level_name, days in split.items():
+            level = int(level_name.rsplit(" ", 1)[-1])
+            labels = label_workouts.get(level, {})
+            for day in WEEKDAYS:
+                label = days.get(day)
+                if label is None:
+                    problems.append(f"{level_name} has no {day}")
+                    continue
+                workout = rest_workout if label == REST_LABEL else labels.get(label)
+                if workout not in catalog.workouts:
+                    problems.append(f"{level_name} {day}: {label!r} does not resolve to a workout")
+                    continue
+                plans[(level, day)] = DayPlan(level, day, label, workout, catalog.workouts[workout])
+            for day in set(days) - set(WEEKDAYS):
+                problems.append(f"{level_name}: unknown day {day!r}")
+        if problems:
+            raise ScheduleError("; ".join(problems))
+        self.plans = MappingProxyType(plans)
+        self.levels = tuple(sorted({level for level, _ in plans}))
+        self.weeks = MappingProxyType({level: tuple(plans[(level, day)] for day in WEEKDAYS) for level in self.levels})
+
+    def day(self, level: int, day: str) -> DayPlan:
+        return self.plans[(level, day)]
+
+    def week(self, level: int) -> Tuple[DayPlan, ...]:
+        """The level's seven plans, Monday first."""
+        return self.weeks[level]
@@ -0,0 +1,175 @@
+# Copyright © 2024-2025 [YOUR NAME]. All Rights Reserved.
+#
+# PROPRIETARY AND CONFIDENTIAL
+#
+# This file is part of Hourglass Fitness Transformation application.
+# Unauthorized copying, distribution, or modification of this file,
+# via any medium, is strictly prohibited.
+#
+# Contact: [your-email@example.com]
+# images.py
+"""Resized image variants for the coach photo, covers and progress photos.
+
+Originals are kept as uploaded; pages are served width-bounded WebP (or JPEG
+when Pillow lacks WebP) copies with EXIF stripped after applying its
+orientation. Variants live at variants/<sha[:2]>/<sha>_<width>.<ext>, keyed
+by the source content hash, so each one is encoded once and then served
+from disk.
+"""
+from __future__ import annotations
+import argparse
+import os
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from PIL import Image, ImageOps, features
+
+from media import DEFAULT_BLOBS_DIR, add_usage, blob_sha, hash_file
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp")
+DEFAULT_VARIANTS_DIR = os.path.join("uploaded_content", "variants")
+VARIANT_WIDTHS = (250, 450, 900)
+VARIANT_FORMAT = "WEBP" if features.check("webp") else "JPEG"
+VARIANT_QUALITY = 80
+
+_lock = threading.Lock()
+_source_hashes: Dict[Tuple[str, int, int], str] = {}
+_variants: Dict[Tuple[str, int], str] = {}
+_pending: Dict[Tuple[str, int], Future] = {}
+# (sha, width) -> error of an encode that failed; not retried for that source content
+_failed: Dict[Tuple[str, int], str] = {}
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="image-variants")
+
+def source_hash(path: str, blobs_dir: str = DEFAULT_BLOBS_DIR) -> str:
+    """Content hash of an image; free for blobs, hashed once per (path, mtime, size) otherwise."""
+    sha256 = blob_sha(path, blobs_dir)
+    if sha256:
+        return sha256
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+    with _lock:
+        cached = _source_hashes.get(key)
+    if cached is None:
+        cached = hash_file(path)
+        with _lock:
+            _source_hashes[key] = cached
+    return cached
+
+def variant_path(sha256: str, width: int, variants_dir: str = DEFAULT_VARIANTS_DIR,
+                 fmt: str = VARIANT_FORMAT) -> str:
+    ext = ".webp" if fmt == "WEBP" else ".jpg"
+    return os.path.join(variants_dir, sha256[:2], f"{sha256}_{width}{ext}")
+
+def _encode_variant(path: str, width: int, out_path: str, fmt: str):
+    with Image.open(path) as img:
+        rotated = img.getexif().get(0x0112, 1) in (5, 6, 7, 8)
+        width = min(width, img.height if rotated else img.width)
+        # JPEG sources decode at a reduced DCT scale straight away; both sides stay
+        # >= width so the bound still holds after EXIF rotation
+        img.draft(img.mode, (min(width, img.width), min(width, img.height)))
+        img = ImageOps.exif_transpose(img)
+        if img.width != width:
+            height = max(1, round(img.height * width / img.width))
+            img = img.resize((width, height), Image.Resampling.LANCZOS, reducing_gap=3.0)
+        # No exif=/icc_profile= is passed to save(), so metadata is dropped
+        if fmt == "JPEG":
+            img.convert("RGB").save(out_path, "JPEG", quality=VARIANT_QUALITY, optimize=True, progressive=True)
+        else:
+            if img.mode not in ("RGB", "RGBA"):
+                img = img.convert("RGBA" if "A" in img.getbands() or "transparency" in img.info else "RGB")
+            img.save(out_path, "WEBP", quality=VARIANT_QUALITY, method=4)
+
+def image_variant(path: str, width: int, variants_dir: str = DEFAULT_VARIANTS_DIR,
+                  blobs_dir: str = DEFAULT_BLOBS_DIR, fmt: str = VARIANT_FORMAT) -> str:
+    """Path of the ``width``-bounded variant of ``path``, encoding it on first use."""
+    sha256 = source_hash(path, blobs_dir)
+    key = (sha256, width)
+    with _lock:
+        cached = _variants.get(key)
+    if cached and os.path.exists(cached):
+        return cached
+    target = variant_path(sha256, width, variants_dir, fmt)
+    if not os.path.exists(target):
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(target), suffix=".part")
+        os.close(fd)
+        try:
+            _encode_variant(path, width, tmp_path, fmt)
+            os.replace(tmp_path, target)
+            add_usage("variants", os.path.getsize(target), os.path.dirname(variants_dir))
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    with _lock:
+        _variants[key] = target
+    return target
+
+def generate_variants(path: str, widths: Sequence[int] = VARIANT_WIDTHS, variants_dir: str = DEFAULT_VARIANTS_DIR,
+                      blobs_dir: str = DEFAULT_BLOBS_DIR) -> List[str]:
+    return [image_variant(path, width, variants_dir, blobs_dir) for width in widths]
+
+def _finish(key: Tuple[str, int], future: Future):
+    error = future.exception()
+    with _lock:
+        _pending.pop(key, None)
+        if error is not None:
+            _failed[key] = str(error) or type(error).__name__
+
+def submit_variants(path: str, widths: Sequence[int] = VARIANT_WIDTHS, variants_dir: str = DEFAULT_VARIANTS_DIR,
+                    blobs_dir: str = DEFAULT_BLOBS_DIR):
+    """Encode variants on a background thread; ones already queued are not queued again."""
+    sha256 = source_hash(path, blobs_dir)
+    for width in widths:
+        key = (sha256, width)
+        with _lock:
+            if key in _variants or key in _pending or key in _failed:
+                continue
+            future = _executor.submit(image_variant, path, width, variants_dir, blobs_dir)
+            _pending[key] = future
+        future.add_done_callback(lambda f, key=key: _finish(key, f))
+
+def ready_variant(path: str, width: int, variants_dir: str = DEFAULT_VARIANTS_DIR,
+                  blobs_dir: str = DEFAULT_BLOBS_DIR, fmt: str = VARIANT_FORMAT) -> Optional[str]:
+    """The variant if it is already encoded; otherwise queue it and return None.
+
+    If encoding it failed, ``path`` itself is returned (see ``variant_error``).
+    """
+    sha256 = source_hash(path, blobs_dir)
+    target = variant_path(sha256, width, variants_dir, fmt)
+    if os.path.exists(target):
+        return target
+    if variant_error(sha256, width):
+        return path
+    submit_variants(path, (width,), variants_dir, blobs_dir)
+    return None
+
+def variant_error(sha256: str, width: int) -> Optional[str]:
+    """Why the background encode of this variant failed, if it did."""
+    with _lock:
+        return _failed.get((sha256, width))
+
+def best_width(width: int, widths: Sequence[int] = VARIANT_WIDTHS) -> int:
+    """Smallest pre-generated width that covers ``width``."""
+    return next((w for w in sorted(widths) if w >= width), max(widths))
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Generate resized image variants")
+    parser.add_argument("paths", nargs="+", help="image files or directories")
+    parser.add_argument("--dir", default=DEFAULT_VARIANTS_DIR, help="variants directory")
+    args = parser.parse_args(argv)
+
+    count = 0
+    for target in args.paths:
+        files = [os.path.join(target, n) for n in sorted(os.listdir(target))] if os.path.isdir(target) else [target]
+        for path in files:
+            if path.lower().endswith(IMAGE_EXTENSIONS):
+                for variant in generate_variants(path, variants_dir=args.dir):
+                    print(f"{path} -> {variant} ({os.path.getsize(variant)} bytes)")
+                    count += 1
+    print(f"{count} variants ready")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
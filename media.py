@@ -0,0 +1,819 @@
+# Copyright © 2024-2025 [YOUR NAME]. All Rights Reserved.
+#
+# PROPRIETARY AND CONFIDENTIAL
+#
+# This file is part of Hourglass Fitness Transformation application.
+# Unauthorized copying, distribution, or modification of this file,
+# via any medium, is strictly prohibited.
+#
+# Contact: [your-email@example.com]
+# media.py
+from __future__ import annotations
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+import struct
+import subprocess
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import BinaryIO, Callable, Dict, Iterable, List, Mapping, NamedTuple, Optional, TextIO, Tuple
+
+try:
+    from PIL import Image, ImageDraw
+except ImportError:  # posters then need ffmpeg
+    Image = ImageDraw = None
+
+VIDEO_EXTENSIONS = (".mp4", ".mov", ".m4v", ".avi", ".webm")
+VIDEO_INDEX_FILENAME = "videos_index.json"
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+DEFAULT_EXERCISE_VIDEOS_DIR = os.path.join("uploaded_content", "exercise_videos")
+DEFAULT_BLOBS_DIR = os.path.join("uploaded_content", "blobs")
+BLOB_REFS_FILENAME = "refs.json"
+USAGE_FILENAME = "usage.json"
+FASTSTART_EXTENSIONS = (".mp4", ".mov", ".m4v")
+DEFAULT_POSTERS_DIR = os.path.join("uploaded_content", "posters")
+POSTER_WIDTH = 480
+
+# ---- JSON manifests ----
+# Parsed manifests are shared by every session in the process. Entries are
+# keyed on the file's stat so any rewrite (os.replace gives a new inode) is
+# picked up on the next read without explicit invalidation.
+_manifest_lock = threading.Lock()
+_manifest_cache: Dict[str, Tuple[Tuple[int, int, int], object]] = {}
+
+def _freeze(obj):
+    """Read-only view of parsed JSON - shared snapshots must not be mutated in place."""
+    if isinstance(obj, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in obj.items()})
+    if isinstance(obj, list):
+        return tuple(_freeze(v) for v in obj)
+    return obj
+
+def thaw(obj):
+    """Mutable deep copy of a frozen snapshot."""
+    if isinstance(obj, Mapping):
+        return {k: thaw(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [thaw(v) for v in obj]
+    return obj
+
+def read_manifest(path: str, default=None):
+    """Immutable snapshot of a JSON manifest, parsed at most once per file version."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return default
+    version = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+    with _manifest_lock:
+        cached = _manifest_cache.get(path)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    with open(path, "r") as f:
+        snapshot = _freeze(json.load(f))
+    with _manifest_lock:
+        _manifest_cache[path] = (version, snapshot)
+    return snapshot
+
+def write_atomic(path: str, write: Callable[[TextIO], None]) -> None:
+    """Replace ``path`` with what ``write`` puts in a text file.
+
+    The data goes to a uniquely named temp file in the same directory, so
+    concurrent writers never share one, and is renamed into place when done.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def write_manifest(path: str, data) -> None:
+    """Atomically replace a JSON manifest.
+
+    Readers see either the old snapshot or the new one, never a partial file.
+    """
+    write_atomic(path, lambda f: json.dump(thaw(data), f, indent=2))
+    with _manifest_lock:
+        _manifest_cache.pop(path, None)
+
+# ---- Disk usage ----
+# Byte counters per media area ("blobs", "posters", "variants", "videos") in
+# <media root>/usage.json, adjusted as files are written and deleted so quota
+# checks never walk the tree. Writers in other processes can make them drift;
+# the media GC recounts them exactly on every full pass.
+_usage_lock = threading.Lock()
+
+def usage_path(root: str) -> str:
+    return os.path.join(root, USAGE_FILENAME)
+
+def disk_usage(root: str = os.path.dirname(DEFAULT_BLOBS_DIR)) -> Mapping[str, int]:
+    return read_manifest(usage_path(root), MappingProxyType({}))
+
+def add_usage(area: str, delta: int, root: str = os.path.dirname(DEFAULT_BLOBS_DIR)):
+    if not delta:
+        return
+    with _usage_lock:
+        usage = thaw(disk_usage(root))
+        usage[area] = max(0, usage.get(area, 0) + delta)
+        write_manifest(usage_path(root), usage)
+
+def set_usage(counts: Mapping[str, int], root: str = os.path.dirname(DEFAULT_BLOBS_DIR)):
+    with _usage_lock:
+        write_manifest(usage_path(root), dict(counts))
+
+def over_quota(extra_bytes: int, quota_bytes: Optional[int], root: str = os.path.dirname(DEFAULT_BLOBS_DIR)) -> bool:
+    """True if storing ``extra_bytes`` more would exceed ``quota_bytes`` (None = no quota)."""
+    return quota_bytes is not None and sum(disk_usage(root).values()) + extra_bytes > quota_bytes
+
+# ---- Exercise video index ----
+# uploaded_content/exercise_videos/videos_index.json maps each upload slug to
+# its files, newest first: {slug: [{"path", "size", "mtime"}, ...]}. Upload
+# and delete paths keep it current so lookups never list the directory.
+_index_lock = threading.RLock()
+_SLUG_RE = re.compile(r"^(?P<slug>.+?)_\d{8}_\d{6}(?:_|\.)")
+
+def video_index_path(videos_dir: str) -> str:
+    return os.path.join(videos_dir, VIDEO_INDEX_FILENAME)
+
+def slug_from_filename(filename: str) -> str:
+    """Upload slug encoded in a ``{slug}_{YYYYmmdd_HHMMSS}...`` file name."""
+    m = _SLUG_RE.match(filename)
+    return m.group("slug") if m else os.path.splitext(filename)[0]
+
+def _entry(path: str) -> Dict:
+    stat = os.stat(path)
+    return {"path": path, "size": stat.st_size, "mtime": stat.st_mtime}
+
+def _sorted_entries(entries: List[Dict]) -> List[Dict]:
+    return sorted(entries, key=lambda e: e["mtime"], reverse=True)
+
+def load_video_index(videos_dir: str) -> Mapping:
+    """Current index snapshot; built from disk the first time it is needed."""
+    index = read_manifest(video_index_path(videos_dir))
+    if index is None:
+        rebuild_video_index(videos_dir)
+        index = read_manifest(video_index_path(videos_dir), MappingProxyType({}))
+    return index
+
+def lookup_video(videos_dir: str, slug: str) -> Optional[str]:
+    """Newest uploaded video for ``slug`` - a dict lookup on the cached index."""
+    entries = load_video_index(videos_dir).get(slug)
+    return entries[0]["path"] if entries else None
+
+def add_to_video_index(videos_dir: str, slug: str, path: str) -> None:
+    with _index_lock:
+        index = thaw(load_video_index(videos_dir))
+        # Newest first - a re-uploaded blob keeps its original mtime
+        index[slug] = [_entry(path)] + [e for e in index.get(slug, []) if e["path"] != path]
+        write_manifest(video_index_path(videos_dir), index)
+
+def remove_from_video_index(videos_dir: str, path: str) -> None:
+    with _index_lock:
+        index = thaw(load_video_index(videos_dir))
+        slug = slug_from_filename(os.path.basename(path))
+        candidates = [slug] if slug in index else list(index)
+        for key in candidates:
+            remaining = [e for e in index.get(key, []) if e["path"] != path]
+            if remaining:
+                index[key] = remaining
+            else:
+                index.pop(key, None)
+        write_manifest(video_index_path(videos_dir), index)
+
+def _scan_videos(videos_dir: str, blobs_dir: str = DEFAULT_BLOBS_DIR) -> Dict[str, List[Dict]]:
+    index: Dict[str, List[Dict]] = {}
+    if not os.path.isdir(videos_dir):
+        return index
+    with os.scandir(videos_dir) as it:
+        for dirent in it:
+            if dirent.is_file() and dirent.name.lower().endswith(VIDEO_EXTENSIONS):
+                stat = dirent.stat()
+                index.setdefault(slug_from_filename(dirent.name), []).append({
+                    "path": os.path.join(videos_dir, dirent.name),
+                    "size": stat.st_size,
+                    "mtime": stat.st_mtime,
+                })
+    # Uploads stored in the blob store are named by hash; their slugs live in
+    # the blob reference table
+    refs = load_blob_refs(blobs_dir)
+    for ref, shas in refs["refs"].items():
+        if not ref.startswith("exercise:"):
+            continue
+        for sha256 in shas:
+            meta = refs["blobs"].get(sha256)
+            path = blob_path(sha256, meta["ext"], blobs_dir) if meta else None
+            if path and os.path.exists(path):
+                index.setdefault(ref[len("exercise:"):], []).append(_entry(path))
+    return {slug: _sorted_entries(entries) for slug, entries in index.items()}
+
+def rebuild_video_index(videos_dir: str) -> Dict[str, List[Dict]]:
+    """Rebuild the index from a full directory scan."""
+    with _index_lock:
+        index = _scan_videos(videos_dir)
+        if os.path.isdir(videos_dir):
+            write_manifest(video_index_path(videos_dir), index)
+    return index
+
+def verify_video_index(videos_dir: str) -> Dict[str, List[str]]:
+    """Compare the index with the directory. Returns the paths that are
+    ``missing`` (indexed, not on disk), ``unindexed`` (on disk, not indexed)
+    and ``stale`` (size or mtime changed)."""
+    indexed = {e["path"]: e for entries in (read_manifest(video_index_path(videos_dir)) or {}).values()
+               for e in entries}
+    on_disk = {e["path"]: e for entries in _scan_videos(videos_dir).values() for e in entries}
+    return {
+        "missing": sorted(set(indexed) - set(on_disk)),
+        "unindexed": sorted(set(on_disk) - set(indexed)),
+        "stale": sorted(p for p in set(indexed) & set(on_disk)
+                        if (indexed[p]["size"], indexed[p]["mtime"]) != (on_disk[p]["size"], on_disk[p]["mtime"])),
+    }
+
+# ---- Uploads ----
+class UploadTooLarge(ValueError):
+    pass
+
+class StoredUpload(NamedTuple):
+    path: str
+    sha256: str
+    size: int
+
+def safe_filename(name: str) -> str:
+    return re.sub(r"[^a-zA-Z0-9._-]", "", os.path.basename(name or ""))
+
+def _fsync_dir(path: str):
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+def _stream_to_file(upload: BinaryIO, tmp_path: str, max_bytes: int, chunk_bytes: int) -> Tuple[str, int]:
+    """Copy ``upload`` into ``tmp_path`` chunk by chunk; returns (sha256, size)."""
+    declared = getattr(upload, "size", None)
+    if declared is not None and declared > max_bytes:
+        raise UploadTooLarge(
+            f"Video file is {declared / (1024 * 1024):.1f} MB, exceeds {max_bytes / (1024 * 1024):.0f} MB limit!"
+        )
+    digest = hashlib.sha256()
+    written = 0
+    if hasattr(upload, "seek"):
+        upload.seek(0)
+    with open(tmp_path, "wb") as out:
+        while True:
+            chunk = upload.read(chunk_bytes)
+            if not chunk:
+                break
+            written += len(chunk)
+            if written > max_bytes:
+                raise UploadTooLarge(f"Upload exceeds {max_bytes / (1024 * 1024):.0f} MB limit!")
+            digest.update(chunk)
+            out.write(chunk)
+        out.flush()
+        os.fsync(out.fileno())
+    return digest.hexdigest(), written
+
+# ---- MP4 faststart ----
+# Phone recordings usually write the ``moov`` index after the media data, so
+# a browser has to download nearly the whole file before playback starts.
+# faststart() moves ``moov`` ahead of the first ``mdat`` and shifts every
+# chunk offset (stco/co64) that points past the insertion point, including
+# data after the old moov when the rebuilt moov changes size.
+_MP4_CONTAINERS = frozenset((b"moov", b"trak", b"mdia", b"minf", b"stbl"))
+_UINT32_MAX = 0xFFFFFFFF
+
+class _Mp4Error(ValueError):
+    pass
+
+class _OffsetOverflow(Exception):
+    pass
+
+def _iter_boxes(data: bytes, start: int, end: int):
+    """Yield (type, offset, header_size, size) for the boxes in data[start:end]."""
+    offset = start
+    while offset + 8 <= end:
+        size, box_type = struct.unpack_from(">I4s", data, offset)
+        header_size = 8
+        if size == 1:
+            if offset + 16 > end:
+                raise _Mp4Error(f"Truncated {box_type!r} box at offset {offset}")
+            size = struct.unpack_from(">Q", data, offset + 8)[0]
+            header_size = 16
+        elif size == 0:
+            size = end - offset
+        if size < header_size or offset + size > end:
+            raise _Mp4Error(f"Malformed {box_type!r} box at offset {offset}")
+        yield box_type, offset, header_size, size
+        offset += size
+
+def _top_level_boxes(f: BinaryIO, file_size: int) -> List[Tuple[bytes, int, int, int]]:
+    """(type, offset, header_size, size) of each top-level box, reading headers only."""
+    boxes = []
+    offset = 0
+    while offset + 8 <= file_size:
+        f.seek(offset)
+        header = f.read(16)
+        size, box_type = struct.unpack_from(">I4s", header)
+        header_size = 8
+        if size == 1:
+            size = struct.unpack_from(">Q", header, 8)[0]
+            header_size = 16
+        elif size == 0:
+            size = file_size - offset
+        if size < header_size or offset + size > file_size:
+            raise _Mp4Error(f"Malformed {box_type!r} box at offset {offset}")
+        boxes.append((box_type, offset, header_size, size))
+        offset += size
+    return boxes
+
+def _box(box_type: bytes, body: bytes) -> bytes:
+    if len(body) + 8 > _UINT32_MAX:
+        return struct.pack(">I4sQ", 1, box_type, len(body) + 16) + body
+    return struct.pack(">I4s", len(body) + 8, box_type) + body
+
+def _shift_chunk_offsets(box_type: bytes, body: bytes, shift: Callable[[int], int], force_co64: bool) -> bytes:
+    count = struct.unpack_from(">I", body, 4)[0]
+    fmt = "Q" if box_type == b"co64" else "I"
+    offsets = [shift(o) for o in struct.unpack_from(f">{count}{fmt}", body, 8)]
+    if fmt == "I" and (force_co64 or any(o > _UINT32_MAX for o in offsets)):
+        if not force_co64:
+            raise _OffsetOverflow()
+        box_type, fmt = b"co64", "Q"
+    return _box(box_type, body[:4] + struct.pack(f">I{count}{fmt}", count, *offsets))
+
+def _rewrite_boxes(data: bytes, start: int, end: int, shift: Callable[[int], int], force_co64: bool) -> bytes:
+    out = bytearray()
+    for box_type, offset, header_size, size in _iter_boxes(data, start, end):
+        body_start, box_end = offset + header_size, offset + size
+        if box_type == b"cmov":
+            raise _Mp4Error("Compressed moov is not supported")
+        if box_type in _MP4_CONTAINERS:
+            out += _box(box_type, _rewrite_boxes(data, body_start, box_end, shift, force_co64))
+        elif box_type in (b"stco", b"co64"):
+            out += _shift_chunk_offsets(box_type, data[body_start:box_end], shift, force_co64)
+        else:
+            out += data[offset:box_end]
+    return bytes(out)
+
+def _relocated_moov(moov: bytes, header_size: int, insert_at: int, moov_start: int) -> bytes:
+    """Rebuild ``moov`` for insertion at ``insert_at``, sized to its own final length.
+
+    Offsets in [insert_at, moov_start) move down by the new moov size; offsets
+    past the old moov (e.g. a second mdat) move by the difference between the
+    new and old moov sizes. That size can change (64-bit header dropped, stco
+    widened to co64 when an offset no longer fits in 32 bits), so iterate
+    until it settles.
+    """
+    moov_end = moov_start + len(moov)
+    delta, force_co64 = len(moov), False
+    for _ in range(4):
+        def shift(offset: int, delta: int = delta) -> int:
+            if insert_at <= offset < moov_start:
+                return offset + delta
+            if offset >= moov_end:
+                return offset + delta - len(moov)
+            return offset
+        try:
+            body = _rewrite_boxes(moov, header_size, len(moov), shift, force_co64)
+        except _OffsetOverflow:
+            force_co64 = True
+            continue
+        new_moov = _box(b"moov", body)
+        if len(new_moov) == delta:
+            return new_moov
+        delta = len(new_moov)
+    raise _Mp4Error("moov size did not converge")
+
+def _copy_range(src: BinaryIO, dst: BinaryIO, start: int, end: int, chunk_bytes: int):
+    src.seek(start)
+    remaining = end - start
+    while remaining > 0:
+        chunk = src.read(min(chunk_bytes, remaining))
+        if not chunk:
+            raise _Mp4Error("Unexpected end of file")
+        dst.write(chunk)
+        remaining -= len(chunk)
+
+def faststart(path: str, chunk_bytes: int = UPLOAD_CHUNK_BYTES) -> bool:
+    """Rewrite an MP4/QuickTime file in place so ``moov`` precedes ``mdat``.
+
+    Returns True if the file was rewritten. Files that are already
+    faststart, fragmented, or not parseable as MP4 are left untouched.
+    """
+    file_size = os.path.getsize(path)
+    tmp_path = f"{path}.faststart"
+    try:
+        with open(path, "rb") as src:
+            boxes = _top_level_boxes(src, file_size)
+            types = [box[0] for box in boxes]
+            if b"moov" not in types or b"mdat" not in types or b"moof" in types:
+                return False
+            _, moov_start, moov_header, moov_size = boxes[types.index(b"moov")]
+            insert_at = boxes[types.index(b"mdat")][1]
+            if moov_start < insert_at:
+                return False
+            src.seek(moov_start)
+            new_moov = _relocated_moov(src.read(moov_size), moov_header, insert_at, moov_start)
+            with open(tmp_path, "wb") as out:
+                _copy_range(src, out, 0, insert_at, chunk_bytes)
+                out.write(new_moov)
+                _copy_range(src, out, insert_at, moov_start, chunk_bytes)
+                _copy_range(src, out, moov_start + moov_size, file_size, chunk_bytes)
+                out.flush()
+                os.fsync(out.fileno())
+        os.replace(tmp_path, path)
+        return True
+    except (_Mp4Error, struct.error):
+        return False
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+# ---- Content-addressed blob store ----
+# Uploaded media is stored once per distinct content as
+# uploaded_content/blobs/<sha256[:2]>/<sha256><ext>. blobs/refs.json records
+# who uses each blob: {"blobs": {sha: {"ext", "size"}}, "refs": {ref: [sha, ...]}}
+# with refs like "exercise:<slug>", "library:<exercise_key>" or
+# "videos_json:<key>", newest first. A blob is deleted only when its last
+# reference goes away.
+_blob_lock = threading.RLock()
+_BLOB_NAME_RE = re.compile(r"^(?P<sha>[0-9a-f]{64})(?P<ext>\.[A-Za-z0-9]+)?$")
+
+def blob_refs_path(blobs_dir: str = DEFAULT_BLOBS_DIR) -> str:
+    return os.path.join(blobs_dir, BLOB_REFS_FILENAME)
+
+def blob_path(sha256: str, ext: str, blobs_dir: str = DEFAULT_BLOBS_DIR) -> str:
+    return os.path.join(blobs_dir, sha256[:2], f"{sha256}{ext.lower()}")
+
+def blob_sha(path: str, blobs_dir: str = DEFAULT_BLOBS_DIR) -> Optional[str]:
+    """Content hash of a blob-store path, or None for any other file."""
+    if os.path.dirname(os.path.dirname(os.path.normpath(path))) != os.path.normpath(blobs_dir):
+        return None
+    m = _BLOB_NAME_RE.match(os.path.basename(path))
+    return m.group("sha") if m else None
+
+def load_blob_refs(blobs_dir: str = DEFAULT_BLOBS_DIR) -> Mapping:
+    return read_manifest(blob_refs_path(blobs_dir), MappingProxyType({"blobs": {}, "refs": {}}))
+
+def _edit_blob_refs(blobs_dir: str) -> Dict:
+    refs = thaw(load_blob_refs(blobs_dir))
+    refs.setdefault("blobs", {})
+    refs.setdefault("refs", {})
+    return refs
+
+def blob_for_ref(ref: str, blobs_dir: str = DEFAULT_BLOBS_DIR) -> Optional[str]:
+    """Path of the newest blob recorded under ``ref``."""
+    refs = load_blob_refs(blobs_dir)
+    shas = refs["refs"].get(ref)
+    if not shas:
+        return None
+    meta = refs["blobs"].get(shas[0])
+    return blob_path(shas[0], meta["ext"], blobs_dir) if meta else None
+
+def store_blob(upload: BinaryIO, ext: str, max_bytes: int, ref: Optional[str] = None,
+               blobs_dir: str = DEFAULT_BLOBS_DIR, chunk_bytes: int = UPLOAD_CHUNK_BYTES,
+               postprocess: Optional[Callable[[str], bool]] = None) -> StoredUpload:
+    """Stream an upload into the blob store and record ``ref`` against it.
+
+    The content hash is computed while streaming. If a blob with the same
+    hash already exists the new copy is discarded, so re-uploads cost no
+    extra disk. ``postprocess`` (e.g. faststart) may rewrite the temporary
+    file before it is stored; returning True means it changed and is
+    re-hashed.
+    """
+    os.makedirs(blobs_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=blobs_dir, suffix=".part")
+    os.close(fd)
+    try:
+        sha256, size = _stream_to_file(upload, tmp_path, max_bytes, chunk_bytes)
+        if postprocess is not None and postprocess(tmp_path):
+            sha256, size = hash_file(tmp_path, chunk_bytes), os.path.getsize(tmp_path)
+        with _blob_lock:
+            refs = _edit_blob_refs(blobs_dir)
+            known = refs["blobs"].get(sha256)
+            ext = known["ext"] if known else (ext or "").lower()
+            path = blob_path(sha256, ext, blobs_dir)
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(tmp_path, path)
+                _fsync_dir(os.path.dirname(path))
+                add_usage("blobs", size, os.path.dirname(blobs_dir))
+            refs["blobs"][sha256] = {"ext": ext, "size": size}
+            if ref:
+                _prepend_ref(refs, ref, sha256)
+            write_manifest(blob_refs_path(blobs_dir), refs)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return StoredUpload(path, sha256, size)
+
+def _prepend_ref(refs: Dict, ref: str, sha256: str):
+    refs["refs"][ref] = [sha256] + [s for s in refs["refs"].get(ref, []) if s != sha256]
+
+def add_blob_ref(ref: str, path: str, blobs_dir: str = DEFAULT_BLOBS_DIR) -> bool:
+    """Record another reference to an existing blob; False if ``path`` is not a blob."""
+    sha256 = blob_sha(path, blobs_dir)
+    if sha256 is None:
+        return False
+    with _blob_lock:
+        refs = _edit_blob_refs(blobs_dir)
+        if sha256 not in refs["blobs"]:
+            return False
+        _prepend_ref(refs, ref, sha256)
+        write_manifest(blob_refs_path(blobs_dir), refs)
+    return True
+
+def release_media(path: str, ref: Optional[str] = None, blobs_dir: str = DEFAULT_BLOBS_DIR) -> bool:
+    """Drop ``ref``'s claim on ``path`` and delete the file once nothing uses it.
+
+    Non-blob (legacy) files are deleted outright. Returns True if the file
+    was removed from disk.
+    """
+    sha256 = blob_sha(path, blobs_dir)
+    if sha256 is None:
+        if os.path.exists(path):
+            size = os.path.getsize(path)
+            os.remove(path)
+            add_usage("videos", -size, os.path.dirname(blobs_dir))
+            return True
+        return False
+    with _blob_lock:
+        refs = _edit_blob_refs(blobs_dir)
+        if ref is not None and ref in refs["refs"]:
+            remaining = [s for s in refs["refs"][ref] if s != sha256]
+            if remaining:
+                refs["refs"][ref] = remaining
+            else:
+                del refs["refs"][ref]
+        still_used = any(sha256 in shas for shas in refs["refs"].values())
+        removed = False
+        if not still_used:
+            refs["blobs"].pop(sha256, None)
+            if os.path.exists(path):
+                size = os.path.getsize(path)
+                os.remove(path)
+                add_usage("blobs", -size, os.path.dirname(blobs_dir))
+                removed = True
+        write_manifest(blob_refs_path(blobs_dir), refs)
+    return removed
+
+def prune_blob_refs(stale: Iterable[Tuple[str, str]] = (), forget: Iterable[str] = (),
+                    blobs_dir: str = DEFAULT_BLOBS_DIR) -> int:
+    """Drop stale (ref, sha) pairs, and forget blobs entirely (metadata and every ref).
+
+    Files are not touched - that is the media GC's job. Returns the number
+    of entries removed.
+    """
+    stale, forget = set(stale), set(forget)
+    if not stale and not forget:
+        return 0
+    removed = 0
+    with _blob_lock:
+        refs = _edit_blob_refs(blobs_dir)
+        for ref in list(refs["refs"]):
+            kept = [s for s in refs["refs"][ref] if s not in forget and (ref, s) not in stale]
+            removed += len(refs["refs"][ref]) - len(kept)
+            if kept:
+                refs["refs"][ref] = kept
+            else:
+                del refs["refs"][ref]
+        for sha256 in forget:
+            if refs["blobs"].pop(sha256, None) is not None:
+                removed += 1
+        write_manifest(blob_refs_path(blobs_dir), refs)
+    return removed
+
+def hash_file(path: str, chunk_bytes: int = UPLOAD_CHUNK_BYTES) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_bytes), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def dedupe_media(dirs: List[str], blobs_dir: str = DEFAULT_BLOBS_DIR) -> Dict[str, int]:
+    """Fold existing timestamped media files into the blob store.
+
+    Each file is hashed and replaced by a hard link to its blob, so
+    byte-identical copies share one inode. The old paths stay valid for
+    videos.json, videos_db.json and the video index. Each one is recorded
+    as a ``file:<path>`` reference.
+    """
+    stats = {"files": 0, "bytes_reclaimed": 0}
+    for directory in dirs:
+        if not os.path.isdir(directory):
+            continue
+        for name in sorted(os.listdir(directory)):
+            path = os.path.join(directory, name)
+            if not (os.path.isfile(path) and name.lower().endswith(VIDEO_EXTENSIONS)):
+                continue
+            sha256 = hash_file(path)
+            with _blob_lock:
+                refs = _edit_blob_refs(blobs_dir)
+                ext = refs["blobs"].get(sha256, {}).get("ext", os.path.splitext(name)[1].lower())
+                target = blob_path(sha256, ext, blobs_dir)
+                if not os.path.exists(target):
+                    os.makedirs(os.path.dirname(target), exist_ok=True)
+                    os.link(path, target)
+                elif not os.path.samefile(path, target):
+                    size = os.path.getsize(path)
+                    tmp_link = f"{path}.link"
+                    os.link(target, tmp_link)
+                    os.replace(tmp_link, path)
+                    stats["bytes_reclaimed"] += size
+                refs["blobs"][sha256] = {"ext": ext, "size": os.path.getsize(target)}
+                _prepend_ref(refs, f"file:{path}", sha256)
+                write_manifest(blob_refs_path(blobs_dir), refs)
+            stats["files"] += 1
+    return stats
+
+# ---- Posters ----
+# One small JPEG per distinct video, named by the blob hash (or by path, mtime
+# and size for legacy files), so cards can show a still instead of a player.
+def mp4_duration(path: str) -> Optional[float]:
+    """Clip length in seconds from the mvhd box, or None if unknown."""
+    try:
+        with open(path, "rb") as f:
+            boxes = _top_level_boxes(f, os.path.getsize(path))
+            moov = next((box for box in boxes if box[0] == b"moov"), None)
+            if moov is None:
+                return None
+            _, moov_start, moov_header, moov_size = moov
+            f.seek(moov_start)
+            data = f.read(moov_size)
+        for box_type, offset, header_size, _ in _iter_boxes(data, moov_header, len(data)):
+            if box_type == b"mvhd":
+                body = offset + header_size
+                if data[body] == 1:
+                    timescale, duration = struct.unpack_from(">IQ", data, body + 20)
+                else:
+                    timescale, duration = struct.unpack_from(">II", data, body + 12)
+                return duration / timescale if timescale else None
+    except (OSError, _Mp4Error, struct.error, IndexError):
+        pass
+    return None
+
+def poster_path(path: str, posters_dir: str = DEFAULT_POSTERS_DIR, blobs_dir: str = DEFAULT_BLOBS_DIR) -> str:
+    key = blob_sha(path, blobs_dir)
+    if key is None:
+        stat = os.stat(path)
+        key = hashlib.sha256(f"{os.path.abspath(path)}:{stat.st_mtime_ns}:{stat.st_size}".encode()).hexdigest()
+    return os.path.join(posters_dir, f"{key}.jpg")
+
+def _ffmpeg_frame(path: str, out_path: str, width: int) -> bool:
+    ffmpeg = shutil.which("ffmpeg")
+    if not ffmpeg:
+        return False
+    for seek in ("1", "0"):  # clips shorter than a second have no frame at 1s
+        try:
+            subprocess.run(
+                [ffmpeg, "-v", "error", "-y", "-ss", seek, "-i", path, "-frames:v", "1",
+                 "-vf", f"scale={width}:-2", "-q:v", "5", "-f", "image2", out_path],
+                check=True, timeout=30, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            )
+        except (OSError, subprocess.SubprocessError):
+            continue
+        if os.path.getsize(out_path) > 0:
+            return True
+    return False
+
+def _placeholder_poster(path: str, out_path: str, width: int) -> bool:
+    if Image is None:
+        return False
+    height = width * 9 // 16
+    background = (33, 24, 38)
+    img = Image.new("RGB", (width, height), background)
+    draw = ImageDraw.Draw(img)
+    cx, cy, r = width // 2, height // 2, height // 6
+    draw.ellipse((cx - r, cy - r, cx + r, cy + r), fill=(255, 255, 255))
+    draw.polygon([(cx - r // 3, cy - r // 2), (cx - r // 3, cy + r // 2), (cx + r // 2, cy)], fill=background)
+    duration = mp4_duration(path)
+    if duration:
+        draw.text((12, height - 24), f"{int(duration // 60)}:{int(duration % 60):02d}", fill=(255, 255, 255))
+    img.save(out_path, "JPEG", quality=80)
+    return True
+
+def make_poster(path: str, posters_dir: str = DEFAULT_POSTERS_DIR, blobs_dir: str = DEFAULT_BLOBS_DIR,
+                width: int = POSTER_WIDTH) -> Optional[str]:
+    """Poster JPEG for a video, generated once and then served from disk.
+
+    Grabs a frame with ffmpeg when it is on PATH, otherwise draws a
+    placeholder showing the clip length with Pillow. None if neither works.
+    """
+    try:
+        target = poster_path(path, posters_dir, blobs_dir)
+    except OSError:
+        return None
+    if os.path.exists(target):
+        return target
+    os.makedirs(posters_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=posters_dir, suffix=".part")
+    os.close(fd)
+    try:
+        if _ffmpeg_frame(path, tmp_path, width) or _placeholder_poster(path, tmp_path, width):
+            os.replace(tmp_path, target)
+            add_usage("posters", os.path.getsize(target), os.path.dirname(posters_dir))
+            return target
+    except (OSError, ValueError):
+        pass
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return None
+
+# ---- Resident media budget ----
+class ResidentMediaBudget:
+    """Per-process cap on local media bytes handed to Streamlit.
+
+    ``st.video(path)`` loads the file into Streamlit's in-memory media store
+    (deduplicated by content, so one copy per file per process). This tracks
+    which files were embedded recently and refuses new ones once ``cap_bytes``
+    would be exceeded, so callers can fall back to click-to-load. Files not
+    embedded for ``ttl_s`` seconds are assumed released.
+    """
+
+    def __init__(self, cap_bytes: int, ttl_s: float = 600.0):
+        self.cap_bytes = cap_bytes
+        self.ttl_s = ttl_s
+        self._lock = threading.Lock()
+        self._resident: "OrderedDict[str, Tuple[int, float]]" = OrderedDict()
+        self._total = 0
+
+    def _expire(self, now: float):
+        while self._resident:
+            path, (size, last_used) = next(iter(self._resident.items()))
+            if now - last_used < self.ttl_s:
+                break
+            self._resident.popitem(last=False)
+            self._total -= size
+
+    def admit(self, path: str, force: bool = False) -> bool:
+        """Record ``path`` as embedded; False if it would exceed the cap."""
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            if path in self._resident:
+                size, _ = self._resident.pop(path)
+                self._resident[path] = (size, now)
+                return True
+            size = os.path.getsize(path)
+            if not force and self._total + size > self.cap_bytes:
+                return False
+            self._resident[path] = (size, now)
+            self._total += size
+            return True
+
+    @property
+    def resident_bytes(self) -> int:
+        with self._lock:
+            self._expire(time.monotonic())
+            return self._total
+
+resident_media = ResidentMediaBudget(int(float(os.environ.get("MEDIA_RESIDENT_MB", "512")) * 1024 * 1024))
+
+# ---- CLI ----
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Media maintenance for Hourglass Fitness")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name, help_text in (("reindex", "rebuild the exercise video index"),
+                            ("verify", "report drift between the video index and disk")):
+        cmd = sub.add_parser(name, help=help_text)
+        cmd.add_argument("--dir", default=DEFAULT_EXERCISE_VIDEOS_DIR, help="exercise videos directory")
+    dedupe = sub.add_parser("dedupe", help="fold existing media files into the content-addressed blob store")
+    dedupe.add_argument("dirs", nargs="*", default=[DEFAULT_EXERCISE_VIDEOS_DIR, "videos"],
+                        help="directories to deduplicate")
+    args = parser.parse_args(argv)
+
+    if args.command == "dedupe":
+        stats = dedupe_media(args.dirs)
+        print(f"Linked {stats['files']} files into the blob store, reclaimed {stats['bytes_reclaimed']} bytes")
+        return 0
+
+    if args.command == "reindex":
+        index = rebuild_video_index(args.dir)
+        print(f"Indexed {sum(len(v) for v in index.values())} videos under {len(index)} slugs")
+        return 0
+
+    report = verify_video_index(args.dir)
+    for kind, paths in report.items():
+        for path in paths:
+            print(f"{kind}: {path}")
+    drift = sum(len(p) for p in report.values())
+    print("Index OK" if not drift else f"{drift} drifted entries - run 'python media.py reindex'")
+    return 1 if drift else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
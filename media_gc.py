@@ -0,0 +1,296 @@
+# Copyright © 2024-2025 [YOUR NAME]. All Rights Reserved.
+#
+# PROPRIETARY AND CONFIDENTIAL
+#
+# This file is part of Hourglass Fitness Transformation application.
+# Unauthorized copying, distribution, or modification of this file,
+# via any medium, is strictly prohibited.
+#
+# Contact: [your-email@example.com]
+# media_gc.py
+"""Integrity check and garbage collection for uploaded media.
+
+Cross-references everything that can point at a media file - videos.json,
+videos_db.json, the exercise video index, the blob refs table and
+daily_logs.photo_path - against the media directories and reports:
+
+* dangling references: entries whose file is gone, and blob refs whose owner
+  no longer points at that blob;
+* orphan files: unreferenced blobs, legacy uploads in videos/, posters and
+  image variants whose source is gone, and leftover ``.part`` files.
+
+Legacy files in exercise_videos/ are live by design - cards find them by
+slug through the video index.
+
+With ``reclaim`` the findings are fixed, at most ``limit`` per pass so a
+large backlog is worked off incrementally. Files younger than ``grace_s``
+are never deleted, so in-flight uploads are safe. Every pass also recounts
+the disk-usage counters exactly.
+"""
+from __future__ import annotations
+import argparse
+import os
+import time
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+
+from media import (
+    DEFAULT_EXERCISE_VIDEOS_DIR, VIDEO_EXTENSIONS, blob_path, blob_sha, hash_file, load_blob_refs,
+    load_video_index, poster_path, prune_blob_refs, read_manifest, remove_from_video_index, set_usage,
+    thaw, write_manifest,
+)
+
+try:
+    from storage import init_storage, iter_photo_paths, set_daily_log_photo
+
+    STORAGE_AVAILABLE = True
+except ImportError:
+    STORAGE_AVAILABLE = False
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp")
+DEFAULT_GRACE_S = 3600.0
+
+class Finding(NamedTuple):
+    kind: str    # "dangling", "stale_ref" or "orphan"
+    source: str  # where it was found, e.g. "videos.json", "daily_logs", "blobs"
+    key: str     # entry key, ref name or file path
+    path: str
+    size: int = 0
+
+def _norm(path: str) -> str:
+    return os.path.normpath(path)
+
+def _is_local(src) -> bool:
+    return isinstance(src, str) and bool(src) and not src.startswith(("http://", "https://"))
+
+def _files(directory: str):
+    for dirpath, _, names in os.walk(directory):
+        for name in names:
+            yield os.path.join(dirpath, name)
+
+class MediaLayout(NamedTuple):
+    media_root: str = "uploaded_content"
+    videos_json: str = "videos.json"
+    videos_db_json: str = os.path.join(DEFAULT_EXERCISE_VIDEOS_DIR, "videos_db.json")
+    videos_dir: str = "videos"
+    image_sources: Tuple[str, ...] = ("coach_photo.jpg", os.path.join("uploaded_content", "main_media"), "assets")
+
+    @property
+    def blobs_dir(self) -> str:
+        return os.path.join(self.media_root, "blobs")
+
+    @property
+    def posters_dir(self) -> str:
+        return os.path.join(self.media_root, "posters")
+
+    @property
+    def variants_dir(self) -> str:
+        return os.path.join(self.media_root, "variants")
+
+    @property
+    def exercise_dir(self) -> str:
+        return os.path.join(self.media_root, os.path.basename(DEFAULT_EXERCISE_VIDEOS_DIR))
+
+def _mark(layout: MediaLayout) -> Tuple[Set[str], List[Finding]]:
+    """Paths that something still references, plus the dangling and stale references."""
+    live: Set[str] = set()
+    findings: List[Finding] = []
+
+    def claim(source: str, key: str, path: str):
+        if os.path.exists(path):
+            live.add(_norm(path))
+        else:
+            findings.append(Finding("dangling", source, key, path))
+
+    videos = read_manifest(layout.videos_json, {}) or {}
+    for key, src in videos.items():
+        if _is_local(src):
+            claim("videos.json", key, src)
+
+    library: Dict[str, Set[str]] = {}
+    for entry in read_manifest(layout.videos_db_json, ()) or ():
+        for video in entry.get("files", ()):
+            library.setdefault(entry["exercise_key"], set()).add(_norm(video["path"]))
+            claim("videos_db.json", entry["exercise_key"], video["path"])
+
+    for slug, entries in load_video_index(layout.exercise_dir).items():
+        for entry in entries:
+            claim("videos_index", slug, entry["path"])
+
+    photos: Dict[Tuple[str, str], str] = {}
+    if STORAGE_AVAILABLE:
+        for user_id, day, path in iter_photo_paths():
+            photos[(user_id, day)] = _norm(path)
+            claim("daily_logs", f"{user_id}:{day}", path)
+
+    refs = load_blob_refs(layout.blobs_dir)
+    blob_paths = {sha: _norm(blob_path(sha, meta["ext"], layout.blobs_dir)) for sha, meta in refs["blobs"].items()}
+    for sha, path in blob_paths.items():
+        if not os.path.exists(path):
+            findings.append(Finding("dangling", "refs.json", sha, path))
+    for ref, shas in refs["refs"].items():
+        kind, _, name = ref.partition(":")
+        for i, sha in enumerate(shas):
+            path = blob_paths.get(sha)
+            if path is None:
+                findings.append(Finding("stale_ref", "refs.json", ref, sha))
+                continue
+            if kind == "videos_json":
+                stale = not _is_local(videos.get(name)) or _norm(videos[name]) != path
+            elif kind == "library":
+                stale = path not in library.get(name, ())
+            elif kind == "progress":
+                user_id, _, day = name.rpartition(":")
+                stale = STORAGE_AVAILABLE and photos.get((user_id, day)) != path
+            elif kind == "image":
+                stale = i > 0  # only the newest image under a ref is current
+            elif kind == "file":
+                stale = not (os.path.exists(name) and os.path.exists(path) and os.path.samefile(name, path))
+            else:
+                stale = False
+            if stale:
+                findings.append(Finding("stale_ref", "refs.json", ref, path))
+            elif os.path.exists(path):
+                live.add(path)
+    return live, findings
+
+def _sweep(layout: MediaLayout, live: Set[str]) -> Tuple[List[Finding], Dict[str, int]]:
+    """Orphan files, and the exact bytes per area (hard links counted once)."""
+    findings: List[Finding] = []
+    usage = {"blobs": 0, "posters": 0, "variants": 0, "videos": 0}
+    seen_inodes: Set[Tuple[int, int]] = set()
+
+    live_videos = {p for p in live if p.lower().endswith(VIDEO_EXTENSIONS)}
+    live_videos.update(_norm(p) for p in _files(layout.exercise_dir) if p.lower().endswith(VIDEO_EXTENSIONS))
+    live_posters = set()
+    for path in live_videos:
+        try:
+            live_posters.add(os.path.basename(poster_path(path, layout.posters_dir, layout.blobs_dir)))
+        except OSError:
+            pass
+
+    live_images = {blob_sha(p, layout.blobs_dir) for p in live} - {None}
+    for source in layout.image_sources:
+        paths = _files(source) if os.path.isdir(source) else [source] if os.path.isfile(source) else []
+        live_images.update(hash_file(p) for p in paths if p.lower().endswith(IMAGE_EXTENSIONS))
+
+    areas = (
+        ("blobs", layout.blobs_dir, lambda p: blob_sha(p, layout.blobs_dir) is None or _norm(p) in live),
+        ("videos", layout.exercise_dir, lambda p: True),
+        ("videos", layout.videos_dir, lambda p: _norm(p) in live),
+        ("posters", layout.posters_dir, lambda p: os.path.basename(p) in live_posters),
+        ("variants", layout.variants_dir, lambda p: os.path.basename(p).split("_")[0] in live_images),
+    )
+    for area, directory, is_live in areas:
+        for path in _files(directory):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if (stat.st_dev, stat.st_ino) not in seen_inodes:
+                seen_inodes.add((stat.st_dev, stat.st_ino))
+                usage[area] += stat.st_size
+            if path.endswith(".part") or not is_live(path):
+                findings.append(Finding("orphan", area, path, path, stat.st_size))
+    return findings, usage
+
+def _fix(layout: MediaLayout, fixes: List[Finding]):
+    """Apply dangling/stale reference fixes, batching the manifest rewrites."""
+    by_source: Dict[str, List[Finding]] = {}
+    for f in fixes:
+        by_source.setdefault(f.source, []).append(f)
+
+    if "videos.json" in by_source:
+        videos = thaw(read_manifest(layout.videos_json, {}) or {})
+        for f in by_source["videos.json"]:
+            if videos.get(f.key) == f.path:
+                del videos[f.key]
+        write_manifest(layout.videos_json, videos)
+    if "videos_db.json" in by_source:
+        gone = {(f.key, f.path) for f in by_source["videos_db.json"]}
+        db = thaw(read_manifest(layout.videos_db_json, ()) or ())
+        for entry in db:
+            entry["files"] = [v for v in entry.get("files", []) if (entry["exercise_key"], v["path"]) not in gone]
+        write_manifest(layout.videos_db_json, db)
+    for f in by_source.get("videos_index", ()):
+        remove_from_video_index(layout.exercise_dir, f.path)
+    for f in by_source.get("daily_logs", ()):
+        user_id, _, day = f.key.rpartition(":")
+        set_daily_log_photo(user_id, day, None)
+
+    # Stale refs carry the blob path (or the bare sha when its metadata is gone)
+    refs = by_source.get("refs.json", [])
+    prune_blob_refs(
+        stale=[(f.key, blob_sha(f.path, layout.blobs_dir) or f.path) for f in refs if f.kind == "stale_ref"],
+        forget=[f.key for f in refs if f.kind == "dangling"],
+        blobs_dir=layout.blobs_dir,
+    )
+
+def fsck(layout: MediaLayout = MediaLayout(), reclaim: bool = False, limit: Optional[int] = None,
+         grace_s: float = DEFAULT_GRACE_S) -> Dict:
+    """Check (and with ``reclaim``, repair) media integrity in one bounded pass.
+
+    Returns {"findings": [...], "reclaimed": [...], "pending": n,
+    "reclaimed_bytes": n, "usage": {...}}. ``pending`` counts findings left
+    for a later pass because of ``limit`` or the grace period.
+    """
+    live, findings = _mark(layout)
+    orphans, usage = _sweep(layout, live)
+    findings += orphans
+
+    reclaimed: List[Finding] = []
+    pending = 0
+    if reclaim:
+        budget = len(findings) if limit is None else limit
+        fixes = [f for f in findings if f.kind != "orphan"][:budget]
+        _fix(layout, fixes)
+        reclaimed += fixes
+        now = time.time()
+        for f in orphans:
+            if len(reclaimed) >= budget:
+                break
+            try:
+                stat = os.stat(f.path)
+                if now - stat.st_mtime < grace_s:
+                    continue
+                os.remove(f.path)
+            except OSError:
+                continue
+            sha256 = blob_sha(f.path, layout.blobs_dir)
+            if sha256:
+                prune_blob_refs(forget=[sha256], blobs_dir=layout.blobs_dir)
+            if stat.st_nlink <= 1:  # a hard-linked copy frees nothing yet
+                usage[f.source] -= f.size
+            reclaimed.append(f)
+        pending = len(findings) - len(reclaimed)
+    set_usage(usage, layout.media_root)
+    return {
+        "findings": findings,
+        "reclaimed": reclaimed,
+        "pending": pending,
+        "reclaimed_bytes": sum(f.size for f in reclaimed),
+        "usage": usage,
+    }
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Check and garbage-collect uploaded media")
+    parser.add_argument("--reclaim", action="store_true", help="fix dangling references and delete orphans")
+    parser.add_argument("--limit", type=int, default=None, help="max actions per pass")
+    parser.add_argument("--grace", type=float, default=DEFAULT_GRACE_S, help="min file age in seconds to delete")
+    args = parser.parse_args(argv)
+
+    if STORAGE_AVAILABLE:
+        init_storage()
+    report = fsck(reclaim=args.reclaim, limit=args.limit, grace_s=args.grace)
+    reclaimed = set(report["reclaimed"])
+    for f in report["findings"]:
+        status = "fixed" if f in reclaimed else f.kind
+        print(f"{status}: [{f.source}] {f.key}" + (f" -> {f.path}" if f.path != f.key else ""))
+    print(", ".join(f"{area} {size / (1024 * 1024):.1f} MB" for area, size in report["usage"].items()))
+    if args.reclaim:
+        print(f"Reclaimed {len(report['reclaimed'])} items ({report['reclaimed_bytes']} bytes), "
+              f"{report['pending']} pending")
+        return 0
+    return 1 if report["findings"] else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
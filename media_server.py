@@ -0,0 +1,154 @@
+# Copyright © 2024-2025 [YOUR NAME]. All Rights Reserved.
+#
+# PROPRIETARY AND CONFIDENTIAL
+#
+# This file is part of Hourglass Fitness Transformation application.
+# Unauthorized copying, distribution, or modification of this file,
+# via any medium, is strictly prohibited.
+#
+# Contact: [your-email@example.com]
+# media_server.py
+"""Static media sidecar for uploaded videos and photos.
+
+Serves uploaded_content/, videos/ and assets/ over plain HTTP so the app can
+embed URLs instead of pushing file bytes through the Streamlit websocket.
+Tornado's StaticFileHandler provides Range requests (206), If-None-Match and
+If-Modified-Since handling; this module adds cheap stat-based ETags and
+long-lived caching for content-addressed and versioned URLs.
+
+Run standalone with ``python media_server.py --port 8502`` or in-process via
+``start_media_server``. It has no authentication and binds to loopback by
+default; put it behind the same proxy as the app to expose it.
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import os
+import threading
+import urllib.parse
+import urllib.request
+from typing import Optional
+
+import tornado.web
+from tornado.httpserver import HTTPServer
+from tornado.netutil import bind_sockets
+
+from media import DEFAULT_BLOBS_DIR, VIDEO_EXTENSIONS, blob_sha
+
+MEDIA_ROOTS = ("uploaded_content", "videos", "assets")
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".webp", ".gif")
+MEDIA_EXTENSIONS = VIDEO_EXTENSIONS + IMAGE_EXTENSIONS
+DEFAULT_MEDIA_PORT = 8502
+# No authentication, so only reachable from this host unless bound wider on purpose
+DEFAULT_MEDIA_ADDRESS = "127.0.0.1"
+IMMUTABLE_CACHE_SECONDS = 365 * 24 * 3600
+
+class MediaFileHandler(tornado.web.StaticFileHandler):
+    """StaticFileHandler restricted to media files, with stat-based ETags.
+
+    Tornado's default ETag hashes the whole file on first request and keeps
+    that hash for the life of the process. Blobs already carry their hash in
+    the filename, so it is used directly; other files use mtime and size.
+    Blob URLs and ``?v=`` versioned URLs are cached as immutable. Anything
+    else is revalidated with the ETag on every use.
+    """
+
+    def initialize(self, path: str, blobs_dir: str = DEFAULT_BLOBS_DIR):
+        super().initialize(path)
+        self.blobs_dir = os.path.abspath(blobs_dir)
+
+    def validate_absolute_path(self, root: str, absolute_path: str) -> Optional[str]:
+        if not absolute_path.lower().endswith(MEDIA_EXTENSIONS):
+            raise tornado.web.HTTPError(404)
+        return super().validate_absolute_path(root, absolute_path)
+
+    def _blob_sha(self) -> Optional[str]:
+        return blob_sha(self.absolute_path, self.blobs_dir) if self.absolute_path else None
+
+    def compute_etag(self) -> Optional[str]:
+        sha256 = self._blob_sha()
+        if sha256:
+            return f'"{sha256}"'
+        stat = os.stat(self.absolute_path)
+        return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+    def get_cache_time(self, path: str, modified, mime_type: str) -> int:
+        if self._blob_sha() or "v" in self.request.arguments:
+            return IMMUTABLE_CACHE_SECONDS
+        return 0
+
+    def set_extra_headers(self, path: str):
+        if self._blob_sha() or "v" in self.request.arguments:
+            self.set_header("Cache-Control", f"public, max-age={IMMUTABLE_CACHE_SECONDS}, immutable")
+        else:
+            self.set_header("Cache-Control", "no-cache")
+
+class HealthHandler(tornado.web.RequestHandler):
+    def get(self):
+        self.write("ok")
+
+def make_app(base_dir: str = ".", blobs_dir: str = DEFAULT_BLOBS_DIR) -> tornado.web.Application:
+    blobs_dir = os.path.join(base_dir, blobs_dir)
+    routes = [(r"/healthz", HealthHandler)]
+    routes += [(rf"/{root}/(.*)", MediaFileHandler, {"path": os.path.join(base_dir, root), "blobs_dir": blobs_dir})
+               for root in MEDIA_ROOTS]
+    return tornado.web.Application(routes)
+
+def start_media_server(port: int = DEFAULT_MEDIA_PORT, address: str = DEFAULT_MEDIA_ADDRESS,
+                       base_dir: str = ".") -> threading.Thread:
+    """Serve media on a daemon thread with its own event loop.
+
+    The socket is bound in the calling thread, so a port that is already in
+    use raises OSError here rather than inside the thread.
+    """
+    sockets = bind_sockets(port, address)
+    app = make_app(base_dir)
+
+    async def serve():
+        HTTPServer(app).add_sockets(sockets)
+        await asyncio.Event().wait()
+
+    thread = threading.Thread(target=asyncio.run, args=(serve(),), name="media-server", daemon=True)
+    thread.start()
+    return thread
+
+def media_server_alive(base_url: str, timeout: float = 0.5) -> bool:
+    try:
+        with urllib.request.urlopen(f"{base_url.rstrip('/')}/healthz", timeout=timeout) as resp:
+            return resp.status == 200
+    except OSError:
+        return False
+
+def media_url(path: str, base_url: str, base_dir: str = ".") -> Optional[str]:
+    """URL for ``path`` on the media server, or None if it is not served.
+
+    Blob paths are already content-addressed. Other files get a ``?v=``
+    version from mtime and size, so a replaced file gets a new URL and
+    browsers can cache each version indefinitely.
+    """
+    abs_path = os.path.abspath(path)
+    rel = os.path.relpath(abs_path, os.path.abspath(base_dir))
+    parts = rel.split(os.sep)
+    if parts[0] not in MEDIA_ROOTS or ".." in parts or not rel.lower().endswith(MEDIA_EXTENSIONS):
+        return None
+    url = f"{base_url.rstrip('/')}/{urllib.parse.quote('/'.join(parts))}"
+    if blob_sha(abs_path, os.path.abspath(os.path.join(base_dir, DEFAULT_BLOBS_DIR))):
+        return url
+    try:
+        stat = os.stat(abs_path)
+    except OSError:
+        return None
+    return f"{url}?v={stat.st_mtime_ns:x}-{stat.st_size:x}"
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Serve Hourglass Fitness media with HTTP range support")
+    parser.add_argument("--port", type=int, default=DEFAULT_MEDIA_PORT)
+    parser.add_argument("--address", default=DEFAULT_MEDIA_ADDRESS, help="interface to bind (default: loopback only)")
+    parser.add_argument("--dir", default=".", help="app directory containing uploaded_content/, videos/, assets/")
+    args = parser.parse_args(argv)
+
+    start_media_server(args.port, args.address, args.dir).join()
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
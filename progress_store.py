@@ -0,0 +1,185 @@
+# Copyright © 2024-2025 [YOUR NAME]. All Rights Reserved.
+#
+# PROPRIETARY AND CONFIDENTIAL
+#
+# This file is part of Hourglass Fitness Transformation application.
+# Unauthorized copying, distribution, or modification of this file,
+# via any medium, is strictly prohibited.
+#
+# Contact: [your-email@example.com]
+# progress_store.py
+"""Per-user progress persistence.
+
+Each user gets a directory under user_data/progress/:
+
+* ``progress.json`` - the small documents (prefs, reminders, badges, ...),
+  replaced atomically and only when one of them changed;
+* ``<name>.jsonl`` - the growing entry lists (weight_entries,
+  progress_entries), one JSON object per line. Saves append only the entries
+  added since the last save, so a write costs the size of the change rather
+  than the whole history. A list whose saved part changed (shrunk, or an
+  entry edited in place) is rewritten in full; a digest of the saved entries
+  tells the two cases apart.
+
+Users never share a file, and writers in one process are serialized per user.
+Every save bumps the user's in-process generation; ``cached_progress`` keeps
+one parsed copy per user and generation, so sessions can tell whether their
+copy is current without touching the disk.
+"""
+from __future__ import annotations
+import hashlib
+import json
+import os
+import re
+import threading
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+from media import read_manifest, thaw, write_atomic, write_manifest
+
+DEFAULT_PROGRESS_DIR = os.path.join("user_data", "progress")
+DOC_FILENAME = "progress.json"
+ENTRY_LISTS = ("weight_entries", "progress_entries")
+
+_locks_guard = threading.Lock()
+_user_locks: Dict[str, threading.Lock] = {}
+_generations: Dict[str, int] = {}
+_cache: Dict[str, Tuple[int, Dict]] = {}
+
+def _user_lock(user_id: str) -> threading.Lock:
+    with _locks_guard:
+        return _user_locks.setdefault(user_id, threading.Lock())
+
+def user_dir(user_id: str, root: str = DEFAULT_PROGRESS_DIR) -> str:
+    safe = re.sub(r"[^A-Za-z0-9_.-]", "_", user_id).strip(".") or "default"
+    return os.path.join(root, safe)
+
+def _doc_path(user_id: str, root: str) -> str:
+    return os.path.join(user_dir(user_id, root), DOC_FILENAME)
+
+def _list_path(user_id: str, name: str, root: str) -> str:
+    return os.path.join(user_dir(user_id, root), f"{name}.jsonl")
+
+def _read_entries(path: str) -> List[Dict]:
+    entries = []
+    try:
+        with open(path, "r") as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    continue  # torn line from an interrupted append
+    except FileNotFoundError:
+        pass
+    return entries
+
+def _lines(entries: Sequence) -> List[str]:
+    return [json.dumps(e, separators=(",", ":"), default=str) + "\n" for e in entries]
+
+def _append_lines(path: str, lines: Sequence[str]) -> None:
+    if not lines:
+        return
+    with open(path, "a") as f:
+        f.write("".join(lines))
+        f.flush()
+        os.fsync(f.fileno())
+
+def _rewrite_lines(path: str, lines: Sequence[str]) -> None:
+    write_atomic(path, lambda f: f.writelines(lines))
+
+def list_state(entries: Sequence) -> Tuple[int, str]:
+    """(count, digest) of a list as saved; what ``save_progress`` tracks in ``synced``."""
+    lines = _lines(entries)
+    digest = hashlib.blake2b(digest_size=16)
+    for line in lines:
+        digest.update(line.encode())
+    return len(lines), digest.hexdigest()
+
+def has_progress(user_id: str, root: str = DEFAULT_PROGRESS_DIR) -> bool:
+    return os.path.isdir(user_dir(user_id, root))
+
+def load_progress(user_id: str, root: str = DEFAULT_PROGRESS_DIR,
+                  lists: Tuple[str, ...] = ENTRY_LISTS) -> Dict:
+    """The user's documents plus entry lists, as plain mutable objects."""
+    data = thaw(read_manifest(_doc_path(user_id, root), {}) or {})
+    for name in lists:
+        data[name] = _read_entries(_list_path(user_id, name, root))
+    return data
+
+def save_progress(user_id: str, docs: Mapping, lists: Optional[Mapping[str, List]] = None,
+                  synced: Optional[Dict[str, Tuple[int, str]]] = None,
+                  root: str = DEFAULT_PROGRESS_DIR) -> Dict[str, Tuple[int, str]]:
+    """Persist what changed and return the updated ``synced`` states.
+
+    ``synced`` maps each list name to the ``list_state`` of the caller's
+    entries already on disk. If those entries are unchanged only the ones past
+    them are appended, otherwise the list is rewritten. A list missing from
+    ``synced`` whose file exists is rewritten too. Pass the returned dict
+    back on the next save.
+    """
+    synced = dict(synced or {})
+    directory = user_dir(user_id, root)
+    with _user_lock(user_id):
+        os.makedirs(directory, exist_ok=True)
+        doc_path = _doc_path(user_id, root)
+        current = thaw(read_manifest(doc_path, {}) or {})
+        merged = dict(current, **thaw(docs))
+        if merged != current:
+            write_manifest(doc_path, merged)
+        for name, entries in (lists or {}).items():
+            path = _list_path(user_id, name, root)
+            lines = _lines(entries)
+            state = synced.get(name)
+            done, saved_digest = state or (0, None)
+            digest = hashlib.blake2b(digest_size=16)
+            for line in lines[:done]:
+                digest.update(line.encode())
+            if state is None and os.path.exists(path):
+                _rewrite_lines(path, lines)  # caller never saw the file; don't append a second copy
+            elif done <= len(lines) and (done == 0 or digest.hexdigest() == saved_digest):
+                _append_lines(path, lines[done:])
+            else:
+                _rewrite_lines(path, lines)
+            for line in lines[done:]:
+                digest.update(line.encode())
+            synced[name] = (len(lines), digest.hexdigest())
+        with _locks_guard:
+            _generations[user_id] = _generations.get(user_id, 0) + 1
+            _cache.pop(user_id, None)
+    return synced
+
+# ---- Process cache ----
+def generation(user_id: str) -> int:
+    """Number of saves of ``user_id``'s progress made by this process."""
+    with _locks_guard:
+        return _generations.get(user_id, 0)
+
+def cached_progress(user_id: str, root: str = DEFAULT_PROGRESS_DIR) -> Tuple[int, Dict]:
+    """(generation, data) for ``user_id``, read from disk once per generation.
+
+    ``data`` is a private mutable copy. Changes written by other processes are
+    picked up when this process next saves that user or restarts.
+    """
+    with _locks_guard:
+        gen = _generations.get(user_id, 0)
+        cached = _cache.get(user_id)
+    if cached is None or cached[0] != gen:
+        with _user_lock(user_id):
+            cached = (gen, load_progress(user_id, root))
+        with _locks_guard:
+            if _generations.get(user_id, 0) == gen:
+                _cache[user_id] = cached
+    return cached[0], thaw(cached[1])
+
+def migrate_legacy(path: str, user_id: str = "default", root: str = DEFAULT_PROGRESS_DIR,
+                   lists: Tuple[str, ...] = ENTRY_LISTS) -> bool:
+    """Seed ``user_id``'s store from the old shared user_progress.json.
+
+    Only runs while the user has no store yet; the legacy file is left alone.
+    """
+    if has_progress(user_id, root) or not os.path.exists(path):
+        return False
+    with open(path, "r") as f:
+        data = json.load(f)
+    docs = {k: v for k, v in data.items() if k not in lists}
+    save_progress(user_id, docs, {name: data.get(name) or [] for name in lists}, root=root)
+    return True
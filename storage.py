@@ -9,18 +9,45 @@
 # Contact: [your-email@example.com]
 # storage.py
 from __future__ import annotations
+import itertools
 import json
-from typing import Dict, Optional
+import os
+import tempfile
+import zlib
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 
+import numpy as np
 import pandas as pd
 from sqlalchemy import (
     Column, Integer, Float, String, create_engine, MetaData, Table,
-    select, and_, insert, update, delete
+    Boolean, Index, select, and_, or_, insert, delete, update, func, event, cast, union, inspect
 )
-from sqlalchemy.engine import Engine
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Connection, Engine
+
+_DB_PATH = os.environ.get("STORAGE_DB_PATH", "data.db")
+# Streamlit runs every session in its own script thread; the pool is sized so
+# a burst of concurrent reruns does not queue on connection checkout.
+_POOL_SIZE = int(os.environ.get("STORAGE_POOL_SIZE", "8"))
+_MAX_OVERFLOW = int(os.environ.get("STORAGE_MAX_OVERFLOW", "16"))
+_BUSY_TIMEOUT_S = float(os.environ.get("STORAGE_BUSY_TIMEOUT_S", "15"))
+_WORKOUT_LOG_CACHE_SIZE = int(os.environ.get("STORAGE_WORKOUT_LOG_CACHE_SIZE", "256"))
+
+# Applied to every new connection. WAL lets readers run alongside a writer;
+# synchronous=NORMAL is durable across application crashes in WAL mode.
+SQLITE_PRAGMAS: Dict[str, object] = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -16000,  # KiB, i.e. 16 MB page cache per connection
+    "temp_store": "MEMORY",
+    "busy_timeout": int(_BUSY_TIMEOUT_S * 1000),
+}
 
-_DB_PATH = "data.db"
 engine: Optional[Engine] = None
+read_engine: Optional[Engine] = None
 metadata = MetaData()
 
 # ---- Tables ----
@@ -53,34 +80,215 @@ daily_logs = Table(
     Column("notes", String, nullable=True),
     Column("photo_path", String, nullable=True),
     Column("on_target_flag", String, nullable=True),
+    Index("ux_daily_logs_user_date", "user_id", "date", unique=True),
 )
 
+# Progress photos: only rows with a photo, in date order per user
+Index("ix_daily_logs_photos", daily_logs.c.user_id, daily_logs.c.date,
+      sqlite_where=daily_logs.c.photo_path.isnot(None))
+
+DAILY_LOG_COLUMNS = [
+    "user_id", "date", "weight_kg", "water_l", "cal_in", "cal_out", "net_kcal",
+    "waist_in", "hips_in", "energy_1_10", "notes", "photo_path", "on_target_flag",
+]
+
 settings = Table(
     "settings", metadata,
     Column("user_id", String, primary_key=True),
     Column("macro_split_json", String, nullable=False),
 )
 
+workout_log = Table(
+    "workout_log", metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("user_id", String, nullable=False, server_default="default"),
+    Column("date", String, nullable=False),  # ISO date string
+    Column("exercise_id", String, nullable=False),
+    Column("exercise", String, nullable=False),
+    Column("set", Integer, nullable=False),
+    Column("reps", Integer, nullable=False),
+    Column("weight", Float, nullable=False),
+    Column("completed", Boolean, nullable=False),
+    Index("ix_workout_log_user_date_exercise", "user_id", "date", "exercise_id"),
+)
+
+WORKOUT_LOG_COLUMNS = ["date", "exercise_id", "exercise", "set", "reps", "weight", "completed"]
+
+# One-off markers, e.g. which legacy files have been migrated
+storage_meta = Table(
+    "storage_meta", metadata,
+    Column("key", String, primary_key=True),
+    Column("value", String, nullable=False),
+)
+
 # ---- Init ----
-def init_storage():
-    global engine
+def _make_engine(db_path: str, pool_size: int, pragmas: Dict[str, object], read_only: bool) -> Engine:
+    eng = create_engine(
+        f"sqlite:///{db_path}",
+        future=True,
+        pool_size=pool_size,
+        max_overflow=_MAX_OVERFLOW,
+        connect_args={"check_same_thread": False, "timeout": _BUSY_TIMEOUT_S},
+    )
+
+    @event.listens_for(eng, "connect")
+    def _set_pragmas(dbapi_conn, _record):
+        cursor = dbapi_conn.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        if read_only:
+            cursor.execute("PRAGMA query_only=ON")
+        cursor.close()
+
+    return eng
+
+def init_storage(db_path: Optional[str] = None, pool_size: Optional[int] = None,
+                 pragmas: Optional[Dict[str, object]] = None):
+    """Create the shared write and read-only engines (idempotent).
+
+    ``pragmas`` entries override ``SQLITE_PRAGMAS``; the pool size defaults
+    to ``STORAGE_POOL_SIZE``.
+    """
+    global engine, read_engine
     if engine is None:
-        engine = create_engine(f"sqlite:///{_DB_PATH}", future=True)
+        path = db_path or _DB_PATH
+        size = pool_size or _POOL_SIZE
+        merged = {**SQLITE_PRAGMAS, **(pragmas or {})}
+        engine = _make_engine(path, size, merged, read_only=False)
         metadata.create_all(engine)
+        _migrate_schema(engine)
+        # journal_mode is persistent in the file, so the reader only needs
+        # the per-connection pragmas
+        reader_pragmas = {k: v for k, v in merged.items() if k != "journal_mode"}
+        read_engine = _make_engine(path, size, reader_pragmas, read_only=True)
+
+def _migrate_schema(eng: Engine):
+    """create_all skips columns and indexes of tables that already exist, so
+    add any that older databases are missing. Workout log rows from before
+    the user_id column belong to "default". Duplicate (user_id, date) daily
+    logs written before the unique index existed are collapsed to the newest
+    row first; that scan only runs while the unique index is still missing."""
+    with eng.begin() as conn:
+        if "user_id" not in {col["name"] for col in inspect(conn).get_columns(workout_log.name)}:
+            conn.exec_driver_sql("ALTER TABLE workout_log ADD COLUMN user_id VARCHAR NOT NULL DEFAULT 'default'")
+        existing = {ix["name"] for ix in inspect(conn).get_indexes(daily_logs.name)}
+        if "ux_daily_logs_user_date" not in existing:
+            conn.execute(delete(daily_logs).where(daily_logs.c.id.not_in(
+                select(func.max(daily_logs.c.id)).group_by(daily_logs.c.user_id, daily_logs.c.date)
+            )))
+    for table in (daily_logs, workout_log):
+        for index in table.indexes:
+            index.create(eng, checkfirst=True)
+
+def _upsert(table: Table, conflict_cols: Iterable[str], update_cols: Iterable[str]):
+    stmt = sqlite_insert(table)
+    return stmt.on_conflict_do_update(
+        index_elements=list(conflict_cols),
+        set_={name: stmt.excluded[name] for name in update_cols},
+    )
+
+@contextmanager
+def _read() -> Iterator[Connection]:
+    """Connection for queries. Never opens a write transaction, so in WAL
+    mode it does not block (or wait on) writers."""
+    with read_engine.connect() as conn:
+        yield conn
+
+# ---- Workout log ----
+# (user_id, date, exercise_id) -> frame, least recently used first out past
+# _WORKOUT_LOG_CACHE_SIZE. Every append drops the keys it touches and bumps one
+# global write counter; a read only fills the cache if no append happened while
+# it ran, so cached frames are never stale and nothing grows per key written.
+_workout_log_lock = threading.Lock()
+_workout_log_writes = 0
+_workout_log_cache: "OrderedDict[Tuple[str, str, str], pd.DataFrame]" = OrderedDict()
+
+def _invalidate_workout_log(keys: Optional[Iterable[Tuple[str, str, str]]] = None):
+    """Drop ``keys`` (all when None) from the cache after a write."""
+    global _workout_log_writes
+    with _workout_log_lock:
+        _workout_log_writes += 1
+        if keys is None:
+            _workout_log_cache.clear()
+        for key in keys or ():
+            _workout_log_cache.pop(key, None)
+
+def append_workout_sets(rows: Iterable[Dict], user_id: str = "default") -> int:
+    """Append ``user_id``'s set rows to the workout log in a single transaction.
+
+    Rows are only ever inserted, never rewritten, so the cost of a save depends
+    on the number of sets being saved and not on the size of the history.
+    """
+    payload = [dict({k: r[k] for k in WORKOUT_LOG_COLUMNS}, user_id=user_id) for r in rows]
+    if not payload:
+        return 0
+    with engine.begin() as conn:
+        conn.execute(insert(workout_log), payload)
+    _invalidate_workout_log({(user_id, r["date"], r["exercise_id"]) for r in payload})
+    return len(payload)
+
+def get_workout_log(date: str, exercise_id: str, user_id: str = "default") -> pd.DataFrame:
+    """Sets ``user_id`` logged for one exercise on one date, served through the
+    (user_id, date, exercise_id) index and cached until the next write to that
+    key. Callers get their own copy of the cached frame."""
+    key = (user_id, date, exercise_id)
+    with _workout_log_lock:
+        writes = _workout_log_writes
+        cached = _workout_log_cache.get(key)
+        if cached is not None:
+            _workout_log_cache.move_to_end(key)
+            return cached.copy()
+    with _read() as conn:
+        rows = conn.execute(
+            select(*[workout_log.c[name] for name in WORKOUT_LOG_COLUMNS]).where(
+                and_(workout_log.c.user_id == user_id, workout_log.c.date == date,
+                     workout_log.c.exercise_id == exercise_id)
+            ).order_by(workout_log.c.id)
+        ).all()
+    df = pd.DataFrame(rows, columns=WORKOUT_LOG_COLUMNS)
+    with _workout_log_lock:
+        if _workout_log_writes == writes:
+            _workout_log_cache[key] = df
+            while len(_workout_log_cache) > _WORKOUT_LOG_CACHE_SIZE:
+                _workout_log_cache.popitem(last=False)
+    return df.copy()
+
+def import_workout_log_csv(path: str, chunksize: int = 5000, user_id: str = "default") -> int:
+    """One-time migration of a legacy workout_log.csv into ``user_id``'s workout log.
+
+    Only imports while the table is empty. The import is recorded in
+    ``storage_meta`` in the same transaction, so it never runs twice; the CSV
+    itself is left where it is.
+    """
+    if not os.path.exists(path):
+        return 0
+    meta_key = f"imported:{os.path.basename(path)}"
+    with engine.begin() as conn:
+        if conn.execute(select(storage_meta.c.value).where(storage_meta.c.key == meta_key)).first():
+            return 0
+        total = 0
+        if not conn.execute(select(func.count()).select_from(workout_log)).scalar():
+            for chunk in pd.read_csv(path, chunksize=chunksize):
+                chunk = chunk.reindex(columns=WORKOUT_LOG_COLUMNS).assign(user_id=user_id)
+                chunk["completed"] = chunk["completed"].astype(str).str.lower().isin(["true", "1"])
+                chunk[["set", "reps"]] = chunk[["set", "reps"]].fillna(0).astype(int)
+                chunk["weight"] = chunk["weight"].fillna(0.0).astype(float)
+                records = chunk.to_dict("records")
+                conn.execute(insert(workout_log), records)
+                total += len(records)
+        conn.execute(insert(storage_meta), {"key": meta_key, "value": str(total)})
+    if total:
+        _invalidate_workout_log()
+    return total
 
 # ---- Profiles ----
 def save_profile(**kwargs):
+    stmt = _upsert(profiles, ["user_id"], [k for k in kwargs if k != "user_id"])
     with engine.begin() as conn:
-        exists = conn.execute(
-            select(profiles.c.user_id).where(profiles.c.user_id == kwargs["user_id"])
-        ).first()
-        if exists:
-            conn.execute(update(profiles).where(profiles.c.user_id == kwargs["user_id"]).values(**kwargs))
-        else:
-            conn.execute(insert(profiles).values(**kwargs))
+        conn.execute(stmt, kwargs)
 
 def get_profile(user_id: str) -> Optional[Dict]:
-    with engine.begin() as conn:
+    with _read() as conn:
         row = conn.execute(
             select(profiles).where(profiles.c.user_id == user_id)
         ).mappings().first()
@@ -89,17 +297,12 @@ def get_profile(user_id: str) -> Optional[Dict]:
 # ---- Settings ----
 def save_settings(user_id: str, settings_dict: Dict):
     payload = json.dumps(settings_dict)
+    stmt = _upsert(settings, ["user_id"], ["macro_split_json"])
     with engine.begin() as conn:
-        exists = conn.execute(
-            select(settings.c.user_id).where(settings.c.user_id == user_id)
-        ).first()
-        if exists:
-            conn.execute(update(settings).where(settings.c.user_id == user_id).values(macro_split_json=payload))
-        else:
-            conn.execute(insert(settings).values(user_id=user_id, macro_split_json=payload))
+        conn.execute(stmt, {"user_id": user_id, "macro_split_json": payload})
 
 def get_settings(user_id: str) -> Optional[Dict]:
-    with engine.begin() as conn:
+    with _read() as conn:
         row = conn.execute(
             select(settings.c.macro_split_json).where(settings.c.user_id == user_id)
         ).first()
@@ -110,6 +313,7 @@ def save_daily_log(
     user_id: str, date: str, weight_kg: float, water_l: float, cal_in: int, cal_out: int,
     waist_in: float, hips_in: float, energy_1_10: int, notes: str, photo_path: str, on_target_flag: str
 ):
+    """Upsert one day's log. ``photo_path=None`` keeps a photo already attached to that day."""
     net = int(cal_in - cal_out)
     payload = dict(
         user_id=user_id, date=date, weight_kg=weight_kg, water_l=water_l,
@@ -117,27 +321,144 @@ def save_daily_log(
         waist_in=waist_in, hips_in=hips_in, energy_1_10=energy_1_10,
         notes=notes, photo_path=photo_path, on_target_flag=on_target_flag,
     )
+    update_cols = [c for c in DAILY_LOG_COLUMNS[2:] if c != "photo_path" or photo_path is not None]
     with engine.begin() as conn:
-        existing = conn.execute(
-            select(daily_logs.c.id).where(and_(daily_logs.c.user_id == user_id, daily_logs.c.date == date))
-        ).first()
-        if existing:
-            conn.execute(update(daily_logs).where(daily_logs.c.id == existing[0]).values(**payload))
-        else:
-            conn.execute(insert(daily_logs).values(**payload))
+        conn.execute(_upsert(daily_logs, ["user_id", "date"], update_cols), payload)
 
-def get_logs(user_id: str, start: str, end: str) -> pd.DataFrame:
+def save_daily_logs(rows: Iterable[Dict]) -> int:
+    """Bulk upsert of daily logs (e.g. imports) in one transaction.
+
+    The single prepared INSERT ... ON CONFLICT statement is executed for all
+    rows at once; ``net_kcal`` is derived when missing and absent optional
+    columns are stored as NULL. A later row for the same (user_id, date) wins.
+    """
+    payload = []
+    for r in rows:
+        row = {name: r.get(name) for name in DAILY_LOG_COLUMNS}
+        if row["net_kcal"] is None:
+            row["net_kcal"] = int(row["cal_in"] - row["cal_out"])
+        payload.append(row)
+    if not payload:
+        return 0
     with engine.begin() as conn:
-        rows = conn.execute(
-            select(daily_logs).where(
-                and_(daily_logs.c.user_id == user_id, daily_logs.c.date >= start, daily_logs.c.date <= end)
-            )
-        ).mappings().all()
+        conn.execute(_upsert(daily_logs, ["user_id", "date"], DAILY_LOG_COLUMNS[2:]), payload)
+    return len(payload)
+
+_UNIX_EPOCH_JULIAN_DAY = 2440587.5
+
+def _column_array(column: Column, values: Sequence) -> np.ndarray:
+    """Typed array for one fetched column; nullable integers stay nullable."""
+    if isinstance(column.type, Float):
+        return np.array(values, dtype=np.float64)
+    if isinstance(column.type, Integer):
+        if column.nullable and None in values:
+            return pd.array(values, dtype="Int64")
+        return np.array(values, dtype=np.int64)
+    return np.array(values, dtype=object)
+
+def get_logs(user_id: str, start: str, end: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """Daily logs for ``user_id`` between ``start`` and ``end`` (inclusive), by date.
+
+    Rows are fetched as plain tuples and transposed straight into typed
+    column arrays; dates come back from SQL as integer day numbers. Pass
+    ``columns`` to project a subset - ``date`` is always included.
+    """
+    names = [c.name for c in daily_logs.c] if columns is None else list(columns)
+    names = [n for n in names if n != "date"]
+    day_number = cast(func.julianday(daily_logs.c.date) - _UNIX_EPOCH_JULIAN_DAY, Integer)
+    stmt = select(day_number, *[daily_logs.c[n] for n in names]).where(
+        and_(daily_logs.c.user_id == user_id, daily_logs.c.date >= start, daily_logs.c.date <= end)
+    ).order_by(daily_logs.c.date)
+    with _read() as conn:
+        rows = conn.execute(stmt).all()
     if not rows:
         return pd.DataFrame()
-    df = pd.DataFrame([dict(r) for r in rows])
-    df["date"] = pd.to_datetime(df["date"])
-    return df.sort_values("date")
+    fetched = list(zip(*rows))
+    data = {"date": pd.to_datetime(np.array(fetched[0], dtype=np.int64), unit="D")}
+    for name, values in zip(names, fetched[1:]):
+        data[name] = _column_array(daily_logs.c[name], values)
+    return pd.DataFrame(data)
+
+def get_active_days(user_id: str) -> np.ndarray:
+    """Sorted distinct day numbers on which ``user_id`` has a daily log or a completed set."""
+    def day_number(column):
+        return cast(func.julianday(column) - _UNIX_EPOCH_JULIAN_DAY, Integer)
+
+    stmt = union(
+        select(day_number(daily_logs.c.date)).where(daily_logs.c.user_id == user_id),
+        select(day_number(workout_log.c.date)).where(
+            and_(workout_log.c.user_id == user_id, workout_log.c.completed.is_(True))
+        ),
+    )
+    with _read() as conn:
+        days = np.array(conn.execute(stmt).scalars().all(), dtype=np.int64)
+    days.sort()
+    return days
+
+# ---- Progress photos ----
+PHOTO_PAGE_SIZE = 12
+
+def get_daily_log_photo(user_id: str, date: str) -> Optional[str]:
+    with _read() as conn:
+        return conn.execute(
+            select(daily_logs.c.photo_path).where(daily_logs.c.user_id == user_id, daily_logs.c.date == date)
+        ).scalar()
+
+def set_daily_log_photo(user_id: str, date: str, photo_path: Optional[str]) -> bool:
+    """Attach (or with None, detach) a photo to an existing daily log; False if there is no log that day."""
+    with engine.begin() as conn:
+        result = conn.execute(
+            update(daily_logs)
+            .where(daily_logs.c.user_id == user_id, daily_logs.c.date == date)
+            .values(photo_path=photo_path)
+        )
+    return result.rowcount > 0
+
+def _photo_query(user_id: str):
+    return (select(daily_logs.c.date, daily_logs.c.photo_path)
+            .where(daily_logs.c.user_id == user_id, daily_logs.c.photo_path.isnot(None)))
+
+def get_photo_page(user_id: str, before: Optional[str] = None, limit: int = PHOTO_PAGE_SIZE) -> List[Tuple[str, str]]:
+    """(date, photo_path) pairs, newest first, strictly before ``before``.
+
+    Keyset-paged over the partial photo index: pass the last date of one page
+    as ``before`` for the next. Every page is one bounded index range scan,
+    however many photos or logs a user has.
+    """
+    stmt = _photo_query(user_id)
+    if before is not None:
+        stmt = stmt.where(daily_logs.c.date < before)
+    with _read() as conn:
+        rows = conn.execute(stmt.order_by(daily_logs.c.date.desc()).limit(limit)).all()
+    return [tuple(r) for r in rows]
+
+def get_photo_on_or_before(user_id: str, date: str) -> Optional[Tuple[str, str]]:
+    with _read() as conn:
+        row = conn.execute(
+            _photo_query(user_id).where(daily_logs.c.date <= date).order_by(daily_logs.c.date.desc()).limit(1)
+        ).first()
+    return tuple(row) if row else None
+
+def get_first_photo(user_id: str) -> Optional[Tuple[str, str]]:
+    with _read() as conn:
+        row = conn.execute(_photo_query(user_id).order_by(daily_logs.c.date).limit(1)).first()
+    return tuple(row) if row else None
+
+def iter_photo_paths(chunksize: int = 5000) -> Iterator[Tuple[str, str, str]]:
+    """(user_id, date, photo_path) for every photo of every user, keyset-paged."""
+    cols = (daily_logs.c.user_id, daily_logs.c.date, daily_logs.c.photo_path)
+    last = None
+    while True:
+        stmt = select(*cols).where(daily_logs.c.photo_path.isnot(None))
+        if last is not None:
+            stmt = stmt.where(or_(daily_logs.c.user_id > last[0],
+                                  and_(daily_logs.c.user_id == last[0], daily_logs.c.date > last[1])))
+        with _read() as conn:
+            rows = conn.execute(stmt.order_by(daily_logs.c.user_id, daily_logs.c.date).limit(chunksize)).all()
+        yield from (tuple(r) for r in rows)
+        if len(rows) < chunksize:
+            return
+        last = rows[-1]
 
 # ---- Admin ----
 def delete_all_user_data(user_id: str):
@@ -145,9 +466,85 @@ def delete_all_user_data(user_id: str):
         conn.execute(delete(daily_logs).where(daily_logs.c.user_id == user_id))
         conn.execute(delete(profiles).where(profiles.c.user_id == user_id))
         conn.execute(delete(settings).where(settings.c.user_id == user_id))
+        conn.execute(delete(workout_log).where(workout_log.c.user_id == user_id))
+    _invalidate_workout_log()
 
-def export_logs_csv(user_id: str) -> str:
-    df = get_logs(user_id, "1900-01-01", "2999-12-31")
-    path = f"{user_id}_logs.csv"
-    df.to_csv(path, index=False)
+# ---- Export ----
+EXPORT_FORMATS = ("csv", "csv.gz", "parquet")
+EXPORT_CHUNK_ROWS = 5000
+
+def iter_log_chunks(user_id: str, chunksize: int = EXPORT_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """Page through a user's daily logs in date order, ``chunksize`` rows at a time.
+
+    Uses keyset pagination on the unique (user_id, date) index, so every page
+    is an index range scan and only one page is ever held in memory.
+    """
+    names = [c.name for c in daily_logs.c]
+    last_date = None
+    while True:
+        cond = daily_logs.c.user_id == user_id
+        if last_date is not None:
+            cond = and_(cond, daily_logs.c.date > last_date)
+        with _read() as conn:
+            rows = conn.execute(
+                select(daily_logs).where(cond).order_by(daily_logs.c.date).limit(chunksize)
+            ).all()
+        if not rows:
+            return
+        yield pd.DataFrame.from_records(rows, columns=names)
+        if len(rows) < chunksize:
+            return
+        last_date = rows[-1].date
+
+def iter_logs_csv(user_id: str, compress: bool = False, chunksize: int = EXPORT_CHUNK_ROWS) -> Iterator[bytes]:
+    """CSV (optionally gzip) export as a stream of byte chunks, header first."""
+    gz = zlib.compressobj(wbits=31) if compress else None
+    header = ",".join(c.name for c in daily_logs.c) + "\n"
+    pieces = (chunk.to_csv(index=False, header=False) for chunk in iter_log_chunks(user_id, chunksize))
+    for text in itertools.chain([header], pieces):
+        data = text.encode("utf-8")
+        if gz is not None:
+            data = gz.compress(data)
+        if data:
+            yield data
+    if gz is not None:
+        yield gz.flush()
+
+def _parquet_schema():
+    import pyarrow as pa
+    types = {Integer: pa.int64(), Float: pa.float64(), String: pa.string()}
+    return pa.schema([(c.name, types[type(c.type)]) for c in daily_logs.c])
+
+def export_logs(user_id: str, path: Optional[str] = None, fmt: str = "csv",
+                chunksize: int = EXPORT_CHUNK_ROWS) -> str:
+    """Write a user's full daily-log history to ``path`` chunk by chunk.
+
+    ``fmt`` is one of ``EXPORT_FORMATS``; Parquet needs pyarrow. Memory stays
+    bounded by ``chunksize`` whatever the history length. The file is written
+    to a uniquely named temporary file and renamed into place when complete.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    path = path or f"{user_id}_logs.{fmt}"
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    os.close(fd)
+    try:
+        if fmt == "parquet":
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            schema = _parquet_schema()
+            with pq.ParquetWriter(tmp_path, schema) as writer:
+                for chunk in iter_log_chunks(user_id, chunksize):
+                    writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+        else:
+            with open(tmp_path, "wb") as f:
+                for data in iter_logs_csv(user_id, compress=(fmt == "csv.gz"), chunksize=chunksize):
+                    f.write(data)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
     return path
+
+def export_logs_csv(user_id: str) -> str:
+    return export_logs(user_id, f"{user_id}_logs.csv", "csv")
@@ -0,0 +1,115 @@
+# Copyright © 2024-2025 [YOUR NAME]. All Rights Reserved.
+#
+# PROPRIETARY AND CONFIDENTIAL
+#
+# This file is part of Hourglass Fitness Transformation application.
+# Unauthorized copying, distribution, or modification of this file,
+# via any medium, is strictly prohibited.
+#
+# Contact: [your-email@example.com]
+# streaks.py
+"""Activity streaks over distinct active days.
+
+Days are integer day numbers (days since 1970-01-01, the same numbering
+storage.get_logs uses). The full history is reduced once, vectorized, to a
+``StreakState``; after that each newly logged day updates it in O(1). A streak
+is still current while its last day is today or yesterday.
+"""
+from __future__ import annotations
+import threading
+from datetime import date, datetime
+from typing import Callable, Dict, Iterable, Optional
+
+import numpy as np
+
+def day_number(value) -> int:
+    """Day number of a date, datetime or ISO date string."""
+    if isinstance(value, datetime):
+        value = value.date()
+    if not isinstance(value, date):
+        value = date.fromisoformat(str(value)[:10])
+    return value.toordinal() - date(1970, 1, 1).toordinal()
+
+def day_numbers(values: Iterable) -> np.ndarray:
+    """Vectorized ``day_number`` for ISO date strings; blanks are dropped."""
+    values = [str(v)[:10] for v in values if v]
+    return np.array(values, dtype="datetime64[D]").astype(np.int64)
+
+def day_iso(day: int) -> str:
+    return date.fromordinal(day + date(1970, 1, 1).toordinal()).isoformat()
+
+class StreakState:
+    """Current run and longest run over a set of active days."""
+
+    __slots__ = ("days", "last_day", "run", "longest")
+
+    def __init__(self, days: Iterable[int] = ()):
+        self.days = set(int(d) for d in days)
+        self._rebuild()
+
+    def _rebuild(self):
+        days = np.fromiter(self.days, dtype=np.int64, count=len(self.days))
+        days.sort()
+        if days.size == 0:
+            self.last_day, self.run, self.longest = None, 0, 0
+            return
+        starts = np.flatnonzero(np.diff(days) != 1) + 1  # index where each later run begins
+        runs = np.diff(np.concatenate(([0], starts, [days.size])))
+        self.last_day = int(days[-1])
+        self.run = int(runs[-1])
+        self.longest = int(runs.max())
+
+    def add_day(self, day: int):
+        """Record an active day; O(1) unless it is back-dated before the last day."""
+        day = int(day)
+        if day in self.days:
+            return
+        self.days.add(day)
+        if self.last_day is None or day > self.last_day + 1:
+            self.run = 1
+        elif day == self.last_day + 1:
+            self.run += 1
+        else:
+            self._rebuild()  # back-dated entry may join two runs
+            return
+        self.last_day = day
+        self.longest = max(self.longest, self.run)
+
+    def current(self, today: Optional[int] = None) -> int:
+        today = day_number(date.today()) if today is None else today
+        if self.last_day is None or today - self.last_day > 1:
+            return 0
+        return self.run
+
+    def as_dict(self, today: Optional[int] = None) -> Dict:
+        return {
+            "current": self.current(today),
+            "longest": self.longest,
+            "last_date": day_iso(self.last_day) if self.last_day is not None else None,
+            "active_days": len(self.days),
+        }
+
+# ---- Per-user state ----
+# Built from the full history on first use in the process, then kept current
+# by record_activity as days are logged.
+_lock = threading.Lock()
+_states: Dict[str, StreakState] = {}
+
+def streak_stats(user_id: str, load_days: Callable[[], Iterable[int]], today: Optional[int] = None) -> Dict:
+    """Streak summary for ``user_id``; ``load_days`` runs only the first time."""
+    with _lock:  # held while building, so no record_activity can slip past the load
+        state = _states.get(user_id)
+        if state is None:
+            state = _states[user_id] = StreakState(load_days())
+        return state.as_dict(today)
+
+def record_activity(user_id: str, day: int):
+    """Add ``day`` to the user's state if it is loaded; an unloaded one sees it when built."""
+    with _lock:
+        state = _states.get(user_id)
+        if state is not None:
+            state.add_day(day)
+
+def forget(user_id: str):
+    with _lock:
+        _states.pop(user_id, None)
@@ -0,0 +1,81 @@
+# Copyright © 2024-2025 [YOUR NAME]. All Rights Reserved.
+#
+# PROPRIETARY AND CONFIDENTIAL
+#
+# This file is part of Hourglass Fitness Transformation application.
+# Unauthorized copying, distribution, or modification of this file,
+# via any medium, is strictly prohibited.
+#
+# Contact: [your-email@example.com]
+# tests/test_badges.py
+from datetime import datetime
+
+from badges import (
+    GLUTE_WINDOW_DAYS, HYDRATION_WINDOW_DAYS, evaluate, metrics, new_counters, record_checkin, record_sets,
+    set_longest_streak,
+)
+
+EVENING = datetime(2025, 1, 1, 18)
+MORNING = datetime(2025, 1, 1, 7)
+RULES = [
+    {"key": "glute_grind", "metrics": ("glute_sets_2wk",), "rule": lambda s: s["glute_sets_2wk"] >= 12},
+    {"key": "hydration_pro", "metrics": ("hydration7",), "rule": lambda s: s["hydration7"]},
+    {"key": "first_week", "metrics": ("longest",), "rule": lambda s: s["longest"] >= 7},
+]
+
+def test_glute_sets_count_changes_only():
+    counters = new_counters()
+    # Saving a 3-set Hip Thrust after each set credits +1 each time
+    for _ in range(3):
+        record_sets(counters, 100, "Hip Thrust", 1, EVENING)
+    assert metrics(counters, 100)["glute_sets_2wk"] == 3
+    assert record_sets(counters, 100, "Hip Thrust", 0, EVENING) == set()
+    record_sets(counters, 100, "Hip Thrust", -1, EVENING)
+    assert metrics(counters, 100)["glute_sets_2wk"] == 2
+
+def test_glute_window_drops_old_days():
+    counters = new_counters()
+    record_sets(counters, 100, "Glute Bridge", 10, EVENING)
+    record_sets(counters, 100 + GLUTE_WINDOW_DAYS, "Glute Bridge", 2, EVENING)
+    assert counters["glute_sets"] == {str(100 + GLUTE_WINDOW_DAYS): 2}
+
+def test_non_glute_sets_ignored():
+    counters = new_counters()
+    assert record_sets(counters, 100, "Lat Pulldown", 3, EVENING) == set()
+    assert metrics(counters, 100)["glute_sets_2wk"] == 0
+
+def test_morning_workouts_once_per_day():
+    counters = new_counters()
+    assert record_sets(counters, 100, "Lat Pulldown", 1, MORNING) == {"morning_workouts"}
+    assert record_sets(counters, 100, "Lat Pulldown", 1, MORNING) == set()
+    record_sets(counters, 101, "Lat Pulldown", -1, MORNING)
+    assert counters["morning_workouts"] == 1
+
+def test_hydration_needs_every_day_of_the_window():
+    counters = new_counters()
+    for day in range(100, 100 + HYDRATION_WINDOW_DAYS - 1):
+        record_checkin(counters, day, 2.5)
+    today = 100 + HYDRATION_WINDOW_DAYS - 1
+    assert not metrics(counters, today)["hydration7"]
+    record_checkin(counters, today, 2.0)
+    assert metrics(counters, today)["hydration7"]
+
+def test_evaluate_checks_changed_rules_and_never_revokes():
+    counters = new_counters()
+    earned = {}
+    changed = record_sets(counters, 100, "Hip Thrust", 12, EVENING)
+    assert evaluate(counters, earned, RULES, changed, 100, EVENING) == ["glute_grind"]
+    assert earned["glute_grind"] == EVENING.isoformat(timespec="seconds")
+    # Out of the window now, but earned badges stay
+    assert evaluate(counters, earned, RULES, {"glute_sets_2wk"}, 100 + GLUTE_WINDOW_DAYS) == []
+    assert "glute_grind" in earned
+    # Only rules depending on a changed metric are evaluated
+    set_longest_streak(counters, 7)
+    assert evaluate(counters, earned, RULES, set(), 100) == []
+    assert evaluate(counters, earned, RULES, {"longest"}, 100) == ["first_week"]
+
+def test_set_longest_streak_only_grows():
+    counters = new_counters()
+    assert set_longest_streak(counters, 5) == {"longest"}
+    assert set_longest_streak(counters, 3) == set()
+    assert counters["longest"] == 5
@@ -0,0 +1,89 @@
+# Copyright © 2024-2025 [YOUR NAME]. All Rights Reserved.
+#
+# PROPRIETARY AND CONFIDENTIAL
+#
+# This file is part of Hourglass Fitness Transformation application.
+# Unauthorized copying, distribution, or modification of this file,
+# via any medium, is strictly prohibited.
+#
+# Contact: [your-email@example.com]
+# tests/test_faststart.py
+import struct
+
+import media
+from media import faststart
+
+def box(box_type: bytes, body: bytes) -> bytes:
+    return struct.pack(">I4s", len(body) + 8, box_type) + body
+
+def box64(box_type: bytes, body: bytes) -> bytes:
+    return struct.pack(">I4sQ", 1, box_type, len(body) + 16) + body
+
+def stco(offsets) -> bytes:
+    return box(b"stco", struct.pack(f">II{len(offsets)}I", 0, len(offsets), *offsets))
+
+def moov_body(chunk_box: bytes) -> bytes:
+    return box(b"trak", box(b"mdia", box(b"minf", box(b"stbl", chunk_box))))
+
+def top_level(data: bytes):
+    return [(t, offset, header, size) for t, offset, header, size in media._iter_boxes(data, 0, len(data))]
+
+def chunk_offsets(data: bytes, start: int, end: int):
+    """(box type, offsets) of the first stco/co64 under data[start:end]."""
+    for box_type, offset, header, size in media._iter_boxes(data, start, end):
+        if box_type in media._MP4_CONTAINERS:
+            found = chunk_offsets(data, offset + header, offset + size)
+            if found:
+                return found
+        elif box_type in (b"stco", b"co64"):
+            count = struct.unpack_from(">I", data, offset + header + 4)[0]
+            fmt = "Q" if box_type == b"co64" else "I"
+            return box_type, list(struct.unpack_from(f">{count}{fmt}", data, offset + header + 8))
+    return None
+
+def file_offsets(data: bytes):
+    _, offset, header, size = next(b for b in top_level(data) if b[0] == b"moov")
+    return chunk_offsets(data, offset + header, offset + size)[1]
+
+def test_moov_at_end_round_trip(tmp_path):
+    ftyp = box(b"ftyp", b"isom\0\0\0\0")
+    mdat_start = len(ftyp)
+    mdat = box(b"mdat", b"AAAABBBB")
+    moov = box(b"moov", moov_body(stco([mdat_start + 8, mdat_start + 12])))
+    path = tmp_path / "clip.mp4"
+    path.write_bytes(ftyp + mdat + moov)
+
+    assert faststart(str(path))
+    data = path.read_bytes()
+    assert [b[0] for b in top_level(data)] == [b"ftyp", b"moov", b"mdat"]
+    assert [data[o:o + 4] for o in file_offsets(data)] == [b"AAAA", b"BBBB"]
+    assert not faststart(str(path))  # already faststart
+
+def test_offsets_after_a_resized_moov(tmp_path):
+    # 64-bit moov header is dropped on rewrite, so the mdat after it moves too
+    ftyp = box(b"ftyp", b"isom\0\0\0\0")
+    first = box(b"mdat", b"AAAA")
+    placeholder = box64(b"moov", moov_body(stco([0, 0])))
+    second_start = len(ftyp) + len(first) + len(placeholder)
+    moov = box64(b"moov", moov_body(stco([len(ftyp) + 8, second_start + 8])))
+    second = box(b"mdat", b"CCCC")
+    path = tmp_path / "clip.mp4"
+    path.write_bytes(ftyp + first + moov + second)
+
+    assert faststart(str(path))
+    data = path.read_bytes()
+    assert [b[0] for b in top_level(data)] == [b"ftyp", b"moov", b"mdat", b"mdat"]
+    assert [data[o:o + 4] for o in file_offsets(data)] == [b"AAAA", b"CCCC"]
+
+def test_stco_widened_to_co64():
+    insert_at = 100
+    moov_start = 0xFFFFFFF0
+    near_end = moov_start - 4
+    moov = box(b"moov", moov_body(stco([insert_at - 50, near_end])))
+
+    new_moov = media._relocated_moov(moov, 8, insert_at, moov_start)
+
+    box_type, offsets = chunk_offsets(new_moov, 8, len(new_moov))
+    assert box_type == b"co64"
+    assert len(new_moov) == len(moov) + 8  # two offsets, 4 bytes wider each
+    assert offsets == [insert_at - 50, near_end + len(new_moov)]
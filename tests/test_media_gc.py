@@ -0,0 +1,55 @@
+# Copyright © 2024-2025 [YOUR NAME]. All Rights Reserved.
+#
+# PROPRIETARY AND CONFIDENTIAL
+#
+# This file is part of Hourglass Fitness Transformation application.
+# Unauthorized copying, distribution, or modification of this file,
+# via any medium, is strictly prohibited.
+#
+# Contact: [your-email@example.com]
+# tests/test_media_gc.py
+import io
+import os
+import time
+
+import pytest
+
+import media_gc
+from media import store_blob, write_manifest
+from media_gc import MediaLayout, fsck
+
+@pytest.fixture
+def media_tree(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(media_gc, "STORAGE_AVAILABLE", False)
+    layout = MediaLayout()
+    os.makedirs(layout.exercise_dir)
+    return layout
+
+def _age(path: str, seconds: float = 7200):
+    past = time.time() - seconds
+    os.utime(path, (past, past))
+
+def test_library_blob_survives_reclaim(media_tree):
+    layout = media_tree
+    stored = store_blob(io.BytesIO(b"library video"), ".mp4", 1024, ref="library:squat", blobs_dir=layout.blobs_dir)
+    # Where the app keeps the library manifest (app.VIDEOS_DB_JSON)
+    library_json = os.path.join("uploaded_content", "exercise_videos", "videos_db.json")
+    write_manifest(library_json, [{"exercise_key": "squat", "files": [{"path": stored.path}]}])
+    _age(stored.path)
+
+    report = fsck(layout, reclaim=True, grace_s=0)
+
+    assert os.path.exists(stored.path)
+    assert not [f for f in report["findings"] if f.key == "library:squat" or f.path == stored.path]
+
+def test_unreferenced_blob_is_reclaimed(media_tree):
+    layout = media_tree
+    stored = store_blob(io.BytesIO(b"orphan video"), ".mp4", 1024, ref="library:gone", blobs_dir=layout.blobs_dir)
+    write_manifest(layout.videos_db_json, [])
+    _age(stored.path)
+
+    report = fsck(layout, reclaim=True)
+
+    assert not os.path.exists(stored.path)
+    assert any(f.kind == "orphan" and f.path == stored.path for f in report["reclaimed"])
@@ -0,0 +1,52 @@
+# Copyright © 2024-2025 [YOUR NAME]. All Rights Reserved.
+#
+# PROPRIETARY AND CONFIDENTIAL
+#
+# This file is part of Hourglass Fitness Transformation application.
+# Unauthorized copying, distribution, or modification of this file,
+# via any medium, is strictly prohibited.
+#
+# Contact: [your-email@example.com]
+# tests/test_progress_store.py
+from progress_store import list_state, load_progress, save_progress
+
+def test_appends_new_entries(tmp_path):
+    root = str(tmp_path)
+    entries = [{"date": "2025-01-01", "weight": 70}]
+    synced = save_progress("u", {}, {"weight_entries": entries}, root=root)
+    entries.append({"date": "2025-01-02", "weight": 69.5})
+    synced = save_progress("u", {}, {"weight_entries": entries}, synced, root=root)
+    assert load_progress("u", root)["weight_entries"] == entries
+    assert synced["weight_entries"] == list_state(entries)
+
+def test_in_place_edit_is_persisted(tmp_path):
+    root = str(tmp_path)
+    entries = [{"date": "2025-01-01", "weight": 70}, {"date": "2025-01-02", "weight": 69.5}]
+    synced = save_progress("u", {}, {"weight_entries": entries}, root=root)
+    entries[0]["weight"] = 71  # same length, different content
+    save_progress("u", {}, {"weight_entries": entries}, synced, root=root)
+    assert load_progress("u", root)["weight_entries"] == entries
+
+def test_shrunk_list_is_rewritten(tmp_path):
+    root = str(tmp_path)
+    entries = [{"n": 1}, {"n": 2}, {"n": 3}]
+    synced = save_progress("u", {}, {"progress_entries": entries}, root=root)
+    del entries[1]
+    save_progress("u", {}, {"progress_entries": entries}, synced, root=root)
+    assert load_progress("u", root)["progress_entries"] == entries
+
+def test_docs_round_trip(tmp_path):
+    root = str(tmp_path)
+    save_progress("u", {"display_name": "Sam", "prefs": {"experience": "beginner"}}, root=root)
+    data = load_progress("u", root)
+    assert data["display_name"] == "Sam"
+    assert data["prefs"] == {"experience": "beginner"}
+
+def test_unsynced_list_replaces_existing_file(tmp_path):
+    root = str(tmp_path)
+    entries = [{"n": 1}, {"n": 2}]
+    save_progress("u", {}, {"weight_entries": entries}, root=root)
+    # A session whose load failed has no synced state; it must not append a second copy
+    entries.append({"n": 3})
+    save_progress("u", {}, {"weight_entries": entries}, None, root=root)
+    assert load_progress("u", root)["weight_entries"] == entries
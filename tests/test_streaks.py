@@ -0,0 +1,63 @@
+# Copyright © 2024-2025 [YOUR NAME]. All Rights Reserved.
+#
+# PROPRIETARY AND CONFIDENTIAL
+#
+# This file is part of Hourglass Fitness Transformation application.
+# Unauthorized copying, distribution, or modification of this file,
+# via any medium, is strictly prohibited.
+#
+# Contact: [your-email@example.com]
+# tests/test_streaks.py
+from datetime import date, datetime
+
+import streaks
+from streaks import StreakState, day_iso, day_number, day_numbers
+
+def test_day_numbers():
+    assert day_number(date(1970, 1, 2)) == 1
+    assert day_number(datetime(2025, 3, 1, 23, 59)) == day_number("2025-03-01")
+    assert day_numbers(["2025-03-01", "", None, "2025-03-02T10:00:00"]).tolist() == [
+        day_number("2025-03-01"), day_number("2025-03-02")
+    ]
+    assert day_iso(day_number("2025-03-01")) == "2025-03-01"
+
+def test_runs_from_history():
+    state = StreakState([1, 2, 3, 10, 11, 20, 3])
+    assert (state.run, state.longest, state.last_day) == (1, 3, 20)
+    assert StreakState().as_dict(5) == {"current": 0, "longest": 0, "last_date": None, "active_days": 0}
+
+def test_add_day_extends_and_breaks():
+    state = StreakState([1, 2])
+    state.add_day(3)
+    assert (state.run, state.longest) == (3, 3)
+    state.add_day(3)  # duplicate
+    assert (state.run, len(state.days)) == (3, 3)
+    state.add_day(6)
+    assert (state.run, state.longest) == (1, 3)
+
+def test_backdated_day_joins_runs():
+    state = StreakState([1, 2, 4, 5])
+    state.add_day(3)
+    assert (state.run, state.longest, state.last_day) == (5, 5, 5)
+
+def test_current_is_kept_until_a_day_is_missed():
+    state = StreakState([8, 9, 10])
+    assert state.current(10) == 3
+    assert state.current(11) == 3
+    assert state.current(12) == 0
+
+def test_per_user_state_loads_once():
+    calls = []
+
+    def load():
+        calls.append(1)
+        return [1, 2]
+
+    streaks.forget("t")
+    try:
+        assert streaks.streak_stats("t", load, today=2)["current"] == 2
+        streaks.record_activity("t", 3)
+        assert streaks.streak_stats("t", load, today=3)["current"] == 3
+        assert len(calls) == 1
+    finally:
+        streaks.forget("t")
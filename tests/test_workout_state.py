@@ -0,0 +1,78 @@
+# Copyright © 2024-2025 [YOUR NAME]. All Rights Reserved.
+#
+# PROPRIETARY AND CONFIDENTIAL
+#
+# This file is part of Hourglass Fitness Transformation application.
+# Unauthorized copying, distribution, or modification of this file,
+# via any medium, is strictly prohibited.
+#
+# Contact: [your-email@example.com]
+# tests/test_workout_state.py
+from workout_state import DEFAULT_REPS, DEFAULT_SECONDS, WorkoutSets
+
+DAY = "2025-01-01"
+
+def done(rows, reps=8, weight=50.0):
+    return [dict(row, reps=reps, weight=weight, completed=True) for row in rows]
+
+def test_defaults_and_seed():
+    state = WorkoutSets(DAY)
+    rows, spills = state.rows("squat", "Squat", 3)
+    assert spills == []
+    assert [r["reps"] for r in rows] == [DEFAULT_REPS] * 3
+    timed, _ = state.rows("plank", "Plank", 1, time_based=True)
+    assert timed[0]["reps"] == DEFAULT_SECONDS
+
+    seeded, _ = state.rows("lunge", "Lunge", 2, seed=lambda: [
+        {"set": 2, "reps": 6, "weight": 20.0, "completed": False},
+        {"set": 2, "reps": 9, "weight": 25.0, "completed": True},  # later row wins
+        {"set": 7, "reps": 1, "weight": 1.0, "completed": True},   # out of range
+    ])
+    assert seeded[1] == {"set": 2, "reps": 9, "weight": 25.0, "completed": True}
+    assert seeded[0]["reps"] == DEFAULT_REPS
+
+def test_update_keeps_values_resident():
+    state = WorkoutSets(DAY)
+    rows, _ = state.rows("squat", "Squat", 2)
+    state.update("squat", done(rows), saved=True)
+    again, _ = state.rows("squat", "Squat", 2, seed=lambda: [])
+    assert again == done(rows)
+
+def test_cap_evicts_least_recently_used_and_spills_unsaved():
+    state = WorkoutSets(DAY, max_exercises=2)
+    a, _ = state.rows("a", "A", 1)
+    state.update("a", done(a), saved=False)
+    b, _ = state.rows("b", "B", 1)
+    state.update("b", done(b), saved=True)
+    state.rows("a", "A", 1)  # a is now the most recently used
+
+    _, spills = state.rows("c", "C", 1)
+    assert spills == []  # b was evicted, but it was saved
+    assert len(state) == 2
+
+    _, spills = state.rows("d", "D", 1)
+    assert spills == [("a", "A", DAY, done(a))]
+
+def test_activate_spills_unsaved_rows_of_previous_day():
+    state = WorkoutSets(DAY)
+    a, _ = state.rows("a", "A", 2)
+    state.update("a", done(a), saved=False)
+    b, _ = state.rows("b", "B", 1)
+    state.update("b", done(b), saved=True)
+
+    assert state.activate(DAY) == []
+    assert state.activate("2025-01-02") == [("a", "A", DAY, done(a))]
+    assert len(state) == 0
+    assert state.date == "2025-01-02"
+
+def test_reseed_on_set_count_change_spills_unsaved_rows():
+    state = WorkoutSets(DAY)
+    rows, _ = state.rows("squat", "Squat", 2)
+    state.update("squat", done(rows), saved=False)
+
+    reseeded, spills = state.rows("squat", "Squat", 3, seed=lambda: [])
+    assert spills == [("squat", "Squat", DAY, done(rows))]
+    assert len(reseeded) == 3
+    assert not any(r["completed"] for r in reseeded)
+    # Spilled once only
+    assert state.activate("2025-01-02") == []
@@ -0,0 +1,114 @@
+# Copyright © 2024-2025 [YOUR NAME]. All Rights Reserved.
+#
+# PROPRIETARY AND CONFIDENTIAL
+#
+# This file is part of Hourglass Fitness Transformation application.
+# Unauthorized copying, distribution, or modification of this file,
+# via any medium, is strictly prohibited.
+#
+# Contact: [your-email@example.com]
+# workout_state.py
+"""Compact per-session set tracker state.
+
+Each exercise's sets are one ``array('d')`` of (reps, weight, completed)
+triples. Time-based exercises keep their seconds in the reps slot. Only the
+active workout date is resident, capped at ``max_exercises``, least recently
+used first out. Saved sets are already in the workout log, so evicting them
+loses nothing; the tracker re-seeds them from the log on next use. Rows that
+failed to save are returned by ``activate``/``rows`` so the caller can spill
+them to the log before they are dropped.
+"""
+from __future__ import annotations
+from array import array
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+FIELDS = 3  # reps (or seconds), weight, completed
+DEFAULT_REPS = 10
+DEFAULT_SECONDS = 60
+DEFAULT_MAX_EXERCISES = 40
+
+# (exercise_id, exercise_name, date, [{"set", "reps", "weight", "completed"}, ...])
+Spill = Tuple[str, str, str, List[Dict]]
+
+def _as_rows(sets: array) -> List[Dict]:
+    return [
+        {"set": i // FIELDS + 1, "reps": int(sets[i]), "weight": sets[i + 1], "completed": bool(sets[i + 2])}
+        for i in range(0, len(sets), FIELDS)
+    ]
+
+class WorkoutSets:
+    """Set values for one workout date, keyed by exercise id."""
+
+    __slots__ = ("date", "max_exercises", "_sets", "_names", "_unsaved")
+
+    def __init__(self, date: str, max_exercises: int = DEFAULT_MAX_EXERCISES):
+        self.date = date
+        self.max_exercises = max_exercises
+        self._sets: "OrderedDict[str, array]" = OrderedDict()
+        self._names: Dict[str, str] = {}
+        self._unsaved: set = set()
+
+    def __len__(self) -> int:
+        return len(self._sets)
+
+    def _spill(self, exercise_id: str) -> Optional[Spill]:
+        sets = self._sets.pop(exercise_id)
+        name = self._names.pop(exercise_id)
+        if exercise_id in self._unsaved:
+            self._unsaved.discard(exercise_id)
+            return exercise_id, name, self.date, _as_rows(sets)
+        return None
+
+    def activate(self, date: str) -> List[Spill]:
+        """Make ``date`` the resident day; unsaved rows of the previous day are returned."""
+        if date == self.date:
+            return []
+        spills = [spill for spill in map(self._spill, list(self._sets)) if spill]
+        self.date = date
+        return spills
+
+    def rows(self, exercise_id: str, exercise_name: str, num_sets: int, time_based: bool = False,
+             seed: Optional[Callable[[], Sequence[Dict]]] = None) -> Tuple[List[Dict], List[Spill]]:
+        """(rows for the exercise, spills forced out by the cap).
+
+        A missing exercise, or one whose set count changed, is filled from
+        ``seed()`` (previously saved rows for this date, later rows for the
+        same set winning) and defaults.
+        """
+        sets = self._sets.get(exercise_id)
+        spills: List[Spill] = []
+        if sets is not None and len(sets) != num_sets * FIELDS:
+            # Set count changed: re-seed, but hand back rows that were never saved first
+            spill = self._spill(exercise_id)
+            if spill:
+                spills.append(spill)
+            sets = None
+        if sets is None:
+            sets = array("d", [DEFAULT_SECONDS if time_based else DEFAULT_REPS, 0.0, 0.0] * num_sets)
+            for row in (seed() if seed else ()):
+                i = (int(row["set"]) - 1) * FIELDS
+                if 0 <= i < len(sets):
+                    sets[i:i + FIELDS] = array("d", [row["reps"], row["weight"], bool(row["completed"])])
+            self._sets[exercise_id] = sets
+            self._names[exercise_id] = exercise_name
+            while len(self._sets) > self.max_exercises:
+                spill = self._spill(next(iter(self._sets)))
+                if spill:
+                    spills.append(spill)
+        self._sets.move_to_end(exercise_id)
+        return _as_rows(sets), spills
+
+    def update(self, exercise_id: str, rows: Sequence[Dict], saved: bool):
+        """Commit submitted rows; ``saved`` says whether they reached the workout log."""
+        sets = self._sets.get(exercise_id)
+        if sets is None:
+            return
+        for row in rows:
+            i = (int(row["set"]) - 1) * FIELDS
+            if 0 <= i < len(sets):
+                sets[i:i + FIELDS] = array("d", [row["reps"], row["weight"], bool(row["completed"])])
+        if saved:
+            self._unsaved.discard(exercise_id)
+        else:
+            self._unsaved.add(exercise_id)